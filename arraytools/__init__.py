@@ -25,8 +25,9 @@ Available modules and subpackages
 a_io.py :
     io tools for numpy arrays and operating system access
 >>>  art.a_io.__all__
-['arr_json', 'array2raster', 'load_npy', 'rasters2nparray', 'read_txt',
- 'save_npy', 'save_txt']
+['arr_json', 'array2raster', 'cursor_arr', 'fld_dtype', 'json_arr',
+ 'json_items', 'load_cols', 'load_npy', 'rasters2nparray', 'read_txt',
+ 'save_cols', 'save_npy', 'save_txt']
 
 apt.py :
     tools for arcpy tools
@@ -37,6 +38,17 @@ apt.py :
  'polylines_arr', 'shapes_fc', 'shapes_fc', 'struct_polygon',
  'struct_polyline', 'tbl_arr', 'to_fc']
 
+chunk_io.py :
+    chunked, compressed, appendable storage of structured arrays
+>>> art.chunk_io.__all__
+['arr_chunks', 'chunks_arr', 'chunks_info']
+
+instrument.py :
+    opt-in call counts, times, sizes and memory peaks for the hot functions
+>>> art.instrument.__all__
+['profiled', 'profiling', 'prof_enable', 'prof_reset', 'prof_stats',
+ 'prof_json', 'prof_report']
+
 fc.py :
     tools for working with featureclasses
 >>> art.fc.__all__
@@ -44,6 +56,11 @@ fc.py :
  '_two_arrays', '_xy', '_xyID', '_xy_idx', 'arrays_cols', 'change_fld',
  'concat_arrs', 'join_arr_fc', 'obj_array', 'orig_dest_pnts']
 
+geojson_io.py :
+    read and write GeoJSON as geometry and attribute arrays without arcpy
+>>> art.geojson_io.__all__
+['arr_geojson', 'geojson_arr', 'geojson_chunks', 'props_arr']
+
 frmts.py :
     Format options for viewing of numpy arrays in a variety of ways.
 >>> art.frmts.__all__
@@ -57,7 +74,7 @@ geom :
  '_max', '_min', '_new_view_', '_reshape_', '_unpack', '_view_', 'angle_2pnts',
  'angle_np', 'angle_seq', 'angles_poly', 'areas', 'azim_np', 'centers',
  'centroids', 'circle', 'densify', 'dist_bearing', 'dx_dy_np', 'e_area',
- 'e_dist', 'e_leng', 'ellipse', 'hex_flat', 'hex_pointy', 'lengths',
+ 'e_dist', 'e_leng', 'ellipse', 'hex_bin', 'hex_flat', 'hex_pointy', 'lengths',
  'radial_sort', 'rectangle', 'repeat', 'rotate', 'seg_lengths', 'simplify',
  'total_length']
 
@@ -67,6 +84,17 @@ image :
 ['_even_odd', '_pad_even_odd', '_pad_nan', '_pad_zero', 'a_filter', 'equalize',
  'normalize', 'plot_img', 'rgb_gray']
 
+shp_io.py :
+    read and write shapefiles (.shp, .shx, .dbf) without arcpy
+>>> art.shp_io.__all__
+['_ragged_idx', 'arr_dbf', 'arr_shp', 'dbf_arr', 'shp_arr', 'shp_arrays',
+ 'shp_info']
+
+sqlite_io.py :
+    store arrays and geometry in SQLite/GeoPackage, query by extent/attribute
+>>> art.sqlite_io.__all__
+['arr_sql', 'sql_arr', 'sql_tables']
+
 py_tools :
     Python, numpy and other stack generic functions:
 >>> art.py_tools.__all__
@@ -91,7 +119,7 @@ analysis :
   Tools for calculating distance, proximity, angles.
 >>> 'compass', 'line_dir', 'not_closer', 'n_near', 'vincenty'
 
-geomtools :  from arraytools.geomtools import *** either name or *
+geometry :  from arraytools.geometry import *** either name or *
   Special computational geometry tools, including:
 
 >>> circular, mesh_pnts, mst, n_spaced, pip
@@ -114,37 +142,65 @@ examples :
 
 """
 from textwrap import dedent, indent, wrap
-# ---- import *.py scripts and functions ----
-from . import tools
-from .tools import *
-from . import _common
-from ._common import _describe, fc_info, fld_info, tweet
-from . import py_tools
-from .py_tools import *
-from . import a_io
-from .a_io import *
-from . import apt
-from .apt import *
-from . import fc
-from .fc import *
-from . import frmts
-from .frmts import *
-from . import geom
-from .geom import *
-from . import image
-from .image import *
-#
-# ---- imports from subfolders
-from . import analysis
-from .analysis import *
-from . import geomtools
-from .geomtools import circular, mesh_pnts, mst, n_spaced, pip
-from . import graphing
-from .graphing import plot_pnts_
-from . import rasters
-from .rasters import  conversion, grid, rasterstats, surface
-from . import stats
-from .stats.cross_tab import crosstab
+import sys
+import os
+import re
+import ast
+import importlib
+# ---- lazy imports of *.py scripts and functions ----
+# Nothing is imported here.  A module is imported the first time it, or one
+# of the names in its __all__, is used (see __getattr__).  Later modules in
+# __mods__ replace names from earlier ones, as `from .x import *` did.
+# `python benchmarks/import_time.py` shows the cost of each.
+_subs = ['analysis', 'geometry', 'graphing', 'rasters', 'stats']
+_names = {'circular': ('geometry.circular', None),
+          'mesh_pnts': ('geometry.mesh_pnts', None),
+          'mst': ('geometry.mst', None),
+          'n_spaced': ('geometry.n_spaced', None),
+          'pip': ('geometry.pip', None),
+          'plot_pnts_': ('graphing', 'plot_pnts_'),
+          'conversion': ('rasters.conversion', None),
+          'grid': ('rasters.grid', None),
+          'rasterstats': ('rasters.rasterstats', None),
+          'surface': ('rasters.surface', None),
+          'crosstab': ('stats.cross_tab', 'crosstab')}
+_all_pat = re.compile(r'^__all__\s*=\s*(\[.*?\])', re.M | re.S)
+_lazy = {}
+
+
+def _all_names(mod):
+    """Read the __all__ list of a module from its source, without importing
+    it.
+    """
+    path = os.path.join(os.path.dirname(__file__), *mod.split('.'))
+    if os.path.isdir(path):
+        path = os.path.join(path, '__init__.py')
+    else:
+        path += '.py'
+    with open(path, 'r', encoding='utf-8') as f:
+        m = _all_pat.search(f.read())
+    return ast.literal_eval(m.group(1)) if m else []
+
+
+def _load(name):
+    """Import a module, or a name from one, by its entry in the lazy map"""
+    mod, attr = _lazy.get(name, (name, None))
+    m = importlib.import_module('.' + mod, __name__)
+    obj = m if attr is None else getattr(m, attr)
+    globals()[name] = obj
+    return obj
+
+
+def __getattr__(name):
+    """Import modules and their functions on first use"""
+    if name in __mods__ or name in _subs or name in _lazy:
+        return _load(name)
+    raise AttributeError("module {!r} has no attribute {!r}".format(
+        __name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy) | set(_subs))
 
 
 def __art_modules__():
@@ -169,20 +225,20 @@ def __art_modules__():
 #
 __art_version__ = "Arraytools version 1.0"
 __all__ = ['__art_version__', '__art_modules__']
-__mods__ = {'_common': _common.__all__,
-            'a_io': a_io.__all__,
-            'analysis': analysis.__all__,
-            'apt': apt.__all__,
-            'fc': fc.__all__,
-            'frmts': frmts.__all__,
-            'geom': geom.__all__,
-            'image': image.__all__,
-            'py_tools': py_tools.__all__,
-            'tools': tools.__all__
-            }
-
-__all__.extend(__mods__)
+__mods__ = dict((m, _all_names(m)) for m in
+                ['tools', '_common', 'py_tools', 'a_io', 'apt', 'fc',
+                 'frmts', 'geom', 'image', 'shp_io', 'geojson_io',
+                 'sqlite_io', 'chunk_io', 'instrument',
+                 'analysis'])
+for _m, _n in __mods__.items():
+    _lazy.update((i, (_m, i)) for i in _n)
+_lazy.update(_names)
+
+__all__.extend(sorted(__mods__))
 #
+if sys.version_info < (3, 7):   # no module __getattr__, import everything
+    for _n in list(__mods__) + _subs + list(_lazy):
+        _load(_n)
 #__all__.sort()
 #del _arg
 #del __args
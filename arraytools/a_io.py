@@ -18,8 +18,14 @@ Notes :
     3.  read_txt    - read array created by save_txtt
     4.  save_txt    - save array to npy format
     5.  arr_json    - save to json format
+        json_arr    - read a file saved by arr_json
+        json_items  - iterate over the items of a json array
     6.  array2raster - save array to raster
     7.  rasters2nparray - batch rasters to numpy array
+    8.  fld_dtype   - field information to a dtype
+        cursor_arr  - load any row iterator/cursor into a structured array
+    9.  save_cols   - save/append a structured array as a column store
+        load_cols   - load fields and/or rows from a column store
 
 ---------------------------------------------------------------------
 """
@@ -39,21 +45,32 @@ script = sys.argv[0]  # print this should you need to locate the script
 
 __all__ = ['load_npy', 'save_npy',
            'read_txt', 'save_txt',
-           'arr_json',
+           'arr_json', 'json_arr', 'json_items',
            'array2raster', 'rasters2nparray',
+           'fld_dtype', 'cursor_arr',
+           'save_cols', 'load_cols',
            ]
 
 
 # ----------------------------------------------------------------------
 # (1) load_npy .... code section ---
-def load_npy(f_name, all_info=False):
+def load_npy(f_name, all_info=False, mmap_mode=None):
     """load a well formed `npy` file representing a structured array
 
+    Use `mmap_mode='r'` to map the file rather than read it.  `f_name` can
+    also be a column store folder, see `save_cols`.  Its columns are always
+    copied into one structured array, `mmap_mode` only decides whether
+    they are mapped or read while doing so.  Use `load_cols` with
+    `as_struct=False` for memmap views of the columns.
+
     Returns
     -------
         The array, the description, field names and their size.
     """
-    a = np.load(f_name)
+    if os.path.isdir(f_name):
+        a = load_cols(f_name, mmap=mmap_mode is not None)
+    else:
+        a = np.load(f_name, mmap_mode=mmap_mode)
     if all_info:
         desc = a.dtype.descr
         nms = a.dtype.names
@@ -76,28 +93,164 @@ def save_npy(a, f_name):
 
 # ----------------------------------------------------------------------
 # (3) read_txt .... code section ---
-def read_txt(name="arr.txt"):
+def _txt_kind(vals):
+    """Return the smallest dtype, from bool, int, float and unicode, that
+    can hold the string array `vals`.  Empty strings are ignored.
+    """
+    v = np.char.strip(vals)
+    v = v[v != ""]
+    if v.size == 0:
+        return np.dtype('<f8')
+    if np.all((v == "True") | (v == "False")):
+        return np.dtype('?')
+    for dt in ('<i8', '<f8'):
+        try:
+            v.astype(dt)
+            return np.dtype(dt)
+        except (ValueError, OverflowError):
+            pass
+    return np.dtype('U{}'.format(max(1, np.char.str_len(v).max())))
+
+
+def _txt_col(vals, dt):
+    """Convert the string array `vals` to `dt`.  Empty values become nulls,
+    the minimum int32 for integers, nan for floats and False for booleans.
+    """
+    if dt.kind in 'iuf':
+        try:                    # astype ignores surrounding whitespace
+            return vals.astype(dt)
+        except ValueError:
+            pass
+    vals = np.char.strip(vals)
+    if dt.kind == 'U':
+        if np.char.str_len(vals).max(initial=0) > dt.itemsize // 4:
+            raise ValueError("wider than {}".format(dt))
+        return vals
+    if dt.kind == 'b':
+        ok = (vals == "True") | (vals == "False") | (vals == "")
+        if not ok.all():
+            raise ValueError("not boolean")
+        return vals == "True"
+    empty = vals == ""
+    if not empty.any():
+        raise ValueError("not {}".format(dt))
+    vals[empty] = str(np.iinfo(np.int32).min) if dt.kind == 'i' else 'nan'
+    return vals.astype(dt)
+
+
+def _promote(dt0, dt1):
+    """The dtype that holds both text derived dtypes"""
+    rank = 'bifU'
+    if dt0.kind == 'U' or dt1.kind == 'U':
+        w = max(i.itemsize // 4 if i.kind == 'U' else 32 for i in (dt0, dt1))
+        return np.dtype('U{}'.format(w))
+    return max(dt0, dt1, key=lambda i: rank.index(i.kind))
+
+
+def read_txt(name="arr.txt", dtype=None, delimiter=",", names=True,
+             sample=1000, chunk=2**24):
     """Read the structured/recarray created by save_txt.
 
     dtype : data type
-        If `None`, it allows the structure to be read from the array.
+        If `None`, it is determined from the first `sample` rows and widened
+        if later rows need it.  Bool, int64, float64 and unicode are used.
 
     delimiter : string
-        Use a comma delimiter by default.
+        Use a comma delimiter by default.  Values are stripped.
 
     names : boolean
         If `True`, the first row contains the field names.
 
-    see np.genfromtxt for all *args and **kwargs.
+    chunk : integer
+        The approximate number of bytes parsed at a time.
+
+    Notes:
+    -----
+    The lines are counted first so the output can be preallocated.  Each
+    chunk of text is split once, reshaped to rows and columns, then each
+    column is converted with `astype`, stripping only text columns.  Empty
+    values follow the null convention of `apt.tbl_2_np_array`.  This
+    replaces np.genfromtxt.
     """
-    a = np.genfromtxt(name, dtype=None, delimiter=",",
-                      names=True, autostrip=True)  # ,skip_header=1)
-    return a
+    n_rows = 0
+    with open(name, 'rb') as f:
+        blk = f.read(chunk)
+        last = b"\n"
+        while blk:
+            n_rows += blk.count(b"\n")
+            last = blk[-1:]
+            blk = f.read(chunk)
+    n_rows += last != b"\n"
+    out = None
+    n = 0
+    flds = []
+    with open(name, 'r') as f:
+        if names:
+            hdr = f.readline()
+            n_rows -= 1
+            flds = [i.strip() for i in hdr.split(delimiter)]
+        first = True
+        while True:
+            lines = f.readlines(sample * 100 if first else chunk)
+            if not lines:
+                break
+            lines = [i for i in lines if i.strip()]
+            if not lines:
+                continue
+            if not lines[-1].endswith("\n"):
+                lines[-1] += "\n"
+            n_col = lines[0].count(delimiter) + 1
+            txt = "".join(lines).replace("\n", delimiter)
+            vals = txt.split(delimiter)[:-1]
+            if len(vals) != len(lines) * n_col:
+                raise ValueError("Rows with differing numbers of values "
+                                 "after row {}".format(n))
+            vals = np.array(vals).reshape(-1, n_col)
+            m = len(vals)
+            if out is None:
+                if not names:
+                    flds = ["f{}".format(i) for i in range(n_col)]
+                if dtype is None:
+                    dt = [(fn, _txt_kind(vals[:sample, i]))
+                          for i, fn in enumerate(flds)]
+                else:
+                    dt = dtype
+                out = np.empty((max(n_rows, m),), dtype=dt)
+            if n + m > len(out):
+                out.resize((n + m,), refcheck=False)
+            for i, fn in enumerate(out.dtype.names):
+                dt = out.dtype[fn]
+                try:
+                    out[fn][n:n + m] = _txt_col(vals[:, i], dt)
+                except (ValueError, OverflowError):
+                    if dtype is not None:
+                        raise
+                    new = _promote(dt, _txt_kind(vals[:, i]))
+                    out = out.astype([(j, new if j == fn else out.dtype[j])
+                                      for j in out.dtype.names])
+                    out[fn][n:n + m] = _txt_col(vals[:, i], new)
+            n += m
+            first = False
+    if out is None:
+        return np.empty((0,), dtype=dtype or [(i, '<f8') for i in flds])
+    out.resize((n,), refcheck=False)
+    return out
 
 
 # ----------------------------------------------------------------------
 # (4) save_txt .... code section ---
-def save_txt(a, name="arr.txt", sep=", ", dt_hdr=True):
+def _txt_codes(c):
+    """Convert a column to text as an (N, width) array of character codes,
+    along with the length of each value.  Bytes are decoded.
+    """
+    t = np.char.decode(c, 'utf-8') if c.dtype.kind == 'S' else c.astype('U')
+    w = max(t.itemsize // 4, 1)
+    codes = np.ascontiguousarray(t, dtype='<U{}'.format(w))
+    codes = codes.view('<u4').reshape(len(t), w)
+    return codes, (codes != 0).sum(axis=1)
+
+
+def save_txt(a, name="arr.txt", sep=", ", dt_hdr=True, chunk=2**18):
     """Save a NumPy structured, recarray to text.
 
     Requires:
@@ -110,29 +263,182 @@ def save_txt(a, name="arr.txt", sep=", ", dt_hdr=True):
         column separater, include a space if needed
     dt_hdr: boolean
         if True, add dtype names to the header of the file
+    chunk : integer
+        rows formatted and written at a time
+
+    Notes:
+    -----
+    Each column is converted to text with `astype` and right justified to
+    the widest value in the column.  The widths are found in a first pass.
+    Each block of rows is then assembled as one array of character codes
+    and written as a single string.
     """
     a_names = ", ".join(i for i in a.dtype.names)
     hdr = ["", a_names][dt_hdr]  # use "" or names from input array
-    s = np.array(a.tolist(), dtype=np.string_)
-    widths = [max([len(i) for i in s[:, j]])
-              for j in range(s.shape[1])]
-    frmt = sep.join(["%{}s".format(i) for i in widths])
-    # vals = ", ".join([i[1] for i in a.dtype.descr])
-    np.savetxt(name, a, fmt=frmt, header=hdr, comments="")
+    N = len(a)
+    names = a.dtype.names
+    widths = [1] * len(names)
+    for s in range(0, N, chunk):
+        b = a[s:s + chunk]
+        for j, fn in enumerate(names):
+            c = b[fn]
+            if c.dtype.kind in 'iu' and len(c):    # no need for the text
+                w = max(len(str(c.min())), len(str(c.max())))
+            elif c.dtype.kind == 'b':
+                w = 5 if (~c).any() else 4
+            else:
+                w = _txt_codes(c)[1].max(initial=0)
+            widths[j] = max(widths[j], w)
+    seps = [ord(i) for i in sep]
+    L = sum(widths) + len(seps) * (len(names) - 1) + 1
+    with open(name, 'w') as f:
+        if hdr:
+            f.write(hdr + "\n")
+        for s in range(0, N, chunk):
+            b = a[s:s + chunk]
+            out = np.full((len(b), L), ord(" "), dtype='<u4')
+            pos = 0
+            for j, fn in enumerate(names):
+                codes, lens = _txt_codes(b[fn])
+                r, k = np.nonzero(codes)
+                out[r, pos + widths[j] - lens[r] + k] = codes[r, k]
+                pos += widths[j]
+                if j < len(names) - 1:
+                    out[:, pos:pos + len(seps)] = seps
+                    pos += len(seps)
+            out[:, -1] = ord("\n")
+            f.write(out.tobytes().decode('utf-32-le'))
     print("\nFile saved...")
 
 
 # ----------------------------------------------------------------------
 # (5) arr_json .... code section ---
-def arr_json(file_out, arr=None):
+def _json_vals(c):
+    """Format a column as JSON text, as an array of strings.
+
+    Numbers use `astype` (nan and inf become null), booleans true/false,
+    NaT null and everything else is a quoted string.
+    """
+    import json
+    k = c.dtype.kind
+    if k in 'iu':
+        return c.astype('U')
+    if k == 'f':
+        s = c.astype('U')
+        s[~np.isfinite(c)] = 'null'
+        return s
+    if k == 'b':
+        return np.where(c, 'true', 'false')
+    if k in 'mM':
+        s = np.array([json.dumps(i) for i in c.astype('U').tolist()],
+                     dtype='U')
+        s[np.isnat(c)] = 'null'
+        return s
+    if k == 'S':
+        c = np.char.decode(c, 'utf-8')
+    elif k != 'U':
+        c = c.astype('U')
+    return np.array([json.dumps(i) for i in c.tolist()], dtype='U')
+
+
+def _json_rows(a):
+    """Format the rows of an array, or a chunk of one, as JSON text"""
+    import json
+    if a.dtype.names:
+        cols = [_json_vals(a[n]).tolist() for n in a.dtype.names]
+        return ["[" + ", ".join(r) + "]" for r in zip(*cols)]
+    if a.ndim == 1:
+        return _json_vals(a).tolist()
+    if a.ndim == 2:
+        v = _json_vals(a.ravel()).reshape(a.shape).tolist()
+        return ["[" + ", ".join(r) + "]" for r in v]
+    return [json.dumps(i.tolist()) for i in a]
+
+
+def arr_json(file_out, arr=None, chunk=2**16):
     """Send an array out to json format. Use json_arr to read the file.
     No error checking
+
+    The rows are written `chunk` at a time, one per line, with the columns
+    formatted as text by `astype`, so memory use doesn't grow with the size
+    of the array.  Structured array rows are written as lists.
+    """
+    with open(file_out, 'w', encoding='utf-8') as f:
+        f.write("[")
+        for i in range(0, len(arr), chunk):
+            rows = _json_rows(arr[i:i + chunk])
+            f.write(("," if i else "") + "\n" + ",\n".join(rows))
+        f.write("\n]\n")
+
+
+def json_items(in_file, key=None, chunk=2**20):
+    """Yield the items of a JSON array one at a time, reading the file
+    `chunk` characters at a time.
+
+    in_file : string
+        The file, whose top level is an array, or an object with an array
+        under `key` (eg. 'features' for a GeoJSON FeatureCollection)
     """
     import json
-    import codecs
-    json.dump(arr.tolist(), codecs.open(file_out, 'w', encoding='utf-8'),
-              sort_keys=True, indent=4)
-    # ----
+    import re
+    dec = json.JSONDecoder()
+    ws = re.compile(r'[\s,]*')
+    with open(in_file, 'r', encoding='utf-8') as f:
+        buf = f.read(chunk)
+        eof = len(buf) < chunk
+        pat = r'\s*\[' if key is None else r'"{}"\s*:\s*\['.format(key)
+        m = re.compile(pat).search(buf)
+        while m is None and not eof:
+            more = f.read(chunk)
+            eof = len(more) < chunk
+            buf += more
+            m = re.compile(pat).search(buf)
+        if m is None:
+            raise ValueError("No array found in {}".format(in_file))
+        pos = m.end()
+        while True:
+            pos = ws.match(buf, pos).end()
+            if pos < len(buf) and buf[pos] == "]":
+                return
+            try:
+                obj, end = dec.raw_decode(buf, pos)
+                if end == len(buf) and not eof:   # a number may continue
+                    raise ValueError
+            except ValueError:
+                if eof:
+                    msg = "Bad JSON after {}".format(buf[pos:pos + 40])
+                    raise ValueError(msg)
+                more = f.read(chunk)
+                eof = len(more) < chunk
+                buf = buf[pos:] + more
+                pos = 0
+                continue
+            yield obj
+            pos = end
+            if pos > chunk:
+                buf = buf[pos:]
+                pos = 0
+
+
+def json_arr(in_file, dtype=None, chunk=2**16):
+    """Read a file written by `arr_json` back to an array.
+
+    The rows are read incrementally.  With a `dtype` they go straight into
+    a structured array through `cursor_arr`, otherwise each batch is
+    converted with np.array and the batches concatenated.
+    """
+    from itertools import islice
+    rows = json_items(in_file)
+    if dtype is not None:
+        return cursor_arr((tuple(r) if isinstance(r, list) else r
+                           for r in rows), dtype, batch=chunk)
+    parts = []
+    while True:
+        b = list(islice(rows, chunk))
+        if not b:
+            break
+        parts.append(np.array(b))
+    return np.concatenate(parts) if parts else np.array([])
 
 
 # ----------------------------------------------------------------------
@@ -201,6 +507,255 @@ def rasters2nparray(folder=None, to3D=False):
         return arrs
 
 
+# ----------------------------------------------------------------------
+# (8) fld_dtype, cursor_arr .... code section ---
+def fld_dtype(flds, rename=None):
+    """Convert field information to an array dtype.  See `apt.change_fld`.
+
+    Requires:
+    --------
+    `flds` : list
+        Either arcpy field objects (with `type`, `name` and `length`
+        properties) or (type, name, length) tuples, for example
+        [('OID', 'OBJECTID', 4), ('Double', 'Area', 8), ('String', 'Nm', 20)]
+    `rename` : dictionary, optional
+        Replacement field names, eg. {'OBJECTID': 'Idx'}
+
+    Returns:
+    -------
+    A list of (name, dtype) tuples.
+    """
+    if rename is None:
+        rename = {}
+    dt = []
+    for f in flds:
+        if isinstance(f, (list, tuple)):
+            typ, name, leng = f
+        else:
+            typ, name, leng = f.type, f.name, f.length
+        name = rename.get(name, name)
+        if typ in ('OID', 'Integer', 'Long', 'Short', 'SmallInteger'):
+            dt.append((name, '<i4'))
+        elif typ in ('BigInteger',):
+            dt.append((name, '<i8'))
+        elif typ in ('Double', 'Single', 'Float'):
+            dt.append((name, '<f8'))
+        elif typ in ('Date',):
+            dt.append((name, '<M8[us]'))
+        else:
+            dt.append((name, "{}{}".format('U', max(1, leng))))
+    return dt
+
+
+def _null_rows(rows, dt, null_value=None):
+    """Replace None in rows with null values by field kind, following
+    `apt.tbl_2_np_array`.  Only used when a batch can't be assigned as is.
+    """
+    nulls = {'i': np.iinfo(np.int32).min, 'u': 0, 'f': np.nan,
+             'U': "None", 'S': b"None", 'M': None, 'b': False}
+    if null_value is None:
+        null_value = {}
+    fill = [null_value.get(n, nulls.get(dt[n].kind))
+            for n in dt.names]
+    return [tuple(f if v is None else v for v, f in zip(row, fill))
+            for row in rows]
+
+
+def cursor_arr(rows, dtype, batch=2**14, n_hint=None, null_value=None):
+    """Load rows from any row iterator into a structured array in batches.
+
+    Requires:
+    --------
+    `rows` : iterator
+        An arcpy.da.SearchCursor, csv.reader, sqlite3 cursor, generator or
+        anything else yielding sequences in field order.  If the object has
+        a `fetchmany` method (DB-API cursors) it is used to get the batches.
+    `dtype` : dtype
+        The output dtype, see `fld_dtype` to derive it from field info.
+    `batch` : integer
+        The number of rows converted at a time.
+    `n_hint` : integer, optional
+        The expected number of rows, used for the initial allocation.
+    `null_value` : dictionary, optional
+        Values to use for None by field name, otherwise the minimum int32
+        for integers, nan for floats and 'None' for strings.
+
+    Returns:
+    -------
+    A structured array with one record per row.
+
+    Notes:
+    -----
+    The output is preallocated and doubled in size when it fills, so
+    only one batch of python rows exists at a time rather than a list of
+    every row.  Each batch is assigned into the array slice in one step.
+    The array is trimmed in place at the end.
+
+    >>> cur = sqlite3.connect(db).execute("SELECT a, b FROM t")
+    >>> a = cursor_arr(cur, [('a', '<i4'), ('b', '<f8')])
+    """
+    from itertools import islice
+    dt = np.dtype(dtype)
+    cap = max(int(n_hint or batch), 1)
+    out = np.empty((cap,), dtype=dt)
+    fetch = getattr(rows, 'fetchmany', None)
+    it = None if fetch is not None else iter(rows)
+    n = 0
+    while True:
+        chunk = fetch(batch) if fetch is not None else list(islice(it, batch))
+        m = len(chunk)
+        if m == 0:
+            break
+        if n + m > cap:                      # grow geometrically
+            cap = max(cap * 2, n + m)
+            tmp = np.empty((cap,), dtype=dt)
+            tmp[:n] = out[:n]
+            out = tmp
+        try:
+            out[n:n + m] = chunk
+        except (TypeError, ValueError):
+            out[n:n + m] = _null_rows(chunk, dt, null_value)
+        n += m
+        del chunk
+    out.resize((n,), refcheck=False)
+    return out
+
+
+# ----------------------------------------------------------------------
+# (9) columnar storage .... code section ---
+def _npy_header(dt, n, size=None, shape=()):
+    """Build a version 1.0 npy header for an array of `n` records, each of
+    `shape` (for subarray fields).
+
+    Room is left for the record count to grow, so the header can be
+    rewritten in place when rows are appended.  If `size` is given, the
+    header is padded to that length.
+    """
+    import struct
+    d = "{{'descr': {!r}, 'fortran_order': False, 'shape': {!r}, }}".format(
+        np.lib.format.dtype_to_descr(np.dtype(dt)), (n,) + tuple(shape))
+    if size is None:
+        size = 10 + len(d) + 21 - len(str(n)) + 1
+        size += -size % 64
+    d = d.ljust(size - 11) + "\n"
+    return b'\x93NUMPY\x01\x00' + struct.pack('<H', size - 10) + d.encode()
+
+
+def _col_schema(folder):
+    """Read the schema.json of a column store folder"""
+    import json
+    with open(os.path.join(folder, "schema.json"), 'r') as f:
+        return json.load(f)
+
+
+def _col_dtype(fld):
+    """The dtype and subarray shape of a schema field, stores saved before
+    subarray fields were supported have no shape.
+    """
+    shp = tuple(fld[3]) if len(fld) > 3 else ()
+    return np.lib.format.descr_to_dtype(fld[2]), shp
+
+
+def save_cols(a, folder, append=False):
+    """Save a structured array as a column store, a folder with one `npy`
+    file per field and a `schema.json` holding the dtype and row count.
+
+    Requires:
+    --------
+    `a` : structured array
+    `folder` : string
+        The folder, created if it doesn't exist
+    `append` : boolean
+        True, add the rows to the end of an existing store.  The field
+        names must match and the values must fit the stored dtypes.
+
+    Notes:
+    -----
+    Appending writes the new values to the end of each file then rewrites
+    the npy header in place, so existing rows are never read or rewritten.
+    Subarray fields, eg. ('XY', '<f8', (2,)), are saved as N x 2 arrays.
+    """
+    import json
+    names = a.dtype.names
+    exists = os.path.exists(os.path.join(folder, "schema.json"))
+    if append and exists:
+        sch = _col_schema(folder)
+        if [i[0] for i in sch['fields']] != list(names):
+            raise ValueError("Fields {} don't match the store {}".format(
+                list(names), [i[0] for i in sch['fields']]))
+    else:
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        fields = [(n, "{:03d}_{}.npy".format(
+                   i, "".join(c if c.isalnum() else "_" for c in n)),
+                   np.lib.format.dtype_to_descr(a.dtype[n].base),
+                   list(a.dtype[n].shape))
+                  for i, n in enumerate(names)]
+        sch = {'fields': fields, 'rows': 0}
+        for n, fn, dt, shp in fields:
+            with open(os.path.join(folder, fn), 'wb') as f:
+                f.write(_npy_header(dt, 0, shape=shp))
+    dts = [_col_dtype(i) for i in sch['fields']]
+    for n, (dt, shp) in zip(names, dts):    # check before writing anything
+        if not np.can_cast(a.dtype[n].base, dt) or \
+                a.dtype[n].shape != shp:
+            raise ValueError("{} {} can't be stored as {}".format(
+                n, a.dtype[n], (dt, shp)))
+    N = sch['rows'] + len(a)
+    for i, (dt, shp) in zip(sch['fields'], dts):
+        n, fn = i[:2]
+        col = a[n].astype(dt, copy=False)
+        with open(os.path.join(folder, fn), 'r+b') as f:
+            np.lib.format.read_magic(f)
+            np.lib.format.read_array_header_1_0(f)
+            size = f.tell()
+            f.seek(0, 2)
+            np.ascontiguousarray(col).tofile(f)
+            f.seek(0)
+            f.write(_npy_header(dt, N, size, shp))
+    sch['rows'] = N
+    with open(os.path.join(folder, "schema.json"), 'w') as f:
+        json.dump(sch, f, indent=2)
+
+
+def load_cols(folder, flds="*", rows=None, mmap=True, as_struct=True):
+    """Load fields and rows from a column store created by `save_cols`.
+
+    Requires:
+    --------
+    `folder` : string
+        The column store folder
+    `flds` : fields
+        "*" for all, or a list of field names.  Only these files are opened.
+    `rows` : slice, optional
+        A row range, eg. slice(1000, 2000)
+    `mmap` : boolean
+        True, memory-map the files (read only), False, read them
+    `as_struct` : boolean
+        True, copy the selection into a structured array.  False, return a
+        dictionary of the columns, which are memmap views if `mmap` is True.
+
+    >>> a = load_cols(folder, flds=['X', 'Y'], rows=slice(0, 10))
+    >>> cols = load_cols(folder, as_struct=False)  # no data is read
+    """
+    sch = _col_schema(folder)
+    fields = sch['fields']
+    if flds != "*":
+        fields = [i for i in fields if i[0] in flds]
+    mode = 'r' if mmap else None
+    cols = {}
+    for i in fields:
+        c = np.load(os.path.join(folder, i[1]), mmap_mode=mode)
+        cols[i[0]] = c if rows is None else c[rows]
+    if not as_struct:
+        return cols
+    N = len(cols[fields[0][0]]) if fields else 0
+    a = np.empty((N,), dtype=[(i[0],) + _col_dtype(i) for i in fields])
+    for n in a.dtype.names:
+        a[n] = cols[n]
+    return a
+
+
 def _demo_a_io():
     """
     : -
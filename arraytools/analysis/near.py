@@ -65,6 +65,7 @@ __ http://stackoverflow.com/questions/1871536/euclidean-distance-between-points-
 import sys
 import numpy as np
 from textwrap import dedent
+from arraytools.instrument import profiled
 
 ft = {'bool': lambda x: repr(x.astype('int32')),
       'float': '{: 0.1f}'.format}
@@ -85,6 +86,7 @@ __all__ = ['distances',
 # ---- functions ----
 
 
+@profiled
 def distances(a, b):
     """A fast implementation for distance calculations
 
@@ -105,6 +107,7 @@ def distances(a, b):
     return np.hypot(d0, d1)
 
 
+@profiled
 def not_closer(a, min_d=1, ordered=False):
     """Find the points that are separated by a distance greater than
      min_d.  This ensures a degree of point spacing
@@ -129,6 +132,7 @@ def not_closer(a, min_d=1, ordered=False):
     return b, c, d
 
 
+@profiled
 def n_check(a, N=3, order=True):
     """n_check prior to running n_near analysis
 
@@ -149,6 +153,7 @@ def n_check(a, N=3, order=True):
         return False
 
 
+@profiled
 def n_near(a, N=3, ordered=True):
     """Return the coordinates and distance to the nearest N points within
       an 2D numpy array, 'a', with optional ordering of the inputs.
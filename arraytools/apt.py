@@ -32,6 +32,9 @@ Functions
 -  tbl_2_np_array : shortcut to TableToNumPyArray
 -  to_fc : convert the results back to a featureclass
 
+Without arcpy, `shp_io.arr_shp` writes the same arrays to a shapefile in
+bulk, see `output_points`, `output_polylines`, `output_polygons` and `to_fc`.
+
 **Common variables used in the functions**
 
 1. Array variables/properties
@@ -101,7 +104,8 @@ References:
 import sys
 from textwrap import dedent
 import numpy as np
-from _common import fc_info, tweet
+from arraytools._common import fc_info, tweet
+from arraytools.a_io import cursor_arr, fld_dtype
 import arcpy
 
 
@@ -327,24 +331,30 @@ def arc_np(in_fc):
     Alternatives:
     ------------
     SpatialDataFrame from ArcGIS API for Python... or GeoPandas
+
+    `shp_io.shp_arr` and `geojson_io.geojson_arr` return the same layout
+    without arcpy.
     """
     desc = arcpy.da.Describe(in_fc)
     shp_type = desc['shapeType']
     prefix = desc['shapeFieldName']
     fields = ['OID@', prefix + '@']
     dt = [('ID_num', '<i4'), ('Part_num', '<i4'), ('Xs', '<f8'), ('Ys', '<f8')]
-    pnts = []
-    with arcpy.da.SearchCursor(in_fc, fields) as cursor:
+
+    def _pnts(cursor):
+        """yield the points rather than building a list of them"""
         for row in cursor:
             oid, shp = row
             for j in range(len(shp)):
                 pt = shp.getPart(j)
                 if shp_type in ('Point', 'point'):
-                    pnts.extend([(oid, j, pt.X, pt.Y)])
+                    yield (oid, j, pt.X, pt.Y)
                 else:
-                    p_list = [(oid, j, pnt.X, pnt.Y) for pnt in pt if pnt]
-                    pnts.extend(p_list)
-    a = np.asarray(pnts, dtype=dt)
+                    for pnt in pt:
+                        if pnt:
+                            yield (oid, j, pnt.X, pnt.Y)
+    with arcpy.da.SearchCursor(in_fc, fields) as cursor:
+        a = cursor_arr(_pnts(cursor), dt)
     return a
 
 
@@ -545,23 +555,17 @@ def fc_array(in_fc, flds="", allpnts=True):
 
 
 def change_fld(flds):
-    """Convert the field types to array friendly ones
+    """Convert the field types to array friendly ones.  See `a_io.fld_dtype`
     """
-    info = [(fld.type, fld.name, fld.length) for fld in flds]
-    dt = []
-    for i in info:
-        if i[0] in ('OID', 'Integer', 'Long', 'Short'):
-            dt.append((i[1], '<i4'))
-        elif i[0] in ('Double', 'Single', 'Float'):
-            dt.append((i[1], '<f8'))
-        else:
-            dt.append(i[1], "{}{}".format('U', i[2]))
-    return dt
+    return fld_dtype(flds)
 
 
 def tbl_arr(in_fc):
     """ Convert a table or featureclass table (in_fc)to a numpy array
     including the oid field but excluding the geometry field.
+
+    The rows are loaded in batches into a preallocated array by
+    `a_io.cursor_arr`, rather than collected in a list first.
     """
     desc = arcpy.da.Describe(in_fc)  # use the new da.Describe method
     dump = ['shapeFieldName', 'areaFieldName', 'lengthFieldName']
@@ -569,14 +573,10 @@ def tbl_arr(in_fc):
     fields = [f for f in arcpy.ListFields(in_fc) if f.name not in f_geo]
     f_names = [f.name for f in fields]
     dt = change_fld(fields)
-    vals = []
-    with arcpy.da.SearchCursor(in_fc, field_names=f_names) as rows:
-        for row in rows:
-            vals.append(row)
-            del row
-        del rows
     dt = [(i.replace('OBJECTID', 'Idx'), j) for i, j in dt]
-    a = np.asarray(vals, dtype=dt)
+    n = int(arcpy.GetCount_management(in_fc)[0])
+    with arcpy.da.SearchCursor(in_fc, field_names=f_names) as rows:
+        a = cursor_arr(rows, dt, n_hint=n)
     return a  # vals, az
 
 
@@ -0,0 +1,381 @@
+# -*- coding: UTF-8 -*-
+"""
+bench
+=====
+
+Script :   bench.py
+
+Author :   Dan.Patterson@carleton.ca
+
+Modified : 2018-07-10
+
+Purpose :  Time, and measure the peak memory of, the package's hot functions
+
+Notes :
+::
+    python bench.py [--full] [--only n_near e_dist] [--out res.json]
+                    [--baseline base.json] [--save-baseline] [--tol 0.25]
+
+    1.  run_bench    - run the cases, return the results as a dictionary
+    2.  save_results - save results to json
+    3.  load_results - read them back
+    4.  compare      - the cases slower, or using more memory, than a baseline
+    5.  bench_report - print the results and any regressions
+
+Each case runs at one or more sizes, `--full` runs them all, otherwise only
+the smallest.  Points go from 10**3 to 10**7 (the distance matrix cases stop
+well before that) and rasters from 256**2 to 8192**2.  The largest sizes
+need several GB of memory, use `--only` to limit them.
+::
+    points   : datamaker.rand_float x, y in 0-1000
+    surfaces : tools.pyramid, with diamond_square.d_s relief when it can be
+               imported, tiled to size
+    classes  : datamaker.rand_int, 0-9
+
+The time is the best of up to `repeat` runs (stopping after about 2s).  The
+peak is from one more run with tracemalloc on, in bytes above the memory in
+use at the start.  Cases whose module can't be imported (arcpy or
+matplotlib missing) are listed as skipped.
+
+The default baseline is `baseline.json` beside this script, made with
+`--save-baseline` on the machine doing the comparing.  A case is flagged
+when its time or peak exceeds the baseline by more than `tol` (25%).
+
+---------------------------------------------------------------------
+"""
+# ---- imports, formats, constants ----
+import sys
+import os
+import io
+import json
+import time
+import platform
+import importlib
+import tracemalloc
+from contextlib import redirect_stdout
+import numpy as np
+
+script = sys.argv[0]  # print this should you need to locate the script
+
+__all__ = ['run_bench', 'save_results', 'load_results', 'compare',
+           'bench_report']
+
+_here = os.path.dirname(os.path.abspath(__file__))
+_root = os.path.dirname(os.path.dirname(_here))
+if _root not in sys.path:           # the package is imported as arraytools
+    sys.path.insert(0, _root)
+
+_baseline = os.path.join(_here, "baseline.json")
+_cache = {}
+
+
+# ----------------------------------------------------------------------
+# (1) synthetic data ... code section ---
+def _mod(name):
+    """Import arraytools.<name>"""
+    return importlib.import_module("arraytools." + name)
+
+
+def _pnts(N):
+    """N random points, shape (N, 2)"""
+    dm = _mod('datamaker')
+    np.random.seed(N % 2**31)
+    return np.column_stack((dm.rand_float(N, 0, 1000),
+                            dm.rand_float(N, 0, 1000)))
+
+
+def _dem(n):
+    """A (n, n) surface, a pyramid plus diamond square relief, tiled"""
+    a = _mod('tools').pyramid(core=128, steps=129).astype('float64')
+    try:
+        ds = _mod('rasters.diamond_square')
+        np.random.seed(n)
+        with redirect_stdout(io.StringIO()):   # d_s prints each step
+            a += ds.d_s(8, low=0, high=20, r=0.5)
+    except ImportError:
+        pass
+    reps = -(-n // a.shape[0])
+    return np.tile(a, (reps, reps))[:n, :n]
+
+
+def _cls(n, k=0):
+    """A (n, n) integer raster of 10 classes"""
+    np.random.seed(n + k)
+    a = _mod('datamaker').rand_int(n*n, 0, 10).astype('int32')
+    return a.reshape(n, n)
+
+
+def _stack(n):
+    """3 class rasters"""
+    return np.array([_cls(n, k) for k in range(3)])
+
+
+def _tbl(N):
+    """A structured array with 2 class fields, for freq"""
+    dm = _mod('datamaker')
+    np.random.seed(N % 2**31)
+    a = np.empty(N, dtype=[('A', '<i4'), ('B', 'U1')])
+    a['A'] = dm.rand_int(N, 0, 10)
+    a['B'] = dm.rand_text(N, cases=5)
+    return a
+
+
+def _data(kind, n):
+    """The data for a case, made once per kind and size"""
+    key = (kind, n)
+    if key not in _cache:
+        _cache.clear()          # keep one data set in memory
+        _cache[key] = {'pnts': _pnts, 'dem': _dem, 'stack': _stack,
+                       'tbl': _tbl}[kind](n)
+    return _cache[key]
+
+
+# ----------------------------------------------------------------------
+# (2) cases ... code section ---
+# name : (module, data kind, sizes, function(module, data) -> callable)
+_pnt_sizes = (10**3, 10**4, 10**5, 10**6, 10**7)
+_ras_sizes = (256, 1024, 4096, 8192)
+
+
+def _poly():
+    """A closed 12 sided polygon in the middle of the point extent"""
+    t = np.linspace(0, 2*np.pi, 13)
+    return np.column_stack((500 + 300*np.cos(t), 500 + 300*np.sin(t)))
+
+
+_cases = {
+    'n_near': ('analysis.near', 'pnts', (10**3, 5*10**3),
+               lambda m, d: lambda: m.n_near(d, N=3)),
+    'e_dist': ('geom', 'pnts', _pnt_sizes[:4],
+               lambda m, d: lambda: m.e_dist(d, d[:10])),
+    'crossing_num': ('geometry.pip', 'pnts', _pnt_sizes[:3],
+                     lambda m, d: lambda: m.crossing_num(d, _poly())),
+    'mst': ('geometry.mst', 'pnts', (10**3, 2*10**3),
+            lambda m, d: lambda: m.mst(m._e_dist(d), copy_W=False)),
+    'slope_a': ('rasters.surface', 'dem', _ras_sizes[:3],
+                lambda m, d: lambda: m.slope_a(d, cell_size=5)),
+    'aspect_a': ('rasters.surface', 'dem', _ras_sizes[:3],
+                 lambda m, d: lambda: m.aspect_a(d, cell_size=5)),
+    'hillshade_a': ('rasters.surface', 'dem', _ras_sizes[:3],
+                    lambda m, d: lambda: m.hillshade_a(d, cell_size=5)),
+    'a_filter': ('image', 'dem', _ras_sizes[:3],
+                 lambda m, d: lambda: m.a_filter(d, mode=1)),
+    'combine_': ('rasters.grid', 'stack', _ras_sizes,
+                 lambda m, d: lambda: m.combine_(*d)),
+    'stack_sum': ('rasters.grid', 'stack', _ras_sizes,
+                  lambda m, d: lambda: m.stack_sum(d)),
+    'stack_mean': ('rasters.grid', 'stack', _ras_sizes,
+                   lambda m, d: lambda: m.stack_mean(d)),
+    'stack_median': ('rasters.grid', 'stack', _ras_sizes,
+                     lambda m, d: lambda: m.stack_median(d)),
+    'stack_stats': ('rasters.grid', 'stack', _ras_sizes[:3],
+                    lambda m, d: lambda: m.stack_stats(d, ax=(1, 2))),
+    'freq': ('stats.frequency', 'tbl', _pnt_sizes[:4],
+             lambda m, d: lambda: m.freq(d, ['A', 'B'])),
+    'crosstab': ('stats.cross_tab', 'tbl', _pnt_sizes[:4],
+                 lambda m, d: lambda: m.crosstab(d['A'], d['B'])),
+    }
+
+
+# ----------------------------------------------------------------------
+# (3) run_bench ... code section ---
+def _time(fn, repeat=3, budget=2.):
+    """Best time of up to `repeat` runs, fewer if they take long"""
+    best, total = np.inf, 0.
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        t = time.perf_counter() - t
+        best, total = min(best, t), total + t
+        if total > budget:
+            break
+    return best
+
+
+def _peak(fn):
+    """Peak memory of a run, above that in use at the start"""
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    cur = tracemalloc.get_traced_memory()[0]
+    if hasattr(tracemalloc, 'reset_peak'):
+        tracemalloc.reset_peak()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] - cur
+    finally:
+        if started:
+            tracemalloc.stop()
+
+
+def run_bench(only=None, full=False, repeat=3, memory=True, prn=True):
+    """Run the benchmark cases.
+
+    Requires:
+    --------
+    `only` : list, optional
+        The case names to run, all by default
+    `full` : boolean
+        True, run every size, otherwise only the smallest
+    `repeat` : integer
+        The number of timed runs
+    `memory` : boolean
+        True, also measure the peak memory
+
+    Returns:
+    -------
+    A dictionary, `meta` (versions, machine, date), `results`
+    ({"case:size": {"time": s, "peak": bytes}}) and `skipped`, the cases
+    that couldn't be imported or raised an error ({case: why}).
+    """
+    res = {'meta': {'python': platform.python_version(),
+                    'numpy': np.__version__,
+                    'machine': platform.platform(),
+                    'date': time.strftime("%Y-%m-%d %H:%M:%S"),
+                    'full': full},
+           'results': {}, 'skipped': {}}
+    for name in (only or sorted(_cases)):
+        mod, kind, sizes, make = _cases[name]
+        try:                    # some modules run script code on import
+            with redirect_stdout(io.StringIO()):
+                m = _mod(mod)
+        except Exception as e:
+            res['skipped'][name] = "{}: {}".format(type(e).__name__, e)
+            if prn:
+                print("{:<24} skipped, {}".format(name, e))
+            continue
+        for n in (sizes if full else sizes[:1]):
+            fn = make(m, _data(kind, n))
+            key = "{}:{}".format(name, n)
+            try:
+                with redirect_stdout(io.StringIO()):
+                    r = {'time': _time(fn, repeat),
+                         'peak': _peak(fn) if memory else -1}
+            except Exception as e:
+                res['skipped'][key] = "{}: {}".format(type(e).__name__, e)
+                if prn:
+                    print("{:<24} failed, {}".format(key, e))
+                continue
+            res['results'][key] = r
+            if prn:
+                print("{:<24} {:>10.4f}s {:>14,} bytes".format(
+                    key, r['time'], r['peak']))
+    return res
+
+
+# ----------------------------------------------------------------------
+# (4) results and baselines ... code section ---
+def save_results(res, fname):
+    """Save the results of run_bench to a json file"""
+    with open(fname, 'w') as f:
+        json.dump(res, f, indent=1, sort_keys=True)
+    return fname
+
+
+def load_results(fname):
+    """Read results saved with save_results"""
+    with open(fname, 'r') as f:
+        return json.load(f)
+
+
+def _order(key):
+    """Sort "case:size" keys by case, then size"""
+    name, n = key.rsplit(":", 1)
+    return name, int(n)
+
+
+def _bytes(n):
+    """Bytes with thousands separators, - if not measured"""
+    return "-" if n < 0 else "{:,}".format(n)
+
+
+def compare(res, base, tol=0.25, min_time=1e-3):
+    """Return the regressions of `res` against `base`.
+
+    Requires:
+    --------
+    `res`, `base` : dictionaries
+        From run_bench or load_results
+    `tol` : number
+        The allowed increase, 0.25 is 25%
+    `min_time` : number
+        Times below this, in seconds, are too noisy to flag
+
+    Returns:
+    -------
+    A list of (case, 'time' or 'peak', baseline, new, ratio).
+    """
+    out = []
+    old = base['results']
+    for key in sorted(res['results'], key=_order):
+        r = res['results'][key]
+        if key not in old:
+            continue
+        for what in ('time', 'peak'):
+            b, n = old[key][what], r[what]
+            if b <= 0 or n < 0 or (what == 'time' and n < min_time):
+                continue
+            if n > b * (1. + tol):
+                out.append((key, what, b, n, n / b))
+    return out
+
+
+def bench_report(res, base=None, tol=0.25):
+    """Print the results, beside the baseline if there is one, and flag
+    the regressions.  Returns the regressions.
+    """
+    old = base['results'] if base else {}
+    hdr = "{:<24} {:>10} {:>10} {:>14} {:>14}".format(
+        'case', 'time', 'base', 'peak', 'base')
+    print("\n".join([hdr, "-"*len(hdr)]))
+    frmt = "{:<24} {:>10.4f} {:>10} {:>14} {:>14}"
+    for key in sorted(res['results'], key=_order):
+        r, b = res['results'][key], old.get(key, {})
+        print(frmt.format(key, r['time'],
+                          "{:.4f}".format(b['time']) if b else "-",
+                          _bytes(r['peak']), _bytes(b.get('peak', -1))))
+    for k, why in sorted(res['skipped'].items()):
+        print("{:<24} skipped, {}".format(k, why))
+    regs = compare(res, base, tol) if base else []
+    if regs:
+        print("\nRegressions (> {:.0%})...".format(tol))
+        for key, what, b, n, ratio in regs:
+            print("  {:<24} {:<5} {:>12.4g} -> {:<12.4g} x{:.2f}".format(
+                key, what, b, n, ratio))
+    return regs
+
+
+def _main(argv):
+    """Command line"""
+    import argparse
+    p = argparse.ArgumentParser(description="arraytools benchmarks")
+    p.add_argument('--only', nargs='*', choices=sorted(_cases))
+    p.add_argument('--full', action='store_true')
+    p.add_argument('--repeat', type=int, default=3)
+    p.add_argument('--no-memory', action='store_true')
+    p.add_argument('--out')
+    p.add_argument('--baseline', default=_baseline)
+    p.add_argument('--save-baseline', action='store_true')
+    p.add_argument('--tol', type=float, default=0.25)
+    args = p.parse_args(argv)
+    res = run_bench(args.only, args.full, args.repeat,
+                    not args.no_memory, prn=False)
+    if args.out:
+        save_results(res, args.out)
+    base = None
+    if args.save_baseline:
+        save_results(res, args.baseline)
+    elif os.path.exists(args.baseline):
+        base = load_results(args.baseline)
+    regs = bench_report(res, base, args.tol)
+    return 1 if regs else 0
+
+
+# ----------------------------------------------------------------------
+# __main__ .... code section
+if __name__ == "__main__":
+    """Optionally...
+    : - print the script source name.
+    : - run the _demo
+    """
+    sys.exit(_main(sys.argv[1:]))
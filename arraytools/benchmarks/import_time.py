@@ -0,0 +1,149 @@
+# -*- coding: UTF-8 -*-
+"""
+import_time
+===========
+
+Script :   import_time.py
+
+Author :   Dan.Patterson@carleton.ca
+
+Modified : 2018-07-10
+
+Purpose :  Time `import arraytools` and the first use of each module
+
+Notes :
+::
+    python import_time.py [runs]
+
+    1.  time_import   - the median time to import and use modules
+    2.  check_names   - resolve every lazy name of the package
+    3.  import_report - print both, raising if a name doesn't resolve
+
+Each case runs in a fresh python process, so nothing is cached between
+them.  The times are the median of `runs` (default 5) in milliseconds.
+Only the folder holding `arraytools` is put on the path, as it would be
+for an installed package.
+
+- import  : `import arraytools` alone
+- module  : import plus the first access of `arraytools.<module>`
+- all     : every module, as the package used to do on import
+
+Modules that can't be imported here (eg. arcpy isn't installed) are
+reported as such.  Any other failure, a name missing from its module or an
+import that only works from inside the package folder, is an error.
+
+---------------------------------------------------------------------
+"""
+# ---- imports, formats, constants ----
+import sys
+import os
+import subprocess
+
+script = sys.argv[0]  # print this should you need to locate the script
+
+__all__ = ['time_import', 'check_names', 'import_report']
+
+_pkg = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_root = os.path.dirname(_pkg)
+_code = """
+import sys, time
+sys.path.insert(0, {root!r})
+t = time.perf_counter()
+import arraytools as art
+for m in {mods!r}:
+    getattr(art, m)
+print((time.perf_counter() - t) * 1000.)
+"""
+
+
+# ----------------------------------------------------------------------
+# (1) time_import ... code section ---
+def time_import(mods=(), runs=5):
+    """Median time, in ms, to import arraytools then access `mods`.
+    None if the import fails.
+    """
+    code = _code.format(root=_root, mods=list(mods))
+    times = []
+    for _ in range(runs):
+        r = subprocess.run([sys.executable, "-c", code],
+                           stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if r.returncode != 0:
+            return None
+        times.append(float(r.stdout.decode().strip().splitlines()[-1]))
+    times.sort()
+    return times[len(times) // 2]
+
+
+def _missing(e):
+    """True if ImportError `e` is for a package that isn't installed, rather
+    than for a module of arraytools.
+    """
+    top = (getattr(e, 'name', None) or '').split('.')[0]
+    if not isinstance(e, ModuleNotFoundError) or not top:
+        return False
+    own = (top == 'arraytools' or
+           os.path.exists(os.path.join(_pkg, top + '.py')) or
+           os.path.isdir(os.path.join(_pkg, top)))
+    return not own
+
+
+def check_names():
+    """Resolve every lazy name of arraytools, with only its parent folder
+    on the path.
+
+    Returns:
+    -------
+    `failed` and `skipped`, lists of (name, reason).  A name is skipped
+    when its module needs a package that isn't installed.
+    """
+    if _root not in sys.path:
+        sys.path.insert(0, _root)
+    import arraytools as art
+    names = sorted(set(art._lazy) | set(art.__mods__) | set(art._subs))
+    failed, skipped = [], []
+    for name in names:
+        try:
+            getattr(art, name)
+        except Exception as e:
+            why = "{}: {}".format(type(e).__name__, e)
+            if isinstance(e, ImportError) and _missing(e):
+                skipped.append((name, why))
+            else:
+                failed.append((name, why))
+    return failed, skipped
+
+
+def import_report(runs=5):
+    """Print the import time for the package and for each module, then
+    check that every lazy name resolves.  A RuntimeError is raised if one
+    doesn't.
+    """
+    failed, skipped = check_names()
+    import arraytools as art
+    mods = sorted(set(art.__mods__) | set(art._subs))
+    rows = [("import", time_import((), runs))]
+    rows.extend((m, time_import([m], runs)) for m in mods)
+    ok = [m for m, t in rows[1:] if t is not None]
+    rows.append(("all ({} modules)".format(len(ok)), time_import(ok, runs)))
+    print("{:<24} {:>10}".format("case", "ms"))
+    for m, t in rows:
+        print("{:<24} {:>10}".format(m, "n/a" if t is None
+                                     else "{:.1f}".format(t)))
+    print("\n{} names skipped, a package isn't installed".format(
+        len(skipped)))
+    for name, why in failed:
+        print("{:<24} failed, {}".format(name, why))
+    if failed:
+        raise RuntimeError("{} names don't resolve: {}".format(
+            len(failed), ", ".join(name for name, why in failed)))
+    return rows
+
+
+# ----------------------------------------------------------------------
+# __main__ .... code section
+if __name__ == "__main__":
+    """Optionally...
+    : - print the script source name.
+    : - run the _demo
+    """
+    import_report(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,299 @@
+# -*- coding: UTF-8 -*-
+"""
+chunk_io.py
+===========
+
+Script :   chunk_io.py
+
+Author :   Dan.Patterson@carleton.ca
+
+Modified : 2018-07-10
+
+Purpose :  Chunked, compressed, appendable storage of structured arrays
+
+Notes :
+::
+    1.  arr_chunks  - save, or append, a structured array
+    2.  chunks_arr  - read rows and/or fields back to an array
+    3.  chunks_info - the tables, dtypes and row counts in a file
+
+Files ending in .h5 or .hdf5 are written with h5py, as a resizable, chunked,
+gzip compressed dataset per table (see h5py_testing.py).  Unicode fields are
+stored as utf-8 bytes and decoded on reading.
+
+Anything else uses a container needing only the standard library:
+::
+    name.chk  : the compressed data
+    name.json : the index, the dtype, and for each chunk its row count and
+                the offset and length of every field
+
+- Every field of every chunk is compressed separately with zlib, so reading
+  a few fields only reads and decompresses those.
+- Appending adds new chunks to the end of name.chk and updates the index,
+  nothing already written is read or rewritten.
+- Chunks are decompressed in a thread pool, zlib releases the GIL.
+
+References :
+
+  http://docs.h5py.org/en/latest/high/dataset.html
+
+---------------------------------------------------------------------
+"""
+# ---- imports, formats, constants ----
+import sys
+import os
+import json
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+
+ft = {'bool': lambda x: repr(x.astype(np.int32)),
+      'float_kind': '{: 0.3f}'.format}
+np.set_printoptions(edgeitems=10, linewidth=80, precision=2, suppress=True,
+                    threshold=100, formatter=ft)
+np.ma.masked_print_option.set_display('-')  # change to a single -
+
+script = sys.argv[0]  # print this should you need to locate the script
+
+__all__ = ['arr_chunks', 'chunks_arr', 'chunks_info']
+
+
+# ----------------------------------------------------------------------
+# ---- helpers ----
+def _is_h5(fname):
+    """True if the file is to be handled by h5py"""
+    if not fname.lower().endswith(('.h5', '.hdf5')):
+        return False
+    if h5py is None:
+        raise ImportError("h5py is required for {}".format(fname))
+    return True
+
+
+def _paths(fname):
+    """The data and index files of a standard library container"""
+    base = os.path.splitext(fname)[0]
+    return base + ".chk", base + ".json"
+
+
+def _load_index(fname):
+    """Read the index, an empty one if the file doesn't exist"""
+    idx = _paths(fname)[1]
+    if not os.path.exists(idx):
+        return {'tables': {}}
+    with open(idx, 'r') as f:
+        return json.load(f)
+
+
+def _save_index(idx, fname):
+    """Write the index, replacing the old one in a single step"""
+    tmp = _paths(fname)[1] + ".tmp"
+    with open(tmp, 'w') as f:
+        json.dump(idx, f)
+    os.replace(tmp, _paths(fname)[1])
+
+
+def _rows(rows, N):
+    """(start, stop) from a slice or None"""
+    if rows is None:
+        return 0, N
+    start, stop, step = rows.indices(N)
+    if step != 1:
+        raise ValueError("Only contiguous row ranges are supported")
+    return start, max(start, stop)
+
+
+def _h5_dtype(dt):
+    """Replace unicode fields with utf-8 byte fields for h5py"""
+    return np.dtype([(n, 'S{}'.format(dt[n].itemsize) if dt[n].kind == 'U'
+                      else dt[n]) for n in dt.names])
+
+
+def _h5_encode(a):
+    """Encode the unicode fields of `a` to utf-8 bytes"""
+    b = np.empty(a.shape, dtype=_h5_dtype(a.dtype))
+    for n in a.dtype.names:
+        b[n] = np.char.encode(a[n], 'utf-8') if a.dtype[n].kind == 'U' \
+            else a[n]
+    return b
+
+
+# ----------------------------------------------------------------------
+# (1) arr_chunks ... code section ---
+def arr_chunks(a, fname, key='table', append=False, chunk=2**16, level=1,
+               workers=None):
+    """Save a structured array, or append it to a table already saved.
+
+    Requires:
+    --------
+    `a` : structured array
+    `fname` : string
+        The output file, *.h5/*.hdf5 for h5py, otherwise any name, eg.
+        "c:/temp/sample.chk"
+    `key` : string
+        The table name, several tables can share a file
+    `append` : boolean
+        True, add the rows to the end of the table.  The dtype must match.
+    `chunk` : integer
+        The number of rows per chunk
+    `level` : integer
+        The compression level, 0-9
+
+    >>> arr_chunks(batch, "c:/temp/ingest.chk", append=True)
+    """
+    if _is_h5(fname):
+        return _h5_write(a, fname, key, append, chunk, level)
+    idx = _load_index(fname)
+    tbl = idx['tables'].get(key)
+    if tbl is not None and append:
+        if np.dtype([tuple(i) for i in tbl['dtype']]) != a.dtype:
+            raise ValueError("dtype {} doesn't match the table {}".format(
+                a.dtype, tbl['dtype']))
+    else:
+        tbl = {'dtype': a.dtype.descr, 'rows': 0, 'chunks': []}
+        idx['tables'][key] = tbl
+    names = a.dtype.names
+    data = _paths(fname)[0]
+
+    def _enc(s):
+        b = a[s:s + chunk]
+        return [zlib.compress(np.ascontiguousarray(b[n]).tobytes(), level)
+                for n in names]
+    mode = 'ab' if os.path.exists(data) else 'wb'
+    with ThreadPoolExecutor(workers) as ex, open(data, mode) as f:
+        pos = f.seek(0, 2)
+        starts = range(0, len(a), chunk)
+        for s, blobs in zip(starts, ex.map(_enc, starts)):
+            flds = []
+            for b in blobs:
+                f.write(b)
+                flds.append([pos, len(b)])
+                pos += len(b)
+            tbl['chunks'].append({'rows': min(chunk, len(a) - s),
+                                  'fields': flds})
+    tbl['rows'] += len(a)
+    _save_index(idx, fname)
+    return fname
+
+
+def _h5_write(a, fname, key, append, chunk, level):
+    """arr_chunks using h5py"""
+    b = _h5_encode(a)
+    with h5py.File(fname, 'a') as f:
+        if append and key in f:
+            d = f[key]
+            if d.dtype != b.dtype:
+                raise ValueError("dtype {} doesn't match the table {}".format(
+                    a.dtype, d.dtype))
+            n = d.shape[0]
+            d.resize((n + len(b),))
+            d[n:] = b
+        else:
+            if key in f:
+                del f[key]
+            d = f.create_dataset(key, data=b, maxshape=(None,),
+                                 chunks=(max(1, min(chunk, len(b))),),
+                                 compression='gzip',
+                                 compression_opts=level)
+            d.attrs['dtype'] = json.dumps(a.dtype.descr)
+    return fname
+
+
+# ----------------------------------------------------------------------
+# (2) chunks_arr ... code section ---
+def chunks_arr(fname, key='table', flds="*", rows=None, workers=None):
+    """Read a table saved with `arr_chunks`.
+
+    Requires:
+    --------
+    `fname`, `key` : string
+        The file and table name
+    `flds` : fields
+        "*" for all, or a list of field names.  Only these are decompressed.
+    `rows` : slice, optional
+        A range of rows, eg. slice(10000, 20000).  Only the chunks holding
+        them are read.
+    `workers` : integer, optional
+        The threads used to decompress the chunks
+
+    >>> a = chunks_arr("c:/temp/ingest.chk", flds=['Town', 'Time'],
+    ...                rows=slice(0, 1000))
+    """
+    if _is_h5(fname):
+        return _h5_read(fname, key, flds, rows)
+    tbl = _load_index(fname)['tables'][key]
+    dt = np.dtype([tuple(i) for i in tbl['dtype']])
+    names = list(dt.names) if flds == "*" else \
+        [n for n in dt.names if n in flds]
+    cols = [dt.names.index(n) for n in names]
+    r0, r1 = _rows(rows, tbl['rows'])
+    out = np.empty((r1 - r0,), dtype=[(n, dt[n]) for n in names])
+    if r1 == r0:
+        return out
+    counts = np.array([c['rows'] for c in tbl['chunks']])
+    ends = np.cumsum(counts)
+    begs = ends - counts
+    first = int(np.searchsorted(ends, r0, side='right'))
+    last = int(np.searchsorted(begs, r1, side='left'))
+    jobs = []
+    with open(_paths(fname)[0], 'rb') as f:
+        for c in range(first, last):
+            for n, j in zip(names, cols):
+                off, leng = tbl['chunks'][c]['fields'][j]
+                f.seek(off)
+                jobs.append((c, n, f.read(leng)))
+
+    def _dec(job):
+        c, n, blob = job
+        v = np.frombuffer(zlib.decompress(blob), dtype=dt[n])
+        s0, s1 = max(r0, begs[c]), min(r1, ends[c])
+        out[n][s0 - r0:s1 - r0] = v[s0 - begs[c]:s1 - begs[c]]
+    with ThreadPoolExecutor(workers) as ex:
+        list(ex.map(_dec, jobs))
+    return out
+
+
+def _h5_read(fname, key, flds, rows):
+    """chunks_arr using h5py"""
+    with h5py.File(fname, 'r') as f:
+        d = f[key]
+        dt = np.dtype([tuple(i) for i in json.loads(d.attrs['dtype'])])
+        names = list(dt.names) if flds == "*" else \
+            [n for n in dt.names if n in flds]
+        r0, r1 = _rows(rows, d.shape[0])
+        out = np.empty((r1 - r0,), dtype=[(n, dt[n]) for n in names])
+        for n in names:
+            v = d.fields(n)[r0:r1]
+            out[n] = np.char.decode(v, 'utf-8') if dt[n].kind == 'U' else v
+    return out
+
+
+def chunks_info(fname):
+    """Return {table: (dtype, rows)} for the tables in a file"""
+    if _is_h5(fname):
+        with h5py.File(fname, 'r') as f:
+            return dict((k, (np.dtype([tuple(i) for i in
+                                       json.loads(f[k].attrs['dtype'])]),
+                             f[k].shape[0])) for k in f)
+    tbls = _load_index(fname)['tables']
+    return dict((k, (np.dtype([tuple(i) for i in v['dtype']]), v['rows']))
+                for k, v in tbls.items())
+
+
+# ----------------------------------------------------------------------
+# __main__ .... code section
+if __name__ == "__main__":
+    """Optionally...
+    : - print the script source name.
+    : - run the _demo
+    """
+#    print("Script... {}".format(script))
+#    a = np.load(r"C:\Git_Dan\arraytools\Data\sample_1000.npy")
+#    arr_chunks(a, r"C:\Git_Dan\arraytools\Data\sample.chk")
+#    b = chunks_arr(r"C:\Git_Dan\arraytools\Data\sample.chk",
+#                   flds=['Town', 'Time'], rows=slice(100, 200))
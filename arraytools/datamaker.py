@@ -17,6 +17,7 @@ import sys
 from functools import wraps
 import numpy as np
 import numpy.lib.recfunctions as rfn
+from arraytools.tools import xy_view
 # Required imports
 
 ft = {'bool': lambda x: repr(x.astype(np.int32)),
@@ -175,22 +176,15 @@ def pnts_IdShape(N=10, x_min=0, x_max=10, y_min=0, y_max=10, simple=True):
     :  http://stackoverflow.com/questions/32224220/
     :    methods-of-creating-a-structured-array
     """
-    Xs = np.random.randint(x_min, x_max, size=N)
-    Ys = np.random.randint(y_min, y_max, size=N)
-    IDs = np.arange(0, N)
-    c_stack = np.column_stack((IDs, Xs, Ys))
     if simple:     # version 1  short version, optional form
         dt = [('ID', '<i4'), ('X', '<f8'), ('Y', '<f8')]
-        a = np.ones(N, dtype=dt)
-        a['ID'] = c_stack[:, 0]
-        a['X'] = c_stack[:, 1]         # this line too
-        a['Y'] = c_stack[:, 2]
     else:          # version 2
         dt = [('ID', '<i4'), ('Shape', ([('X', '<f8'), ('Y', '<f8')]))]
-        a = np.ones(N, dtype=dt)
-        a['ID'] = c_stack[:, 0]
-        a['Shape']['X'] = c_stack[:, 1]
-        a['Shape']['Y'] = c_stack[:, 2]
+    a = np.empty(N, dtype=dt)
+    a['ID'] = np.arange(0, N)
+    xy = xy_view(a)                    # the X, Y fields in place
+    xy[:, 0] = np.random.randint(x_min, x_max, size=N)
+    xy[:, 1] = np.random.randint(y_min, y_max, size=N)
     return a
 
 
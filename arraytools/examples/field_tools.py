@@ -67,6 +67,7 @@ import sys
 import numpy as np
 from numpy.lib import recfunctions as rfn
 from textwrap import dedent
+from arraytools.tools import struct_view
 np.set_printoptions(edgeitems=4, linewidth=80, precision=2,
                     suppress=True, threshold=100,
                     formatter={'float': '{: 0.3f}'.format})
@@ -110,20 +111,15 @@ def nd_struct(a):
     :Returns
     :-------
     : array with reordered fields and/or sliced by row or column as specified
+    :  a view of `a` where possible, see tools.struct_view
     :
     """
     if a.ndim != 2:
         print("A 2D ndarray is required")
         return a
-    rows, cols = a.shape
-    dt_name = a.dtype.name
+    cols = a.shape[1]
     fld_names = list("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz")[:cols]
-    dt = [(i, dt_name) for i in fld_names]
-    aa = np.zeros((rows,), dtype=dt)
-    names = aa.dtype.names
-    for i in range(a.shape[1]):
-        aa[names[i]] = a[:, i]
-    return aa
+    return struct_view(a, fld_names)
 
 
 def alter_flds(a, order=[]):
@@ -501,6 +501,8 @@ def join_arr_fc(a, in_fc, out_fld='Result_', OID_fld='OID@'):
     ExtendTable (in_table, table_match_field,
                  in_array, array_match_field, {append_only})
 
+    See `tools.join_arrs` to join arrays to arrays, eg. a table read with
+    `apt.tbl_arr`, in memory.
     """
     N = len(a)
     dt_a = [('IDs', '<i4'), (out_fld, a.dtype.str)]
@@ -443,7 +443,94 @@ def _chunks(s, n):
 
 # ----------------------------------------------------------------------
 # (2) frmt_ .... code section
-def frmt_(a, deci=2, wdth=100, title="Array", prefix="  .", prn=True):
+def _frmt_lines(a, deci=2, wdth=100, title="Array", prefix="  .",
+                edge=None):
+    """Yield the lines of `frmt_`, one at a time.  See `frmt_` for the
+    parameters.
+
+    Notes:
+    -----
+    The format is made once, from a.min() and a.max().  Only the planes
+    that fit within `wdth` are formatted, and with `edge`, only the first
+    and last `edge` rows and blocks.
+    """
+    a = np.asanyarray(a)
+    a_dim, a_kind = a.ndim, a.dtype.kind
+    if a_dim < 2:
+        yield "Array is not >= 2D"
+        return
+    if a_kind not in ('i', 'f'):
+        yield "Only integer and float arrays with ndim >= 2 supported"
+        return
+    a_min, a_max = a.min(), a.max()
+    fv = ""
+    if np.ma.isMaskedArray(a):
+        fv = ", masked array, fill value {}".format(a.get_fill_value())
+        a = a.data
+    if a_dim == 2:
+        a = a.reshape((1,) + a.shape)
+        a_dim = a.ndim
+    a_shp = a.shape
+    yield "{}...".format(title)
+    yield "-shape {}, ndim {}{}".format(a_shp, a_dim, fv)
+    d, r, c = a_shp[-3:]
+    if a_kind == 'f':
+        w_, m_ = [':{}.{}f', '{:0.{}f}']
+    else:
+        w_, m_ = [':{}.0f', '{:0.0f}']
+    m = max(len(m_.format(a_max, deci)), len(m_.format(a_min, deci))) + 1
+    d_w = c*m + 2                          # the width of one plane
+    k = min(d, -(-wdth // d_w))            # the planes that will show
+    r_fmt = (('{' + w_.format(m, deci) + '}') * c + '  ') * k
+    end = ["", "...."][d*d_w > wdth]
+    #
+    def _idx(n):
+        """the indices to show along an axis of length n"""
+        if edge is None or n <= 2*edge:
+            return list(range(n))
+        return list(range(edge)) + [None] + list(range(n - edge, n))
+    #
+    def _rows(b):
+        """the rows of a 3D block, b[:k, i, :] for each row i"""
+        for i in _idx(r):
+            if i is None:
+                yield prefix + " ..."
+            else:
+                yield prefix + r_fmt.format(*b[:k, i, :].ravel())[:wdth] + end
+    #
+    def _blocks(b):
+        """4D, a header then the rows of each 3D block"""
+        for j in _idx(b.shape[0]):
+            if j is None:
+                yield "..."
+                continue
+            if a_dim == 5:
+                yield "--(.., {}, + ({}, {}, {})".format(j, d, r, c)
+            else:
+                yield "-"*25
+                yield "-({}, + ({}, {}, {})".format(j, d, r, c)
+            for ln in _rows(b[j]):
+                yield ln
+    #
+    if a_dim == 3:
+        for ln in _rows(a):
+            yield ln
+    elif a_dim == 4:
+        for ln in _blocks(a):
+            yield ln
+    else:
+        for i in _idx(a_shp[0]):
+            if i is None:
+                yield "..."
+                continue
+            yield "-"*25
+            yield "--({}, ..".format(i)
+            for ln in _blocks(a[i]):
+                yield ln
+
+
+def frmt_(a, deci=2, wdth=100, title="Array", prefix="  .", prn=True,
+          edge=None):
     """Format number arrays by row, and print
 
     Requires:
@@ -457,6 +544,9 @@ def frmt_(a, deci=2, wdth=100, title="Array", prefix="  .", prn=True):
         length will be truncated with a warning.  Reshape to overcome.
     `title` : text
         The default title, change to provide more information.
+    `edge` : int, optional
+        Like numpy's edgeitems, show only the first and last `edge` rows,
+        and 3D blocks of 4D and 5D arrays, with `...` between.
 
     Returns:
     --------
@@ -464,96 +554,15 @@ def frmt_(a, deci=2, wdth=100, title="Array", prefix="  .", prn=True):
 
     Notes:
     -----
-    `w_frmt` :  width formatter
-
-    `m_frmt` :  max number formatter to get max. number of characters
+    The lines come from the generator `_frmt_lines`, they are printed as
+    they are made, so large arrays are never formatted as a whole.
     """
-    def _check(a):
-        """ check dtype and max value for formatting information"""
-        return a.shape, a.ndim, a.dtype.kind, a.max(), a.min()
-    # ----
-
-    def _concat(rows, r_fmt, wdth, prefix):
-        """print the subset to maximimum width"""
-        end = ["", "...."][len(r_fmt.format(*rows[0])) > wdth]
-        txt = prefix
-        rw = [r_fmt.format(*v)[:wdth] + end for v in rows]
-        txt += ("\n" + prefix).join(rw)  # + "\n"
-        return txt
-    # ----
-
-    def _row_format(d, r, c, a_kind, deci, a_min, a_max):
-        """Format the row based on input parameters
-        - d, r, c = a.shape[:-3]  last 3 dimensions of array shape
-        - a_kind - a.dtype.kind  array kind ie integer or float
-        """
-        if a_kind == 'f':
-            w_, m_ = [':{}.{}f', '{:0.{}f}']
-        else:
-            w_, m_ = [':{}.0f', '{:0.0f}']
-        m = max(len(m_.format(a_max, deci)), len(m_.format(a_min, deci))) + 1
-        w_fmt = w_.format(m, deci)
-        r_fmt = (('{' + w_fmt + '}') * c + '  ') * d
-        return r_fmt
-
-    def d4_frmt(a_shp, a, txt, a_dim):
-        """Dealing with 4, 5 ?D arrays"""
-        d4, d, r, c = a_shp
-        hdr = "\n" + "-"*25
-        fm = hdr + "\n-({}, + ({}, {}, {})"
-        if a_dim == 5:
-            fm = "\n--(.., {}, + ({}, {}, {})"
-        t = ""
-        for d3 in range(d4):
-            t += fm.format(d3, d, r, c) + "\n"
-            a_s = a[d3]
-            rows = [a_s[..., i, :].flatten() for i in range(r)]
-            t += _concat(rows, row_frmt, wdth, prefix)
-        return t
-    #
-    # ---- begin constructing the array format ----
-    txt = ""
-    a = np.asanyarray(a)
-    # ---- run _check ----
-    a_shp, a_dim, a_kind, a_min, a_max = _check(a)
-    if a_dim < 3:
-        if a_dim == 2:
-            a = a.reshape((1,) + a.shape)
-            a_dim = a.ndim
-            a_shp = a.shape
-        else:
-            return "Array is not >= 2D"
-    fv = ""
-    if np.ma.isMaskedArray(a):
-        fv = ", masked array, fill value {}".format(a.get_fill_value())
-        a = a.data
-    #
-    # ---- correct dtype, get formats ----
-    if (a_kind in ('i', 'f')) and (a_dim >= 3):
-        args = title, a_shp, a_dim, fv
-        txt = "{}...\n-shape {}, ndim {}{}".format(*args)
-        d, r, c = a_shp[-3:]
-        row_frmt = _row_format(d, r, c, a_kind, deci, a_min, a_max)
-        if (a_dim == 3):
-            rows = [a[..., i, :].flatten() for i in range(r)]
-            txt += "\n" + _concat(rows, row_frmt, wdth, prefix)
-        elif (a_dim == 4):
-            d4, d, r, c = a_shp
-            t = d4_frmt(a_shp, a, txt, a_dim)
-            txt += t
-        elif (a_dim == 5):
-            d5, d4, d, r, c = a_shp
-            hdr = "\n" + "-"*25
-            for i in range(d5):
-                txt += hdr + '\n--({}, ..'.format(i)
-                t = d4_frmt(a_shp[1:], a[i], txt, a_dim)
-                txt += t
-    else:
-        txt = "Only integer and float arrays with ndim >= 2 supported"
+    lines = _frmt_lines(a, deci, wdth, title, prefix, edge)
     if prn:
-        print(txt)
+        for ln in lines:
+            print(ln)
     else:
-        return txt
+        return "\n".join(lines)
 
 
 # ----------------------------------------------------------------------
@@ -636,27 +645,36 @@ def _col_format(a, c_name="c00", deci=0):
     -----
         The field is examined to determine whether it is a simple integer, a
         float type or a list, array or string.  The maximum width is determined
-        based on this type.
+        based on this type, from the min/max of numbers (ignoring nan) and the
+        longest string in the column.
 
         Checks were also added for (N,) shaped structured arrays being
         reformatted to (N, 1) shape which sometimes occurs to facilitate array
         viewing.  A kludge at best, but it works for now.
     """
     a_kind = a.dtype.kind
-    if a_kind in ('i', 'u'):  # ---- integer type
+    if a_kind in ('i', 'u') and a.ndim == 1:  # ---- integer type
         w_, m_ = [':> {}.0f', '{:> 0.0f}']
-        col_wdth = len(m_.format(a.max())) + 1
+        vals = [a.min(), a.max()] if a.size else [0]
+        col_wdth = max([len(m_.format(i)) for i in vals]) + 1
         col_wdth = max(len(c_name), col_wdth) + 1  # + deci
         c_fmt = w_.format(col_wdth, 0)
-    elif a_kind == 'f' and np.isscalar(a[0]):  # ---- float type with rounding
+    elif a_kind == 'f' and a.ndim == 1:  # ---- float type with rounding
         w_, m_ = [':> {}.{}f', '{:> 0.{}f}']
-        a_max, a_min = np.round(np.sort(a[[0, -1]]), deci)
-        col_wdth = max(len(m_.format(a_max, deci)),
-                       len(m_.format(a_min, deci))) + 1
+        fin = np.isfinite(a)
+        vals = [' nan'] if not fin.all() else []
+        if fin.any():
+            vals.extend([m_.format(np.round(f(a[fin]), deci), deci)
+                         for f in (np.min, np.max)])
+        col_wdth = max([len(i) for i in vals] + [1]) + 1
         col_wdth = max(len(c_name), col_wdth) + 1
         c_fmt = w_.format(col_wdth, deci)
     # ---- lists, arrays, strings. Check for (N,) vs (N,1)
-    # I made some changes in how col_wdth is determined, old is commented
+    elif a_kind in ('U', 'S') and a.ndim == 1:
+        col_wdth = np.char.str_len(a).max() if a.size else 0
+        col_wdth += [0, 3][a_kind == 'S']  # ---- b'' for bytes
+        col_wdth = max(len(c_name), col_wdth) + 1  # + deci
+        c_fmt = "!s:>" + "{}".format(col_wdth)
     else:
         if a.ndim == 1:  # ---- check for (N, 1) format of structured array
             a = a[0]
@@ -668,17 +686,66 @@ def _col_format(a, c_name="c00", deci=0):
     return c_fmt, col_wdth
 
 
+def _col_text(a, c_fmt, col_wdth):
+    """Format a column with the format from `_col_format`, returning an
+    array of strings.  Numbers use np.char.mod, strings np.char.rjust.
+    """
+    if c_fmt.startswith(':'):
+        deci = c_fmt.split('.')[-1][:-1]
+        return np.char.mod("% {}.{}f".format(col_wdth, deci), a)
+    if a.dtype.kind == 'U' and a.ndim == 1:
+        return np.char.rjust(a, col_wdth)
+    return np.array([("{" + c_fmt + "}").format(i) for i in a])
+
+
+def _rec_lines(a, deci=2, use_names=True, rows=None, chunk=10000):
+    """Yield the lines of `frmt_rec` one at a time.
+
+    The column widths come from min/max reductions over the rows shown.
+    Each `chunk` of rows is formatted column by column.  If `rows` is given
+    and the array is longer, the first and last rows//2 are shown.
+    """
+    if a.ndim > 1:  # ---- structured arrays reshaped to (N, 1) from (N,)
+        a = a.reshape(a.shape[0], -1)[:, 0]
+    dt_names = a.dtype.names
+    N = len(dt_names)
+    c_names = [["C{:02.0f}".format(i) for i in range(N)], dt_names][use_names]
+    n = a.shape[0]
+    segs = [(0, n)]
+    if rows is not None and n > rows:
+        segs = [(0, rows // 2), (n - rows // 2, n)]
+    shown = a if len(segs) == 1 else np.concatenate([a[s:e] for s, e in segs])
+    # ---- get the column formats from ... _col_format ----
+    fmts = [_col_format(shown[fld], c_name=nme, deci=deci)
+            for fld, nme in zip(dt_names, c_names)]
+    hdr2 = " ".join(["{!s:>" + "{}".format(w) + "}" for f, w in fmts])
+    header = "--n--" + hdr2.format(*c_names)
+    yield ""
+    yield header
+    yield "-"*len(header)
+    for k, (s, e) in enumerate(segs):
+        if k:
+            yield " ..."
+        for i in range(s, e, chunk):
+            b = a[i:min(e, i + chunk)]
+            cols = [_col_text(b[fld], f, w).tolist()
+                    for fld, (f, w) in zip(dt_names, fmts)]
+            idx = np.char.mod(" %03d ", np.arange(i, i + len(b))).tolist()
+            for j, r in zip(idx, zip(*cols)):
+                yield j + " ".join(r)
+
+
 def pd_(a, deci=2, use_names=True, prn=True):
     """see help for `frmt_rec`..."""
     ret = frmt_rec(a, deci=deci, use_names=use_names, prn=prn)
     return ret
 
 
-def frmt_rec(a, deci=2, use_names=True, prn=True):
+def frmt_rec(a, deci=2, use_names=True, prn=True, rows=None, out=None):
     """Format a structured array with a mixed dtype.
 
     NOTE : Can be called as `pd_(a, ... )` to emulate pandas dataframes
-        You should limit large arrays to a slice ie. a[:50]
+        Use `rows` to limit what is shown for large arrays.
 
     Requires:
     -------
@@ -691,6 +758,11 @@ def frmt_rec(a, deci=2, use_names=True, prn=True):
         If no names are available, then create them
     `prn` : boolean
         True to print, False to return the string
+    `rows` : int
+        If the array is longer, only the first and last rows//2 are shown
+    `out` : file
+        An open file (or sys.stdout) to write the lines to as they are
+        formatted, rather than building the whole string.
     Notes:
     -----
         `_col_format` : does the actual work of obtaining a representation of
@@ -698,36 +770,18 @@ def frmt_rec(a, deci=2, use_names=True, prn=True):
 
         It is not really possible to deconstruct the exact number of decimals
         to use for float values, so a decision had to be made to simplify.
+
+        `_rec_lines` formats the columns a block of rows at a time.
     """
-    dt_names = a.dtype.names
-    N = len(dt_names)
-    c_names = [["C{:02.0f}".format(i) for i in range(N)], dt_names][use_names]
-    # ---- get the column formats from ... _col_format ----
-    dts = []
-    wdths = []
-    pair = list(zip(dt_names, c_names))
-    for i in range(len(pair)):
-        fld, nme = pair[i]
-        c_fmt, col_wdth = _col_format(a[fld], c_name=nme, deci=deci)
-        dts.append(c_fmt)
-        wdths.append(col_wdth)
-    row_frmt = " ".join([('{' + i + '}') for i in dts])
-    hdr = ["!s:>" + "{}".format(wdths[i]) for i in range(N)]
-    hdr2 = " ".join(["{" + hdr[i] + "}" for i in range(N)])
-    header = "--n--" + hdr2.format(*c_names)
-    header = "\n{}\n{}".format(header, "-"*len(header))
-    txt = [header]
-    # ---- check for structured arrays reshaped to (N, 1) instead of (N,) ----
-    len_shp = len(a.shape)
-    idx = 0
-    for i in range(a.shape[0]):
-        if len_shp == 1:  # ---- conventional (N,) shaped array
-            row = " {:03.0f} ".format(idx) + row_frmt.format(*a[i])
-        else:             # ---- reformatted to (N, 1)
-            row = " {:03.0f} ".format(idx) + row_frmt.format(*a[i][0])
-        idx += 1
-        txt.append(row)
-    msg = "\n".join([i for i in txt])
+    lines = _rec_lines(a, deci=deci, use_names=use_names, rows=rows)
+    if out is not None:
+        from itertools import islice
+        blk = list(islice(lines, 10000))
+        while blk:
+            out.write("\n".join(blk) + "\n")
+            blk = list(islice(lines, 10000))
+        return None
+    msg = "\n".join(lines)
     if prn:
         print(msg)
     else:
@@ -0,0 +1,369 @@
+# -*- coding: UTF-8 -*-
+"""
+geojson_io.py
+=============
+
+Script :   geojson_io.py
+
+Author :   Dan.Patterson@carleton.ca
+
+Modified : 2018-07-10
+
+Purpose :  Read and write GeoJSON from numpy arrays without arcpy
+
+Notes :
+::
+    1.  geojson_arr - geometry and attributes to structured arrays
+    2.  geojson_chunks - the same, a batch of features at a time
+    3.  arr_geojson - write geometry and attributes to GeoJSON
+
+The geometry array has the same layout as `apt.arc_np` and `shp_io.shp_arr`
+::
+    dt = [('ID_num', '<i4'), ('Part_num', '<i4'), ('Xs', '<f8'), ('Ys', '<f8')]
+
+- `ID_num` is the feature position (0-based), `FID` in the attribute array.
+- `Part_num` is the ring/line number within the feature.  MultiPolygon rings
+  are numbered sequentially.  For MultiPoint, it is the point number.
+- Z values are dropped.  Features without geometry contribute no rows.
+
+`geojson_chunks` and `arr_geojson` stream, so memory use depends on the
+chunk size rather than the number of features.
+
+References :
+
+  https://tools.ietf.org/html/rfc7946
+
+---------------------------------------------------------------------
+"""
+# ---- imports, formats, constants ----
+import sys
+import json
+import numpy as np
+from arraytools.a_io import json_items, _json_vals
+from arraytools.shp_io import _geom_parts, _outer_rings
+
+
+ft = {'bool': lambda x: repr(x.astype(np.int32)),
+      'float_kind': '{: 0.3f}'.format}
+np.set_printoptions(edgeitems=10, linewidth=80, precision=2, suppress=True,
+                    threshold=100, formatter=ft)
+np.ma.masked_print_option.set_display('-')  # change to a single -
+
+script = sys.argv[0]  # print this should you need to locate the script
+
+__all__ = ['arr_geojson', 'geojson_arr', 'geojson_chunks', 'props_arr']
+
+dt_geom = [('ID_num', '<i4'), ('Part_num', '<i4'),
+           ('Xs', '<f8'), ('Ys', '<f8')]
+
+
+# ----------------------------------------------------------------------
+# ---- helpers ----
+def _parts(geom):
+    """Return the list of parts (each a list of coordinates) for a geometry
+    dictionary.  GeometryCollections are expanded in order.
+    """
+    if not geom:
+        return []
+    kind = geom['type']
+    c = geom.get('coordinates')
+    if kind == 'Point':
+        return [[c]]
+    if kind in ('MultiPoint',):
+        return [[p] for p in c]
+    if kind == 'LineString':
+        return [c]
+    if kind in ('MultiLineString', 'Polygon'):
+        return list(c)
+    if kind == 'MultiPolygon':
+        return [ring for poly in c for ring in poly]
+    if kind == 'GeometryCollection':
+        return [p for g in geom['geometries'] for p in _parts(g)]
+    raise ValueError("Unsupported geometry type {}".format(kind))
+
+
+def _features(obj):
+    """Return a list of features from a FeatureCollection, Feature or bare
+    geometry.
+    """
+    kind = obj.get('type')
+    if kind == 'FeatureCollection':
+        return obj['features']
+    if kind == 'Feature':
+        return [obj]
+    return [{'type': 'Feature', 'geometry': obj, 'properties': {}}]
+
+
+def _to_xy(pnts):
+    """Convert a list of coordinate lists to an (N, 2) array, dropping Z"""
+    if not pnts:
+        return np.zeros((0, 2), dtype='<f8')
+    try:
+        xy = np.asarray(pnts, dtype='<f8')
+    except ValueError:          # mixed 2D and 3D coordinates
+        xy = np.asarray([p[:2] for p in pnts], dtype='<f8')
+    return xy[:, :2]
+
+
+# ----------------------------------------------------------------------
+# (1) props_arr ... code section ---
+def props_arr(props, flds="*", dtype=None):
+    """Convert a list of property dictionaries to a structured array.
+
+    The dtype of each field is determined from all of its values, unless a
+    `dtype` is given, in which case its fields are returned with its types
+    (text longer than a field is truncated).  Nulls follow
+    `apt.tbl_2_np_array`, the minimum int32 for integers, nan for floats and
+    'None' for strings.
+    """
+    if dtype is not None:
+        dtype = np.dtype(dtype)
+        names = [n for n in dtype.names if n != 'FID']
+    else:
+        names = []
+        for p in props:
+            for k in (p or {}):
+                if k not in names:
+                    names.append(k)
+        if flds != "*":
+            names = [n for n in names if n in flds]
+    N = len(props)
+    dt = [('FID', '<i4')]
+    cols = [np.arange(N)]
+    int_min = np.iinfo(np.int32).min
+    for n in names:
+        vals = [(p or {}).get(n) for p in props]
+        if dtype is None:
+            kinds = set(type(v) for v in vals if v is not None)
+            kind = ('b' if kinds and kinds <= {bool} else
+                    'i' if kinds and kinds <= {int} else
+                    'f' if kinds and kinds <= {int, float} else 'U')
+        else:
+            kind = dtype[n].kind
+        if kind == 'b':
+            col = np.array([bool(v) for v in vals], dtype=bool)
+        elif kind in 'iu':
+            col = np.array([int_min if v is None else v for v in vals])
+            if dtype is None and (col.min() >= int_min and
+                                  col.max() <= np.iinfo(np.int32).max):
+                col = col.astype('<i4')
+        elif kind in 'fc':
+            col = np.array([np.nan if v is None else v for v in vals],
+                           dtype='<f8')
+        else:
+            col = np.array(["None" if v is None else
+                            (json.dumps(v) if isinstance(v, (dict, list))
+                             else str(v)) for v in vals])
+            if N == 0:
+                col = col.astype('U1')
+        if dtype is not None:
+            col = col.astype(dtype[n])
+        dt.append((n, col.dtype.str))
+        cols.append(col)
+    a = np.empty((N,), dtype=dt)
+    for n, c in zip(a.dtype.names, cols):
+        a[n] = c
+    return a
+
+
+# ----------------------------------------------------------------------
+# (2) geojson_arr ... code section ---
+def geojson_arr(in_file, flds="*"):
+    """Read a GeoJSON file to a geometry array and an attribute array.
+
+    Requires:
+    --------
+    `in_file` : string
+        The path to the GeoJSON file (a FeatureCollection, Feature or a
+        geometry)
+    `flds` : fields
+        - "*" all properties or
+        - ['Field1', 'Field2', etc] for specific properties
+
+    Returns:
+    -------
+    A structured array with ID_num, Part_num, Xs, Ys fields, one row per
+    point, and a structured array of the properties with an FID field.
+
+    Notes:
+    -----
+    The parts of all features are collected first, then the coordinates are
+    converted to one array in a single call.  The ID_num and Part_num values
+    are produced with np.repeat from the part lengths.
+    """
+    with open(in_file, 'r', encoding='utf-8') as f:
+        obj = json.load(f)
+    return _feats_arr(_features(obj), flds)
+
+
+def _feats_arr(feats, flds="*", fid=0, dtype=None):
+    """geojson_arr for a list of features, numbered from `fid`"""
+    pnts = []
+    p_len = []
+    p_fid = []
+    p_num = []
+    for i, feat in enumerate(feats, fid):
+        parts = _parts(feat.get('geometry'))
+        for j, prt in enumerate(parts):
+            pnts.extend(prt)
+            p_len.append(len(prt))
+            p_fid.append(i)
+            p_num.append(j)
+    xy = _to_xy(pnts)
+    a = np.empty((len(xy),), dtype=dt_geom)
+    a['ID_num'] = np.repeat(np.asarray(p_fid, dtype='<i4'), p_len)
+    a['Part_num'] = np.repeat(np.asarray(p_num, dtype='<i4'), p_len)
+    a['Xs'] = xy[:, 0]
+    a['Ys'] = xy[:, 1]
+    b = props_arr([feat.get('properties') for feat in feats], flds=flds,
+                  dtype=dtype)
+    b['FID'] += fid
+    return a, b
+
+
+def geojson_chunks(in_file, chunk=10000, flds="*", dtype=None):
+    """Read a GeoJSON FeatureCollection `chunk` features at a time.
+
+    Yields the geometry and attribute arrays of `geojson_arr` for each batch.
+    ID_num and FID continue from batch to batch.  The attribute dtype is
+    `dtype` if given, otherwise it is taken from the first batch, and every
+    batch is returned with it.  Pass a `dtype` with wide enough text fields
+    if later features may hold longer values, or other properties.
+
+    >>> for a, b in geojson_chunks(in_file, chunk=50000):
+    ...     arr_chunks(b, "c:/temp/attrs.chk", append=True)
+    """
+    from itertools import islice
+    feats = json_items(in_file, key='features')
+    fid = 0
+    while True:
+        batch = list(islice(feats, chunk))
+        if not batch:
+            break
+        a, b = _feats_arr(batch, flds, fid, dtype)
+        dtype = b.dtype
+        yield a, b
+        fid += len(batch)
+
+
+# ----------------------------------------------------------------------
+# (3) arr_geojson ... code section ---
+geo_types = {'Point': 'Point', 'Multipoint': 'MultiPoint',
+             'Polyline': 'LineString', 'Polygon': 'Polygon'}
+
+
+def arr_geojson(a, out_file, b=None, shp_type='Polygon',
+                flds=('ID_num', 'Part_num', 'Xs', 'Ys'), chunk=10000):
+    """Write geometry, and optionally attributes, to a GeoJSON file.
+
+    Requires:
+    --------
+    `a` : geometry
+        Any geometry accepted by `shp_io.arr_shp`, eg. the `arc_np` layout
+    `out_file` : string
+        The output *.geojson file
+    `b` : structured array, optional
+        The properties, one row per shape.  If None, `Id` holds the ids.
+        An FID field is not written.
+    `shp_type` : string
+        'Point', 'Multipoint', 'Polyline' or 'Polygon'.  Polylines with more
+        than one part are written as MultiLineStrings.  A polygon shape with
+        more than one outer ring is written as a MultiPolygon.
+    `chunk` : integer
+        The number of features formatted and written at a time
+
+    Notes:
+    -----
+    The coordinates and numeric properties of a chunk are formatted as text
+    column by column with `astype`, then joined, so only one chunk of
+    features is held as text.  nan becomes null.
+
+    Polygon rings follow the shapefile convention, a clockwise ring starts a
+    polygon and the counterclockwise rings after it are its holes.  They
+    are then written with the RFC 7946 orientation, outer rings
+    counterclockwise and holes clockwise.
+    """
+    if shp_type not in geo_types:
+        raise ValueError("shp_type must be in {}".format(list(geo_types)))
+    kind = geo_types[shp_type]
+    xy, p_len, p_rec, ids = _geom_parts(a, flds,
+                                        1 if shp_type == 'Point' else 0)
+    n = len(ids)
+    p_beg = np.cumsum(p_len) - p_len
+    if kind == 'Polygon':
+        outer, area = _outer_rings(xy, p_len, p_rec)
+        flip = np.where(outer, area < 0, area > 0)
+        if flip.any():                # reverse the rings in place
+            pid = np.repeat(np.arange(len(p_len)), p_len)
+            idx = np.arange(len(xy))
+            f = flip[pid]
+            idx[f] = (2 * p_beg[pid] + p_len[pid] - 1 - idx)[f]
+            xy = xy[idx]
+        outer = outer.tolist()
+    if b is None:
+        b = np.zeros((n,), dtype=[('Id', '<i4')])
+        b['Id'] = ids
+    if len(b) != n:
+        raise ValueError("{} rows for {} shapes".format(len(b), n))
+    names = [i for i in b.dtype.names if i != 'FID']
+    keys = [json.dumps(i) + ": " for i in names]
+    n_prts = np.bincount(p_rec, minlength=n)
+    prt_0 = np.cumsum(n_prts) - n_prts
+    with open(out_file, 'w', encoding='utf-8') as f:
+        f.write('{"type": "FeatureCollection",\n"features": [')
+        for r0 in range(0, n, chunk):
+            r1 = min(n, r0 + chunk)
+            pa, pb = prt_0[r0], prt_0[r1 - 1] + n_prts[r1 - 1]
+            q0 = p_beg[pa]
+            q1 = p_beg[pb - 1] + p_len[pb - 1]
+            sx = _json_vals(xy[q0:q1, 0]).tolist()
+            sy = _json_vals(xy[q0:q1, 1]).tolist()
+            pt = ["[" + x + ", " + y + "]" for x, y in zip(sx, sy)]
+            prts = [", ".join(pt[p_beg[j] - q0:p_beg[j] - q0 + p_len[j]])
+                    for j in range(pa, pb)]
+            cols = [_json_vals(b[i][r0:r1]).tolist() for i in names]
+            feats = []
+            for k, r in enumerate(range(r0, r1)):
+                g = prts[prt_0[r] - pa:prt_0[r] - pa + n_prts[r]]
+                t = kind
+                if kind == 'Point':
+                    c = g[0]
+                elif kind == 'MultiPoint':
+                    c = "[" + ", ".join(g) + "]"
+                elif kind == 'LineString' and len(g) == 1:
+                    c = "[" + g[0] + "]"
+                elif kind == 'Polygon':
+                    polys = []
+                    for i, o in zip(g, outer[prt_0[r]:prt_0[r] + n_prts[r]]):
+                        if o:
+                            polys.append([])
+                        polys[-1].append("[" + i + "]")
+                    polys = ["[" + ", ".join(i) + "]" for i in polys]
+                    if len(polys) > 1:
+                        t = 'MultiPolygon'
+                        c = "[" + ", ".join(polys) + "]"
+                    else:
+                        c = polys[0] if polys else "[]"
+                else:
+                    t = 'MultiLineString' if kind == 'LineString' else kind
+                    c = "[" + ", ".join(["[" + i + "]" for i in g]) + "]"
+                props = ", ".join([key + col[k]
+                                   for key, col in zip(keys, cols)])
+                feats.append('{"type": "Feature", "geometry": {"type": "' +
+                             t + '", "coordinates": ' + c + '}, ' +
+                             '"properties": {' + props + '}}')
+            f.write(("," if r0 else "") + "\n" + ",\n".join(feats))
+        f.write("\n]}\n")
+    return out_file
+
+
+# ----------------------------------------------------------------------
+# __main__ .... code section
+if __name__ == "__main__":
+    """Optionally...
+    : - print the script source name.
+    : - run the _demo
+    """
+#    print("Script... {}".format(script))
+#    in_file = r"C:\Git_Dan\a_Data\Carp_5x5km.geojson"
+#    a, b = geojson_arr(in_file)
@@ -42,6 +42,8 @@ See ein_geom.py for full details and examples
 import sys
 from textwrap import dedent
 import numpy as np
+from arraytools.instrument import profiled
+from arraytools.tools import xy_view
 
 # from arraytools.tools import arr2xyz
 # from arraytools.fc import _xy
@@ -72,7 +74,7 @@ __all__ = ['_flat_', '_unpack',
            'simplify',
            'rotate',  'repeat',
            'circle', 'ellipse',
-           'rectangle', 'hex_flat', 'hex_pointy'
+           'rectangle', 'hex_flat', 'hex_pointy', 'hex_bin'
            ]
 
 
@@ -115,15 +117,16 @@ def _new_view_(a):
     NOTE:  see _view_ for the same functionality
     """
     if (len(a.dtype) > 1):
-        shp = a.shape[0]
-        a = a.view(dtype='float64')
-        a = a.reshape(shp, 2)
+        a = xy_view(a)
     return a
 
 
 def _view_(a):
-    """Return a view of the array using the dtype and length"""
-    return a.view((a.dtype[0], len(a.dtype.names)))
+    """Return a view of the coordinates, the fields of a nested `Shape`
+    field or X, Y (and Z), otherwise all the fields.  They are copied if a
+    view isn't possible (see tools.xy_view).
+    """
+    return xy_view(a)
 
 
 def _reshape_(a):
@@ -250,6 +253,7 @@ def _centroid(a):
     return np.asarray([-x_c, -y_c])
 
 
+@profiled
 def centroids(a, remove_dup=True):
     """batch centroids (ie _centroid)
     """
@@ -282,6 +286,7 @@ def centers(a, remove_dup=True):
 
 # ---- distance, length and area --------------------------------------------
 # ----
+@profiled
 def e_area(a, b=None):
     """Area calculation, using einsum.
 
@@ -317,6 +322,7 @@ def e_area(a, b=None):
     return area
 
 
+@profiled
 def e_dist(a, b, metric='euclidean'):
     """Distance calculation for 1D, 2D and 3D points using einsum
 
@@ -344,6 +350,7 @@ def e_dist(a, b, metric='euclidean'):
     return dist_arr
 
 
+@profiled
 def e_leng(a):
     """Length/distance between points in an array using einsum
 
@@ -403,6 +410,7 @@ def e_leng(a):
 
 # ---- Batch calculations of e_area and e_leng ------------------------------
 #
+@profiled
 def areas(a):
     """Calls e_area to calculate areas for many types of nested objects.
 
@@ -425,6 +433,7 @@ def areas(a):
     return a_s
 
 
+@profiled
 def lengths(a, prn=False):
     """Calls e_leng to calculate lengths for many types of nested objects.
     This would include object arrays, list of lists and similar constructs.
@@ -751,6 +760,7 @@ def _convert(a, fact=2):
     return out
 
 
+@profiled
 def densify(polys, fact=2, sp_ref=None):
     """Convert polygon objects to arrays, densify.
 
@@ -886,6 +896,25 @@ def rectangle(dx=1, dy=1, cols=1, rows=1):
     return a
 
 
+def _hex_seed(dx=1, dy=1, kind='flat'):
+    """Return the seed hexagon, centred on 0, 0, used by `hex_flat`,
+    `hex_pointy` and `hex_bin`.
+
+    `kind` : string
+        'flat' for the flat-headed hexagon, 'pointy' for the pointy one
+    """
+    if kind == 'flat':
+        f_rad = np.deg2rad([180., 120., 60., 0., -60., -120., -180.])
+        X = np.cos(f_rad) * dx
+        Y = np.sin(f_rad) * dy            # scaled hexagon about 0, 0
+    else:
+        p_rad = np.deg2rad([150., 90, 30., -30., -90., -150., 150.])
+        X = np.cos(p_rad) * dx
+        Y = np.sin(p_rad) * dy      # scaled hexagon about 0, 0
+    seed = np.array(list(zip(X, Y)))  # array of coordinates
+    return seed
+
+
 def hex_flat(dx=1, dy=1, cols=1, rows=1):
     """Generate the points for the flat-headed hexagon
 
@@ -896,10 +925,7 @@ def hex_flat(dx=1, dy=1, cols=1, rows=1):
     `dy` : number
         Increment in y direction, -ve moves north to south, top/bottom
     """
-    f_rad = np.deg2rad([180., 120., 60., 0., -60., -120., -180.])
-    X = np.cos(f_rad) * dy
-    Y = np.sin(f_rad) * dy            # scaled hexagon about 0, 0
-    seed = np.array(list(zip(X, Y)))  # array of coordinates
+    seed = _hex_seed(dx, dy, kind='flat')
     dx = dx * 1.5
     dy = dy * np.sqrt(3.)/2.0
     hexs = [seed + [dx * i, dy * (i % 2)] for i in range(0, cols)]
@@ -919,10 +945,7 @@ def hex_pointy(dx=1, dy=1, cols=1, rows=1):
     `dy` : number
         Increment in y direction, -ve moves north to south, top/bottom
     """
-    p_rad = np.deg2rad([150., 90, 30., -30., -90., -150., 150.])
-    X = np.cos(p_rad) * dx
-    Y = np.sin(p_rad) * dy      # scaled hexagon about 0, 0
-    seed = np.array(list(zip(X, Y)))
+    seed = _hex_seed(dx, dy, kind='pointy')
     dx = dx * np.sqrt(3.)/2.0
     dy = dy * 1.5
     hexs = [seed + [dx * i * 2, 0] for i in range(0, cols)]
@@ -932,6 +955,130 @@ def hex_pointy(dx=1, dy=1, cols=1, rows=1):
     return hexs
 
 
+def _hex_round(q, r):
+    """Round fractional axial hex coordinates to the nearest hexagon using
+    cube coordinates (x + y + z = 0).  Called by `hex_bin`.
+    """
+    x, z = q, r
+    y = -x - z
+    rx, ry, rz = np.round(x), np.round(y), np.round(z)
+    d_x, d_y, d_z = np.abs(rx - x), np.abs(ry - y), np.abs(rz - z)
+    fix_x = (d_x > d_y) & (d_x > d_z)
+    fix_z = ~fix_x & (d_z >= d_y)
+    rx = np.where(fix_x, -ry - rz, rx)
+    rz = np.where(fix_z, -rx - ry, rz)
+    return rx.astype(np.int64), rz.astype(np.int64)
+
+
+@profiled
+def hex_bin(pnts, vals=None, dx=1, dy=1, kind='flat', origin=(0, 0),
+            polys=True):
+    """Bin points into hexagons, returning the count, sum and mean per hexagon
+    and the polygons for the occupied hexagons only.
+
+    Requires:
+    --------
+    `pnts` : array
+        An (N, 2) array of x, y coordinates
+    `vals` : array, optional
+        Values to sum and average for each hexagon, one per point.  If None,
+        the sum and mean are those of a weight of 1.
+    `dx`, `dy` : number
+        Hexagon size, as used by `hex_flat` and `hex_pointy`
+    `kind` : string
+        'flat' or 'pointy', the hexagon orientation
+    `origin` : pair
+        The centre of the hexagon at q=0, r=0.  The default (0, 0) matches
+        the grids produced by `hex_flat` and `hex_pointy`.
+    `polys` : boolean
+        True, also return the hexagon polygons with shape (M, 7, 2)
+
+    Returns:
+    -------
+    A structured array of the occupied hexagons, with axial coordinates
+    (q, r), centres (Xc, Yc), Count, Sum and Mean.  If `polys` is True, a
+    tuple of the array and the polygons is returned.
+
+    Notes:
+    -----
+    Points are converted to fractional axial coordinates arithmetically,
+    then rounded to the nearest hexagon, so no point in polygon queries
+    are needed.  Coordinates are scaled by dx, dy first so the hexagons
+    line up with those from `hex_flat` and `hex_pointy`.
+    ::
+        flat   : q = 2/3 x           r = -1/3 x + sqrt(3)/3 y
+        pointy : q = sqrt(3)/3 x - 1/3 y     r = 2/3 y
+
+    Example::
+
+        >>> pnts = np.random.uniform(0, 10, size=(1000000, 2))
+        >>> bins, hexs = hex_bin(pnts, dx=1, dy=1, kind='flat')
+
+    References:
+    ----------
+      https://www.redblobgames.com/grids/hexagons/
+    """
+    if kind not in ('flat', 'pointy'):
+        raise ValueError("kind must be 'flat' or 'pointy'")
+    pnts = np.asarray(pnts, dtype='float64').reshape(-1, 2)
+    dt = [('q', '<i8'), ('r', '<i8'), ('Xc', '<f8'), ('Yc', '<f8'),
+          ('Count', '<i8'), ('Sum', '<f8'), ('Mean', '<f8')]
+    if len(pnts) == 0:
+        out = np.zeros((0,), dtype=dt)
+        return (out, np.zeros((0, 7, 2))) if polys else out
+    x = (pnts[:, 0] - origin[0]) / dx
+    y = (pnts[:, 1] - origin[1]) / dy
+    s3 = np.sqrt(3.)
+    if kind == 'flat':
+        q, r = _hex_round(x * 2./3., (-x + s3 * y) / 3.)
+    else:
+        q, r = _hex_round((s3 * x - y) / 3., y * 2./3.)
+    # ---- pack q, r into one key and count with bincount
+    q_min, r_min = q.min(), r.min()
+    n_r = r.max() - r_min + 1
+    keys = (q - q_min) * n_r + (r - r_min)
+    n_keys = (q.max() - q_min + 1) * n_r
+    if n_keys <= max(4 * len(keys), 2**20):  # dense enough for bincount
+        cnts = np.bincount(keys, minlength=n_keys)
+        uni = np.flatnonzero(cnts)
+        lut = np.zeros(n_keys, dtype=np.int64)
+        lut[uni] = np.arange(len(uni))
+        inv = lut[keys]
+        cnt = cnts[uni]
+    else:
+        uni, inv, cnt = np.unique(keys, return_inverse=True,
+                                  return_counts=True)
+    n = len(uni)
+    if vals is None:
+        tot = cnt.astype('float64')
+    else:
+        tot = np.bincount(inv, weights=np.asarray(vals, dtype='float64'),
+                          minlength=n)
+    hq, hr = np.divmod(uni, n_r)
+    hq += q_min
+    hr += r_min
+    if kind == 'flat':
+        xc = 1.5 * hq
+        yc = s3 * (hr + hq / 2.)
+    else:
+        xc = s3 * (hq + hr / 2.)
+        yc = 1.5 * hr
+    out = np.zeros((n,), dtype=dt)
+    out['q'] = hq
+    out['r'] = hr
+    out['Xc'] = xc * dx + origin[0]
+    out['Yc'] = yc * dy + origin[1]
+    out['Count'] = cnt
+    out['Sum'] = tot
+    out['Mean'] = tot / cnt
+    if not polys:
+        return out
+    seed = _hex_seed(dx, dy, kind=kind)
+    cents = np.c_[out['Xc'], out['Yc']]
+    hexs = seed[np.newaxis, :, :] + cents[:, np.newaxis, :]
+    return out, hexs
+
+
 # ---- Extras ----------------------------------------------------------------
 #
 def _test(a0):
@@ -0,0 +1,242 @@
+# -*- coding: UTF-8 -*-
+"""
+instrument
+==========
+
+Script :   instrument.py
+
+Author :   Dan.Patterson@carleton.ca
+
+Modified : 2018-07-10
+
+Purpose :  Opt-in timing and memory records for the hot functions
+
+Notes :
+::
+    1.  profiled    - decorator, records the calls to a function
+    2.  profiling   - context manager, records the calls within a block
+    3.  prof_enable - turn recording on or off
+    4.  prof_reset  - clear the records
+    5.  prof_stats  - the records as a structured array
+    6.  prof_json   - the records as json, or saved to a json file
+    7.  prof_report - print the records
+
+Recording is off unless the environment variable ARRAYTOOLS_PROFILE is set
+before the import (`1` for times, `mem` to add tracemalloc peaks), or it is
+turned on with `prof_enable` or `profiling`.  While it is off a decorated
+function costs one extra call and a test, nothing is timed or kept.
+
+For each function the registry keeps:
+::
+    calls  : the number of calls
+    wall   : total elapsed time, time.perf_counter
+    cpu    : total process time, time.process_time
+    nbytes : total size of the array arguments
+    shape  : the shape of the first array argument of the last call
+    peak   : the largest tracemalloc peak of a call, in bytes, when the
+             memory option is on (-1 otherwise)
+
+`tools.time_deco` and `tools.run_deco` print as they go and change what
+the function returns, they are for a quick check, not to be left in place.
+
+>>> with profiling(memory=True):
+...     d = e_dist(a, b)
+>>> prof_report()
+
+References :
+
+  https://docs.python.org/3/library/tracemalloc.html
+
+---------------------------------------------------------------------
+"""
+# ---- imports, formats, constants ----
+import sys
+import os
+import json
+import time
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+import numpy as np
+
+
+ft = {'bool': lambda x: repr(x.astype(np.int32)),
+      'float_kind': '{: 0.3f}'.format}
+np.set_printoptions(edgeitems=10, linewidth=80, precision=2, suppress=True,
+                    threshold=100, formatter=ft)
+np.ma.masked_print_option.set_display('-')  # change to a single -
+
+script = sys.argv[0]  # print this should you need to locate the script
+
+__all__ = ['profiled', 'profiling', 'prof_enable', 'prof_reset',
+           'prof_stats', 'prof_json', 'prof_report']
+
+_env = os.environ.get('ARRAYTOOLS_PROFILE', '').lower()
+_state = {'on': _env not in ('', '0', 'false'),
+          'mem': _env == 'mem',
+          'peaks': []}
+_registry = {}
+_lock = threading.Lock()
+
+if _state['mem']:
+    tracemalloc.start()
+
+
+# ----------------------------------------------------------------------
+# (1) profiled ... code section ---
+def profiled(func):
+    """Decorator, record the calls to `func` in the registry when
+    recording is on.
+
+    >>> @profiled  # on the line above the function
+    ... def some_func(a):
+    ...     '''do stuff'''
+    """
+    name = "{}.{}".format(func.__module__, func.__name__)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        """wrapper function"""
+        if not _state['on']:
+            return func(*args, **kwargs)
+        return _record(func, name, args, kwargs)
+    return wrapper
+
+
+def _arr_args(args, kwargs):
+    """The total nbytes and the first shape of the array arguments"""
+    nbytes, shape = 0, ""
+    for v in args + tuple(kwargs.values()):
+        if isinstance(v, np.ndarray):
+            nbytes += v.nbytes
+            if not shape:
+                shape = str(v.shape)
+    return nbytes, shape
+
+
+def _record(func, name, args, kwargs):
+    """Run `func` and add the times, sizes and peak to the registry"""
+    nbytes, shape = _arr_args(args, kwargs)
+    mem = _state['mem'] and tracemalloc.is_tracing()
+    peaks = _state['peaks']
+    if mem:
+        cur, pk = tracemalloc.get_traced_memory()
+        if peaks:
+            peaks[-1] = max(peaks[-1], pk)
+        peaks.append(0)
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+    w_0, c_0 = time.perf_counter(), time.process_time()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        w_1, c_1 = time.perf_counter(), time.process_time()
+        peak = -1
+        if mem:
+            mine = max(peaks.pop(), tracemalloc.get_traced_memory()[1])
+            if peaks:
+                peaks[-1] = max(peaks[-1], mine)
+            peak = mine - cur
+        with _lock:
+            r = _registry.setdefault(name, [0, 0., 0., 0, "", -1])
+            r[0] += 1
+            r[1] += w_1 - w_0
+            r[2] += c_1 - c_0
+            r[3] += nbytes
+            r[4] = shape
+            r[5] = max(r[5], peak)
+
+
+# ----------------------------------------------------------------------
+# (2) switches ... code section ---
+def prof_enable(on=True, memory=False):
+    """Turn recording on or off.  `memory` adds tracemalloc peaks, which
+    slows the functions noticeably.
+    """
+    _state['on'] = on
+    _state['mem'] = on and memory
+    if _state['mem'] and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def prof_reset():
+    """Clear the registry"""
+    with _lock:
+        _registry.clear()
+
+
+@contextmanager
+def profiling(memory=False, reset=False):
+    """Record the calls made within a `with` block, the previous state
+    is restored on leaving it.
+
+    >>> with profiling():
+    ...     slope_a(dem)
+    """
+    old = dict(_state)
+    started = memory and not tracemalloc.is_tracing()
+    if reset:
+        prof_reset()
+    prof_enable(True, memory)
+    try:
+        yield _registry
+    finally:
+        _state['on'], _state['mem'] = old['on'], old['mem']
+        if started:
+            tracemalloc.stop()
+
+
+# ----------------------------------------------------------------------
+# (3) summaries ... code section ---
+def prof_stats(sort='wall'):
+    """Return the registry as a structured array, sorted by a field,
+    largest first.
+    """
+    dt = [('func', 'U60'), ('calls', '<i8'), ('wall', '<f8'),
+          ('cpu', '<f8'), ('mean', '<f8'), ('nbytes', '<i8'),
+          ('shape', 'U30'), ('peak', '<i8')]
+    with _lock:
+        vals = [(k, r[0], r[1], r[2], r[1]/max(r[0], 1), r[3], r[4], r[5])
+                for k, r in _registry.items()]
+    a = np.array(vals, dtype=dt)
+    if sort and len(a):
+        a = a[np.argsort(a[sort], kind='mergesort')[::-1]]
+    return a
+
+
+def prof_json(fname=None, sort='wall'):
+    """Return the registry as a json string, or save it to `fname`"""
+    a = prof_stats(sort)
+    recs = [dict(zip(a.dtype.names, r)) for r in a.tolist()]
+    if fname is None:
+        return json.dumps(recs, indent=1)
+    with open(fname, 'w') as f:
+        json.dump(recs, f, indent=1)
+    return fname
+
+
+def prof_report(sort='wall'):
+    """Print the registry"""
+    a = prof_stats(sort)
+    frmt = "{:<40.40} {:>8} {:>10.4f} {:>10.4f} {:>10.2e} {:>12,} {:>12,}"
+    hdr = "{:<40} {:>8} {:>10} {:>10} {:>10} {:>12} {:>12}".format(
+        'func', 'calls', 'wall', 'cpu', 'mean', 'nbytes', 'peak')
+    print("\n".join([hdr, "-"*len(hdr)] +
+                    [frmt.format(r[0], r[1], r[2], r[3], r[4], r[5], r[7])
+                     for r in a.tolist()]))
+
+
+# ----------------------------------------------------------------------
+# __main__ .... code section
+if __name__ == "__main__":
+    """Optionally...
+    : - print the script source name.
+    : - run the _demo
+    """
+#    print("Script... {}".format(script))
+#    from arraytools.geom import e_dist
+#    a = np.random.random((1000, 2))
+#    with profiling(memory=True):
+#        d = e_dist(a, a)
+#    prof_report()
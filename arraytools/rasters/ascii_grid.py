@@ -0,0 +1,217 @@
+# -*- coding: UTF-8 -*-
+"""
+ascii_grid
+==========
+
+Script :   ascii_grid.py
+
+Author :   Dan.Patterson@carleton.ca
+
+Modified : 2018-07-10
+
+Purpose :  Read and write ESRI ascii grids (*.asc) in chunks
+
+Notes :
+::
+    1.  asc_header - read the header of an ascii grid
+    2.  asc_arr    - read an ascii grid to an array (or a npy memmap)
+    3.  arr_asc    - write an array to an ascii grid
+
+The header is 5 or 6 lines, the NODATA_value line is optional.
+::
+    ncols         720
+    nrows         360
+    xllcorner     -180
+    yllcorner     -90
+    cellsize      0.5
+    NODATA_value  -9999
+
+The body is read in large blocks of bytes.  Each block is cut at the last
+whitespace, the values parsed in one call to np.fromstring and copied into
+a preallocated array, so only one block of text is in memory.  Compare to
+`ascii_to_raster.py` which uses np.mafromtxt on the whole file.
+
+References :
+
+  http://desktop.arcgis.com/en/arcmap/latest/manage-data/raster-and-images/
+  esri-ascii-raster-format.htm
+
+---------------------------------------------------------------------
+"""
+# ---- imports, formats, constants ----
+import sys
+import warnings
+import numpy as np
+
+
+ft = {'bool': lambda x: repr(x.astype(np.int32)),
+      'float_kind': '{: 0.3f}'.format}
+np.set_printoptions(edgeitems=10, linewidth=80, precision=2, suppress=True,
+                    threshold=100, formatter=ft)
+np.ma.masked_print_option.set_display('-')  # change to a single -
+
+script = sys.argv[0]  # print this should you need to locate the script
+
+__all__ = ['asc_header', 'asc_arr', 'arr_asc']
+
+
+# ----------------------------------------------------------------------
+# (1) asc_header ... code section ---
+def asc_header(fname):
+    """Read the header of an ascii grid.
+
+    Returns:
+    -------
+    A dictionary with lower case keys, ncols, nrows, xllcorner (or
+    xllcenter), yllcorner (or yllcenter), cellsize and nodata_value (None if
+    absent), plus `offset`, the byte position of the first value.
+    """
+    hdr = {'nodata_value': None}
+    with open(fname, 'rb') as f:
+        while True:
+            pos = f.tell()
+            line = f.readline()
+            tok = line.split()
+            if not tok or not tok[0][:1].isalpha():
+                break
+            key = tok[0].decode().lower()
+            val = float(tok[1])
+            hdr[key] = int(val) if key in ('ncols', 'nrows') else val
+    hdr['offset'] = pos
+    for k in ('ncols', 'nrows'):
+        if k not in hdr:
+            raise ValueError("{} is missing {}".format(fname, k))
+    return hdr
+
+
+# ----------------------------------------------------------------------
+# (2) asc_arr ... code section ---
+def asc_arr(fname, dtype='<f4', out_npy=None, masked=False, nodata=None,
+            chunk=2**24):
+    """Read an ascii grid to an array.
+
+    Requires:
+    --------
+    fname : string
+        The *.asc file
+    dtype : dtype
+        The output dtype, eg. '<i4' for integer grids
+    out_npy : string, optional
+        A *.npy file to fill as a memmap, rather than an array in memory
+    masked : boolean
+        True, return a masked array with the NODATA_value cells masked
+    nodata : number, optional
+        Replace the NODATA_value cells with this value, eg. np.nan
+    chunk : integer
+        The number of bytes read at a time
+
+    Returns:
+    -------
+    The array and the header dictionary.
+
+    >>> a, hdr = asc_arr("c:/temp/dem.asc", nodata=np.nan)
+    """
+    hdr = asc_header(fname)
+    rows, cols = hdr['nrows'], hdr['ncols']
+    N = rows * cols
+    if out_npy is None:
+        a = np.empty((rows, cols), dtype=dtype)
+    else:
+        a = np.lib.format.open_memmap(out_npy, mode='w+', dtype=dtype,
+                                      shape=(rows, cols))
+    flat = a.reshape(-1)
+    n = 0
+    rest = b""
+    with open(fname, 'rb') as f:
+        f.seek(hdr['offset'])
+        while True:
+            blk = f.read(chunk)
+            txt = rest + blk
+            if blk:
+                cut = max(txt.rfind(b" "), txt.rfind(b"\n"))
+                if cut < 0:
+                    rest = txt
+                    continue
+                txt, rest = txt[:cut], txt[cut:]
+            if txt.strip():
+                with warnings.catch_warnings():    # unparsed text
+                    warnings.simplefilter('error', DeprecationWarning)
+                    try:
+                        vals = np.fromstring(txt, dtype=dtype, sep=" ")
+                    except DeprecationWarning:
+                        raise ValueError("Bad value after cell {}".format(n))
+                if n + len(vals) > N:
+                    raise ValueError("More than {} values".format(N))
+                flat[n:n + len(vals)] = vals
+                n += len(vals)
+            if not blk:
+                break
+    if n != N:
+        raise ValueError("{} values for {} x {} cells".format(n, rows, cols))
+    nd = hdr['nodata_value']
+    if nd is not None:
+        if nodata is not None:
+            a[a == nd] = nodata
+            nd = nodata
+        if masked:
+            a = np.ma.masked_equal(a, nd) if nd == nd else \
+                np.ma.masked_invalid(a)
+    return a, hdr
+
+
+# ----------------------------------------------------------------------
+# (3) arr_asc ... code section ---
+def arr_asc(a, fname, LL_X=0, LL_Y=0, cell_size=1, nodata=-9999, fmt=None,
+            rows=1024):
+    """Write a 2D array (masked array or memmap) to an ascii grid.
+
+    Requires:
+    --------
+    a : array
+        Masked cells, and nan for floats, are written as `nodata`.
+    fname : string
+        The output *.asc file
+    LL_X, LL_Y, cell_size : numbers
+        The lower left corner and cell size
+    nodata : number
+        The NODATA_value, None to leave it out of the header
+    fmt : string, optional
+        The value format, '%d' for integers, otherwise '%.7g' for float32
+        and '%.15g' for float64
+    rows : integer
+        The number of rows formatted and written at a time
+    """
+    nr, nc = a.shape
+    if fmt is None:
+        fmt = {'f': '%.15g' if a.dtype.itemsize > 4 else '%.7g'}.get(
+            a.dtype.kind, '%d')
+    hdr = ["ncols         {}".format(nc),
+           "nrows         {}".format(nr),
+           "xllcorner     {}".format(LL_X),
+           "yllcorner     {}".format(LL_Y),
+           "cellsize      {}".format(cell_size)]
+    if nodata is not None:
+        hdr.append("NODATA_value  {}".format(nodata))
+    with open(fname, 'wb') as f:
+        f.write(("\n".join(hdr) + "\n").encode())
+        for r in range(0, nr, rows):
+            b = a[r:r + rows]
+            if nodata is not None:
+                if np.ma.isMaskedArray(b):
+                    b = b.filled(nodata)
+                if b.dtype.kind == 'f':
+                    b = np.where(np.isnan(b), nodata, b)
+            np.savetxt(f, np.asarray(b), fmt=fmt, delimiter=" ")
+    return fname
+
+
+# ----------------------------------------------------------------------
+# __main__ .... code section
+if __name__ == "__main__":
+    """Optionally...
+    : - print the script source name.
+    : - run the _demo
+    """
+#    print("Script... {}".format(script))
+#    a, hdr = asc_arr(r"C:\Data\ascii_samples\avg_yr.asc", dtype='<i4',
+#                     masked=True)
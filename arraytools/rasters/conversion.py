@@ -17,6 +17,7 @@ Functions
 >>> __all__ = ['arr2tuple',
                'recarray2dict',
                'table2dict',
+               'npy_header',
                'read_npy',
                'save_as_txt',
                'arr_tif_tf',    # array to tiff using tifffile
@@ -28,6 +29,7 @@ Functions
 """
 # ---- imports, formats, constants ----
 import sys
+import os
 import warnings
 from textwrap import dedent
 import numpy as np
@@ -49,6 +51,7 @@ script = sys.argv[0]  # print this should you need to locate the script
 __all__ = ['arr2tuple',
            'recarray2dict',
            'table2dict',
+           'npy_header',
            'read_npy',
            'save_as_txt',
            'arr_tif_tf',    # array to tiff using tifffile
@@ -113,13 +116,47 @@ def table2dict(in_tbl, flds=None, to_list=True):
 
 # ---- array to and from npy ------------------------------------------------
 #
-def read_npy(fp, prn=False):
+_npy_headers = {}  # header cache, {path: (stat key, header info)}
+
+
+def npy_header(fp):
+    """Return the magic, shape, fortran order, dtype and data offset of an
+    npy file.
+
+    The result is cached by path, file size and modification time, so
+    opening the same files again doesn't reparse their headers.
+    """
+    st = os.stat(fp)
+    key = (st.st_size, st.st_mtime_ns)
+    hit = _npy_headers.get(fp)
+    if hit is not None and hit[0] == key:
+        return hit[1]
+    with open(fp, 'rb') as f:
+        major, minor = format.read_magic(f)
+        mag = format.magic(major, minor)
+        if (major, minor) == (1, 0):
+            shp, is_fortran, dt = format.read_array_header_1_0(f)
+        else:
+            shp, is_fortran, dt = format.read_array_header_2_0(f)
+        info = (mag, shp, is_fortran, dt, f.tell())
+    _npy_headers[fp] = (key, info)
+    return info
+
+
+def read_npy(fp, prn=False, mmap=False, window=None):
     """ Read an npy file quickly
 
     fp : string
         The file path: "c:/temp/a01.npy"
     prn : boolean
         obtain full information if True
+    mmap : boolean
+        True, return a read only memmap of the data.  Nothing is read until
+        the values are used.
+    window : tuple, optional
+        (row_from, row_to, col_from, col_to) to return part of a 2D array, or
+        of each band of a 3D array.  With mmap=False, only the window is
+        copied into memory.
 
     Requires:
     ---------
@@ -128,6 +165,10 @@ def read_npy(fp, prn=False):
     Notes:
     -------
     shortcut ... np.load("c:/temp/a01.npy")
+
+    The header is parsed once (see `npy_header`).  The data are either
+    mapped at the data offset or read straight into the output array, there
+    is no intermediate buffer.
     """
     frmt = """
     ---- npy reader ---------------------------------------------------------
@@ -136,20 +177,26 @@ def read_npy(fp, prn=False):
     Magic {}
     -------------------------------------------------------------------------
     """
-    with open(fp, 'rb') as f:
-        major, minor = format.read_magic(f)
-        mag = format.magic(major, minor)
-        shp, is_fortran, dt = format.read_array_header_1_0(f)
-        count = np.multiply.reduce(shp, dtype=np.int64)
-        BUFFER_SIZE = 2**18
-        max_read_count = BUFFER_SIZE // min(BUFFER_SIZE, dt.itemsize)
-        array = np.ndarray(count, dtype=dt)
-        for i in range(0, count, max_read_count):
-            cnt = min(max_read_count, count - i)
-            read_size = int(cnt * dt.itemsize)
-            data = format._read_bytes(f, read_size, "array data")
-            array[i:i + cnt] = np.frombuffer(data, dtype=dt, count=cnt)
-        array.shape = shp
+    mag, shp, is_fortran, dt, offset = npy_header(fp)
+    order = 'F' if is_fortran else 'C'
+    if mmap or window is not None:
+        array = np.memmap(fp, dtype=dt, mode='r', offset=offset, shape=shp,
+                          order=order)
+        if window is not None:
+            r0, r1, c0, c1 = window
+            array = array[..., r0:r1, c0:c1]
+            if not mmap:
+                array = np.array(array)
+    else:
+        count = int(np.multiply.reduce(shp, dtype=np.int64))
+        array = np.empty(count, dtype=dt)
+        with open(fp, 'rb') as f:
+            f.seek(offset)
+            n = f.readinto(array)
+        if n != count * dt.itemsize:
+            msg = "EOF: reading array data, expected {} bytes got {}"
+            raise ValueError(msg.format(count * dt.itemsize, n))
+        array = array.reshape(shp, order=order)
     if prn:
         print(dedent(frmt).format(fp, shp, (not is_fortran), dt, mag))
     return array
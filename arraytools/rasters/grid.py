@@ -30,7 +30,8 @@ intersect-multiple-2d-np-arrays-for-determining-zones
 import sys
 from textwrap import dedent, indent
 import numpy as np
-from tools import nd2struct, stride
+from arraytools.tools import nd2struct, sort_keys, stride, scale
+from arraytools.instrument import profiled
 
 ft = {'bool': lambda x: repr(x.astype(np.int32)),
       'float_kind': '{: 0.3f}'.format}
@@ -100,6 +101,7 @@ def mask_stack(arr, nodata=None):
 
 # ---- 3D array functions ----------------------------------------------------
 # (1) combine ----
+@profiled
 def combine_(*arrs, ret_classes=False):
     """Combine arrays to produce a unique classification scheme
 
@@ -121,7 +123,7 @@ def combine_(*arrs, ret_classes=False):
     seq = [isinstance(i, (list, tuple)) for i in arrs]
     is_seq = np.array(seq).all()
     is_nd = [isinstance(i, np.ndarray) for i in arrs]
-    is_nd.all()
+    is_nd = np.array(is_nd).all()
     if is_seq:
         indices = [np.unique(arr, return_inverse=True)[1] for arr in arrs]
     elif is_nd:
@@ -147,7 +149,7 @@ def combine_(*arrs, ret_classes=False):
         classes = np.c_[classes, cls_new]
         classes = nd2struct(classes)
         classes = np.unique(classes)
-        classes = classes[np.argsort(classes, order=classes.dtype.names[-1])]
+        classes = classes[sort_keys(classes, classes.dtype.names[-1])]
         return combo, classes
     else:
         return combo
@@ -252,6 +254,7 @@ def stack_var(arrs, nodata=None):
     return np.nanvar(a, axis=0)
 
 
+@profiled
 def stack_stats(arrs, ax=0, nodata=None):
     """All statistics for arrs
 
@@ -278,6 +281,7 @@ def stack_stats(arrs, ax=0, nodata=None):
     return stats
 
 
+@profiled
 def expand_zone(a, zone=None, win=2):
     """Expand a value (zone) in a 2D array, normally assumed to represent a
     raster surface.
@@ -323,6 +327,7 @@ def expand_zone(a, zone=None, win=2):
     return final
 
 
+@profiled
 def fill_arr(a, win=(3, 3)):
     """try filling an array"""
     fd = np.array([[32, 64, 128], [16, 0, 1], [8, 4, 2]])  # flow direction
@@ -360,6 +365,7 @@ def fill_arr(a, win=(3, 3)):
 
 
 # (xx) reclass_vals .... code section
+@profiled
 def reclass_vals(a, old_vals=[], new_vals=[], mask=False, mask_val=None):
     """Reclass an array of integer or floating point values.
 
@@ -397,6 +403,7 @@ def reclass_vals(a, old_vals=[], new_vals=[], mask=False, mask_val=None):
 
 # ----------------------------------------------------------------------
 # (15) reclass .... code section
+@profiled
 def reclass_ranges(a, bins=[], new_bins=[], mask=False, mask_val=None):
     """Reclass an array of integer or floating point values based on old and
     new range values.
@@ -441,7 +448,8 @@ def reclass_ranges(a, bins=[], new_bins=[], mask=False, mask_val=None):
 
 
 # (16) scale .... code section
-def scale_up(a, x=2, y=2, num_z=None):
+@profiled
+def scale_up(a, x=2, y=2, num_z=None, method='nearest', view=False):
     """Scale the input array repeating the array values up by the
     x and y factors.
 
@@ -451,14 +459,17 @@ def scale_up(a, x=2, y=2, num_z=None):
     `a` : array
         an ndarray, 1D arrays will be upcast to 2D
     `x, y` : numbers
-        Factors to scale the array in x (col) and y (row).  Scale factors
-        must be greater than 2
+        Factors to scale the array in x (col) and y (row).  Integer factors
+        repeat the values, others are resampled using `method`
     `num_z` : number
         for 3D, produces the 3rd dimension, ie. if num_z = 3 with the
         defaults, you will get an array with shape=(3, 6, 6).  If
         num_z != None or 0, then the options are 'repeat', 'random'.
         With 'repeat' the extras are kept the same and you can add random
         values to particular slices of the 3rd dimension, or multiply them.
+    `method`, `view` :
+        'nearest' or 'bilinear', and True to return a read-only view, see
+        tools.scale
 
     Returns:
     -------
@@ -484,26 +495,9 @@ def scale_up(a, x=2, y=2, num_z=None):
     2, 2, 3, 3    2, 2, 3, 3    2, 2, 3, 3
     sub (0)       sub (1)       sub (2)
 
+    This is tools.scale, see it for the views and resampling.
     """
-    if (x < 1) or (y < 1):
-        print("x or y scale < 1... read the docs".format(scale_up.__doc__))
-        return None
-    a = np.atleast_2d(a)
-    z0 = np.tile(a.repeat(x), y)  # repeat for x, then tile
-    z1 = np.hsplit(z0, y)         # split into y parts horizontally
-    z2 = np.vstack(z1)            # stack them vertically
-    if a.shape[0] > 1:            # if there are more, repeat
-        z3 = np.hsplit(z2, a.shape[0])
-        z3 = np.vstack(z3)
-    else:
-        z3 = np.vstack(z2)
-    if num_z not in (0, None):
-        d = [z3]
-        for i in range(num_z):
-            d.append(z3)
-        z3 = np.dstack(d)
-        z3 = np.rollaxis(z3, 2, 0)
-    return z3
+    return scale(a, x, y, num_z, method, view)
 
 
 def _demo_combine():
@@ -21,8 +21,8 @@
 import sys
 from textwrap import dedent, indent
 import numpy as np
-import tools
-from tools import nd2struct, stride
+from arraytools import tools
+from arraytools.tools import nd2struct, sort_keys, stride
 
 ft = {'bool': lambda x: repr(x.astype(np.int32)),
       'float': '{: 0.3f}'.format}
@@ -105,7 +105,7 @@ def combine_(*arrs, ret_classes=False):
     seq = [isinstance(i, (list, tuple)) for i in arrs]
     is_seq = np.array(seq).all()
     is_nd = [isinstance(i, np.ndarray) for i in arrs]
-    is_nd.all()
+    is_nd = np.array(is_nd).all()
     if is_seq:
         indices = [np.unique(arr, return_inverse=True)[1] for arr in arrs]
     elif is_nd:
@@ -131,7 +131,7 @@ def combine_(*arrs, ret_classes=False):
         classes = np.c_[classes, cls_new]
         classes = nd2struct(classes)
         classes = np.unique(classes)
-        classes = classes[np.argsort(classes, order=classes.dtype.names[-1])]
+        classes = classes[sort_keys(classes, classes.dtype.names[-1])]
         return combo, classes
     else:
         return combo
@@ -323,6 +323,7 @@ import sys
 import numpy as np
 from numpy.lib.stride_tricks import as_strided
 from arraytools.tools import stride
+from arraytools.instrument import profiled
 from textwrap import dedent, indent
 import matplotlib.pyplot as plt
 
@@ -359,6 +360,7 @@ def pad_a(a):
     return a_pad
 
 
+@profiled
 def filter_a(a_s, a_filter=surface_kernel, cell_size=1):
     """Used by aspect, slope and hillshade to filter a raster/array
 
@@ -378,7 +380,7 @@ def filter_a(a_s, a_filter=surface_kernel, cell_size=1):
     return dz_dx, dz_dy
 
 
-# @time_deco
+@profiled
 def slope_a(a, cell_size=1, degrees=True, verbose=False, keepdims=False):
     """Return slope in degrees for an input array using 3rd order
     finite difference method for a 3x3 moing window view into the array.
@@ -436,6 +438,7 @@ def slope_a(a, cell_size=1, degrees=True, verbose=False, keepdims=False):
     return s
 
 
+@profiled
 def aspect_a(a, cell_size=1, flat=0.1, degrees=True, keepdims=False):
     """Return the aspect of a slope in degrees from North.
 
@@ -503,6 +506,7 @@ def a2z(vals):
     return out
 
 
+@profiled
 def hillshade_a(a, cell_size=1, sun_azim=315, sun_elev=45, degrees=True):
     """Hillshade calculation as outlined in Burrough and implemented by
     : esri in ArcMap and ArcGIS Pro.  All measures in radians.
@@ -0,0 +1,371 @@
+# -*- coding: UTF-8 -*-
+"""
+tile_store
+==========
+
+Script :   tile_store.py
+
+Author :   Dan.Patterson@carleton.ca
+
+Modified : 2018-07-10
+
+Purpose :  A chunked, compressed raster store with windowed reads/writes
+
+Notes :
+::
+    1.  tile_create - create an empty store
+    2.  arr_tiles   - save an array to a new store
+    3.  tile_write  - write an array into a store at a row, col position
+    4.  tile_read   - read a store, or a window of it, to an array
+    5.  tile_info   - the index information of a store
+    6.  TileStack   - stores of the same shape as a lazy 3D array
+
+A store is two files:
+::
+    name.tiles : the compressed tiles, one after the other
+    name.json  : the index, with the shape, tile size, dtype, nodata, codec,
+                 the georeference (LL_X, LL_Y, cell_size, srs) and the
+                 offset and length of every tile in name.tiles
+
+- Tiles are a fixed size, (256, 256) by default.  Edge tiles are padded with
+  nodata.  Tiles that were never written aren't stored and read as nodata.
+- Each tile is compressed with zlib or lzma from the standard library.
+- Only the tiles that intersect a window are read or written.  Rewritten
+  tiles are appended to name.tiles and the index updated, so existing data
+  isn't moved.
+- Tiles are decoded/encoded in a thread pool, zlib and lzma release the GIL.
+
+Compare to `a_io.rasters2nparray` which loads every raster into memory and
+`np.array` stacks them.
+
+---------------------------------------------------------------------
+"""
+# ---- imports, formats, constants ----
+import sys
+import os
+import json
+import zlib
+import lzma
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+
+ft = {'bool': lambda x: repr(x.astype(np.int32)),
+      'float_kind': '{: 0.3f}'.format}
+np.set_printoptions(edgeitems=10, linewidth=80, precision=2, suppress=True,
+                    threshold=100, formatter=ft)
+np.ma.masked_print_option.set_display('-')  # change to a single -
+
+script = sys.argv[0]  # print this should you need to locate the script
+
+__all__ = ['tile_create', 'arr_tiles', 'tile_write', 'tile_read',
+           'tile_info', 'TileStack']
+
+
+# ---- helpers ---------------------------------------------------------------
+#
+def _paths(name):
+    """The data and index file names for a store"""
+    base = os.path.splitext(name)[0] if name.endswith('.json') else name
+    return base + ".tiles", base + ".json"
+
+
+def _encode(b, codec, level):
+    """compress bytes"""
+    if codec == 'lzma':
+        return lzma.compress(b, preset=level)
+    return zlib.compress(b, level)
+
+
+def _decode(b, codec):
+    """decompress bytes"""
+    if codec == 'lzma':
+        return lzma.decompress(b)
+    return zlib.decompress(b)
+
+
+def _save_index(idx, name):
+    """Write the index, replacing the old one in a single step"""
+    tmp = _paths(name)[1] + ".tmp"
+    with open(tmp, 'w') as f:
+        json.dump(idx, f)
+    os.replace(tmp, _paths(name)[1])
+
+
+def _tile_ranges(idx, r0, r1, c0, c1):
+    """The tile rows and columns that intersect a window"""
+    th, tw = idx['tile']
+    return (range(r0 // th, (r1 - 1) // th + 1),
+            range(c0 // tw, (c1 - 1) // tw + 1))
+
+
+def _window(idx, window):
+    """Check a window, None for the whole raster"""
+    rows, cols = idx['shape']
+    if window is None:
+        return 0, rows, 0, cols
+    r0, r1, c0, c1 = window
+    r0, c0 = max(r0, 0), max(c0, 0)
+    r1, c1 = min(r1, rows), min(c1, cols)
+    if r0 >= r1 or c0 >= c1:
+        raise ValueError("window {} is outside {}".format(window,
+                                                          (rows, cols)))
+    return r0, r1, c0, c1
+
+
+def _get_tiles(idx, name, keys, workers=None):
+    """Read and decode tiles, returning {(tile_row, tile_col): array}.
+    Missing tiles are None.
+    """
+    th, tw = idx['tile']
+    dt = np.dtype(idx['dtype'])
+    todo = [k for k in keys if idx['offsets'][k[0]][k[1]] >= 0]
+    todo.sort(key=lambda k: idx['offsets'][k[0]][k[1]])   # read in order
+    raw = []
+    if todo:
+        with open(_paths(name)[0], 'rb') as f:
+            for i, j in todo:
+                f.seek(idx['offsets'][i][j])
+                raw.append(f.read(idx['lengths'][i][j]))
+    codec = idx['codec']
+
+    def _dec(b):
+        return np.frombuffer(_decode(b, codec), dtype=dt).reshape(th, tw)
+    with ThreadPoolExecutor(workers) as ex:
+        arrs = list(ex.map(_dec, raw))
+    out = dict.fromkeys(keys)
+    out.update(zip(todo, arrs))
+    return out
+
+
+# ---- (1) create and save --------------------------------------------------
+#
+def tile_create(name, shape, dtype, tile=(256, 256), nodata=None,
+                codec='zlib', level=6, LL_X=0, LL_Y=0, cell_size=1,
+                srs=None):
+    """Create an empty tile store.
+
+    Requires:
+    --------
+    name : string
+        The store path, without extension, eg. "c:/temp/dem"
+    shape : (rows, cols)
+    dtype : the array dtype
+    tile : (rows, cols) of each tile
+    nodata : the value for cells that haven't been written, 0 if None
+    codec : 'zlib' or 'lzma'
+    level : the compression level (zlib 0-9, lzma preset 0-9)
+    LL_X, LL_Y, cell_size, srs : georeference
+        The lower left corner, cell size and spatial reference (eg. a WKID)
+    """
+    if codec not in ('zlib', 'lzma'):
+        raise ValueError("codec must be 'zlib' or 'lzma'")
+    rows, cols = shape
+    nr = -(-rows // tile[0])
+    nc = -(-cols // tile[1])
+    nd = None if nodata is None else np.asarray(nodata, dtype).item()
+    idx = {'shape': [rows, cols], 'tile': list(tile),
+           'dtype': np.dtype(dtype).str, 'nodata': nd,
+           'codec': codec, 'level': level,
+           'LL_X': LL_X, 'LL_Y': LL_Y, 'cell_size': cell_size, 'srs': srs,
+           'offsets': [[-1] * nc for _ in range(nr)],
+           'lengths': [[0] * nc for _ in range(nr)]}
+    data, _ = _paths(name)
+    open(data, 'wb').close()
+    _save_index(idx, name)
+    return name
+
+
+def arr_tiles(a, name, tile=(256, 256), nodata=None, codec='zlib', level=6,
+              LL_X=0, LL_Y=0, cell_size=1, srs=None, workers=None):
+    """Save a 2D array (or memmap) to a new tile store.  See `tile_create`.
+
+    >>> arr_tiles(a, "c:/temp/dem", nodata=-9999, cell_size=10.)
+    """
+    tile_create(name, a.shape, a.dtype, tile, nodata, codec, level,
+                LL_X, LL_Y, cell_size, srs)
+    tile_write(name, a, 0, 0, workers=workers)
+    return name
+
+
+def tile_info(name):
+    """Return the index of a store as a dictionary"""
+    with open(_paths(name)[1], 'r') as f:
+        return json.load(f)
+
+
+# ---- (2) windowed writes and reads ----------------------------------------
+#
+def tile_write(name, a, r0=0, c0=0, workers=None):
+    """Write a 2D array into a store with its upper left at (r0, c0).
+
+    Only tiles intersecting the array are touched.  Tiles that are only
+    partly covered are decoded and updated first.  The work is done one row
+    of tiles at a time, so only that much is held in memory.
+    """
+    idx = tile_info(name)
+    rows, cols = idx['shape']
+    th, tw = idx['tile']
+    dt = np.dtype(idx['dtype'])
+    fill = 0 if idx['nodata'] is None else idx['nodata']
+    r1, c1 = r0 + a.shape[0], c0 + a.shape[1]
+    if r0 < 0 or c0 < 0 or r1 > rows or c1 > cols:
+        raise ValueError("{} at {} is outside {}".format(a.shape, (r0, c0),
+                                                         (rows, cols)))
+    t_rows, t_cols = _tile_ranges(idx, r0, r1, c0, c1)
+    codec, level = idx['codec'], idx['level']
+
+    def _enc(t):
+        return _encode(t.tobytes(), codec, level)
+    with ThreadPoolExecutor(workers) as ex, \
+            open(_paths(name)[0], 'ab') as f:
+        pos = f.seek(0, 2)
+        for i in t_rows:
+            keys = [(i, j) for j in t_cols]
+            part = [(i, j) for i, j in keys
+                    if i * th < r0 or j * tw < c0 or
+                    min((i + 1) * th, rows) > r1 or
+                    min((j + 1) * tw, cols) > c1]
+            old = _get_tiles(idx, name, part, workers) if part else {}
+            tiles = []
+            for i, j in keys:
+                t = old.get((i, j))
+                t = np.full((th, tw), fill, dt) if t is None else t.copy()
+                tr0, tc0 = max(r0, i * th), max(c0, j * tw)
+                tr1, tc1 = min(r1, (i + 1) * th), min(c1, (j + 1) * tw)
+                t[tr0 - i * th:tr1 - i * th, tc0 - j * tw:tc1 - j * tw] = \
+                    a[tr0 - r0:tr1 - r0, tc0 - c0:tc1 - c0]
+                tiles.append(t)
+            for (i, j), b in zip(keys, ex.map(_enc, tiles)):
+                f.write(b)
+                idx['offsets'][i][j] = pos
+                idx['lengths'][i][j] = len(b)
+                pos += len(b)
+    _save_index(idx, name)
+
+
+def tile_read(name, window=None, workers=None, masked=False):
+    """Read a store, or a window of it, to an array.
+
+    Requires:
+    --------
+    name : string
+        The store path
+    window : tuple, optional
+        (row_from, row_to, col_from, col_to), None for the whole raster
+    workers : integer, optional
+        The threads used to decode tiles, None for the default
+    masked : boolean
+        True, return a masked array with the nodata cells masked
+    """
+    idx = tile_info(name)
+    r0, r1, c0, c1 = _window(idx, window)
+    th, tw = idx['tile']
+    dt = np.dtype(idx['dtype'])
+    nd = idx['nodata']
+    t_rows, t_cols = _tile_ranges(idx, r0, r1, c0, c1)
+    keys = [(i, j) for i in t_rows for j in t_cols]
+    tiles = _get_tiles(idx, name, keys, workers)
+    out = np.full((r1 - r0, c1 - c0), 0 if nd is None else nd, dtype=dt)
+    for (i, j), t in tiles.items():
+        if t is None:
+            continue
+        tr0, tc0 = max(r0, i * th), max(c0, j * tw)
+        tr1, tc1 = min(r1, (i + 1) * th), min(c1, (j + 1) * tw)
+        out[tr0 - r0:tr1 - r0, tc0 - c0:tc1 - c0] = \
+            t[tr0 - i * th:tr1 - i * th, tc0 - j * tw:tc1 - j * tw]
+    if masked and nd is not None:
+        out = np.ma.masked_equal(out, nd)
+    return out
+
+
+# ---- (3) lazy 3D stacks ----------------------------------------------------
+#
+class TileStack(object):
+    """A list of tile stores of the same shape, treated as a 3D array
+    (band, row, col) without reading anything until it is indexed.
+
+    >>> s = TileStack(["c:/temp/t2001", "c:/temp/t2002", "c:/temp/t2003"])
+    >>> s.shape          # (3, rows, cols)
+    >>> s[:, 100:200, 50:80]    # reads the tiles of that window, per band
+    >>> s[1]             # the second raster
+    """
+
+    def __init__(self, names, workers=None):
+        self.names = list(names)
+        self.workers = workers
+        info = [tile_info(i) for i in self.names]
+        shps = set(tuple(i['shape']) for i in info)
+        if len(shps) > 1:
+            raise ValueError("Stores are not the same shape {}".format(shps))
+        self.shape = (len(self.names),) + shps.pop()
+        self.dtype = np.result_type(*[np.dtype(i['dtype']) for i in info])
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __repr__(self):
+        return "TileStack(shape={}, dtype={})".format(self.shape, self.dtype)
+
+    def window(self, r0, r1, c0, c1, bands=None):
+        """Return a 3D array of a window for all (or the listed) bands"""
+        bands = range(len(self)) if bands is None else bands
+        arrs = [tile_read(self.names[b], (r0, r1, c0, c1), self.workers)
+                for b in bands]
+        out = np.empty((len(arrs), r1 - r0, c1 - c0), dtype=self.dtype)
+        for k, a in enumerate(arrs):
+            out[k] = a
+        return out
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        key = key + (slice(None),) * (3 - len(key))
+        b, r, c = key
+        bands = range(len(self))[b]
+        single = isinstance(bands, int)
+        bands = [bands] if single else bands
+        r0, r1, r_sub = _axis_window(r, self.shape[1])
+        c0, c1, c_sub = _axis_window(c, self.shape[2])
+        if r0 >= r1 or c0 >= c1:             # nothing to read
+            out = np.empty((len(bands), max(r1 - r0, 0), max(c1 - c0, 0)),
+                           self.dtype)
+        else:
+            out = self.window(r0, r1, c0, c1, bands)
+        out = out[(slice(None), r_sub, c_sub)]
+        return out[0] if single else out
+
+
+def _axis_window(k, n):
+    """The rows (or columns) r0:r1 to read for the index `k` on an axis of
+    length `n`, and the index to apply to them.  Integers read one row,
+    slices, stepped or reversed, only the range they span.
+    """
+    if isinstance(k, (int, np.integer)):
+        i = range(n)[k]                    # negatives, IndexError
+        return i, i + 1, 0
+    if isinstance(k, slice):
+        rng = range(n)[k]
+        if len(rng) == 0:
+            return 0, 0, slice(None)
+        lo, hi = min(rng[0], rng[-1]), max(rng[0], rng[-1]) + 1
+        return lo, hi, slice(None, None, rng.step)
+    k = np.asarray(k)
+    if k.dtype.kind in 'iu' and k.size:
+        k = np.where(k < 0, k + n, k)
+        lo = int(k.min())
+        return lo, int(k.max()) + 1, k - lo
+    return 0, n, k
+
+
+# ----------------------------------------------------------------------
+# __main__ .... code section
+if __name__ == "__main__":
+    """Optionally...
+    : - print the script source name.
+    : - run the _demo
+    """
+#    print("Script... {}".format(script))
+#    a = np.random.randint(0, 255, size=(5000, 4000), dtype=np.uint8)
+#    arr_tiles(a, "c:/temp/rand", nodata=0)
+#    w = tile_read("c:/temp/rand", window=(100, 400, 2000, 2300))
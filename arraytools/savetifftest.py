@@ -79,11 +79,13 @@ def _read_bytes(fp, size, error_template="ran out of data"):
         return data
 
 
-def read_npy(fp, prn=False):
+def read_npy(fp, prn=False, mmap=False, window=None):
     """ read an npy file quickly
     : fp = file path
     :
     : file = "c:/temp/a01.npy"
+    : mmap - return a read only memmap rather than reading the data
+    : window - (row_from, row_to, col_from, col_to) for part of the array
     """
     frmt = """
     Magic {}
@@ -94,19 +96,24 @@ def read_npy(fp, prn=False):
         major, minor = format_.read_magic(f)
         mag = format_.magic(major, minor)
         shp, is_fortran, dt = format_.read_array_header_1_0(f)
-        count = np.multiply.reduce(shp, dtype=np.int64)
-        #data = f.readlines()
-
-        BUFFER_SIZE = 2**18
-        max_read_count = BUFFER_SIZE // min(BUFFER_SIZE, dt.itemsize)
-        array = np.ndarray(count, dtype=dt)
-        for i in range(0, count, max_read_count):
-            read_count = min(max_read_count, count - i)
-            read_size = int(read_count * dt.itemsize)
-            data = format_._read_bytes(f, read_size, "array data")
-            array[i:i+read_count] = np.frombuffer(data, dtype=dt,
-                                                  count=read_count)
-        array.shape = shp
+        offset = f.tell()
+        order = ['C', 'F'][is_fortran]
+        if mmap or window is not None:
+            array = np.memmap(fp, dtype=dt, mode='r', offset=offset,
+                              shape=shp, order=order)
+            if window is not None:
+                r0, r1, c0, c1 = window
+                array = array[..., r0:r1, c0:c1]
+                if not mmap:
+                    array = np.array(array)
+        else:
+            count = int(np.multiply.reduce(shp, dtype=np.int64))
+            array = np.empty(count, dtype=dt)
+            n = f.readinto(array)  # straight into the array, no buffers
+            if n != array.nbytes:
+                msg = "EOF: reading array data, expected {} bytes got {}"
+                raise ValueError(msg.format(array.nbytes, n))
+            array = array.reshape(shp, order=order)
     if prn:
         print(dedent(frmt).format(mag, shp, (not is_fortran), dt))
     return array
@@ -0,0 +1,693 @@
+# -*- coding: UTF-8 -*-
+"""
+shp_io.py
+=========
+
+Script :   shp_io.py
+
+Author :   Dan.Patterson@carleton.ca
+
+Modified : 2018-07-10
+
+Purpose :  Read and write shapefiles (.shp, .shx, .dbf) from numpy arrays
+           without arcpy
+
+Notes :
+::
+    1.  shp_info  - shape type, extent and record count for a shapefile
+    2.  shp_arr   - geometry to an `arc_np` style structured array
+    3.  dbf_arr   - attribute table to a structured array (see `tbl_arr`)
+    4.  shp_arrays - both of the above
+    5.  arr_shp   - geometry (and attribute) arrays to a shapefile
+    6.  arr_dbf   - structured array to a .dbf table
+
+The geometry array has the same layout as `apt.arc_np`
+::
+    dt = [('ID_num', '<i4'), ('Part_num', '<i4'), ('Xs', '<f8'), ('Ys', '<f8')]
+
+The files are memory-mapped and every record is decoded in bulk by building
+index arrays into the mapped bytes, so there are no per-point python objects.
+
+- Records are 4-byte aligned in the .shp, so the file is viewed as `<i4` and
+  the coordinates gathered as pairs of integers, then viewed as `<f8`.
+- `ID_num` is the record position (0-based, like the FID of a shapefile
+  read through arcpy).
+- `Part_num` is the part (ring) number within the record.  Shapefiles store
+  holes as separate rings, so each ring is a part.  For multipoints, it is
+  the point number.
+- Null shapes contribute no rows.  Z and M values are not read.
+
+References :
+
+  https://www.esri.com/library/whitepapers/pdfs/shapefile.pdf
+
+  http://www.dbase.com/Knowledgebase/INT/db7_file_fmt.htm
+
+---------------------------------------------------------------------
+"""
+# ---- imports, formats, constants ----
+import sys
+import os
+import time
+from textwrap import dedent
+import numpy as np
+
+
+ft = {'bool': lambda x: repr(x.astype(np.int32)),
+      'float_kind': '{: 0.3f}'.format}
+np.set_printoptions(edgeitems=10, linewidth=80, precision=2, suppress=True,
+                    threshold=100, formatter=ft)
+np.ma.masked_print_option.set_display('-')  # change to a single -
+
+script = sys.argv[0]  # print this should you need to locate the script
+
+__all__ = ['shp_info', 'shp_arr', 'dbf_arr', 'shp_arrays',
+           'arr_shp', 'arr_dbf',
+           '_ragged_idx']
+
+shp_types = {0: 'Null', 1: 'Point', 3: 'Polyline', 5: 'Polygon',
+             8: 'Multipoint', 11: 'PointZ', 13: 'PolylineZ', 15: 'PolygonZ',
+             18: 'MultipointZ', 21: 'PointM', 23: 'PolylineM',
+             25: 'PolygonM', 28: 'MultipointM', 31: 'MultiPatch'}
+
+# the 2D type of the types `shp_arr` reads, Z and M values are skipped
+xy_types = {0: 0, 1: 1, 11: 1, 21: 1, 3: 3, 13: 3, 23: 3,
+            5: 5, 15: 5, 25: 5, 8: 8, 18: 8, 28: 8}
+
+dt_geom = [('ID_num', '<i4'), ('Part_num', '<i4'),
+           ('Xs', '<f8'), ('Ys', '<f8')]
+
+
+# ----------------------------------------------------------------------
+# ---- helpers ----
+def _ragged_idx(starts, counts):
+    """Return the indices for the ranges starts[i]:starts[i] + counts[i],
+    concatenated, without a python loop.
+
+    >>> _ragged_idx(np.array([10, 20]), np.array([2, 3]))
+    array([10, 11, 20, 21, 22])
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    counts = np.asarray(counts, dtype=np.int64)
+    total = counts.sum()
+    if total == 0:
+        return np.zeros((0,), dtype=np.int64)
+    ends = np.cumsum(counts)
+    shift = np.repeat(starts - (ends - counts), counts)
+    return shift + np.arange(total, dtype=np.int64)
+
+
+def _base_name(in_file):
+    """Strip the extension from a shapefile name, if present"""
+    root, ext = os.path.splitext(in_file)
+    if ext.lower() in ('.shp', '.shx', '.dbf'):
+        return root
+    return in_file
+
+
+def _cpg_encoding(cpg):
+    """The python codec for the text of a .cpg, eg. 'UTF-8', or a code
+    page number, 1252 -> 'cp1252', 65001 -> 'utf-8', 88591 -> 'iso8859-1'.
+    None if it is empty.
+    """
+    txt = cpg.strip()
+    if not txt:
+        return None
+    if txt.isdigit():
+        if txt == '65001':
+            return 'utf-8'
+        if txt.startswith('8859') and len(txt) > 4:
+            return 'iso8859-' + txt[4:]
+        return 'cp' + txt
+    return txt
+
+
+def _shx_offsets(in_shp, buf):
+    """Return the record content offsets, in 4-byte words, from the .shx or
+    by walking the record headers of the .shp if there is no index.
+    """
+    root = _base_name(in_shp)
+    shx = root + '.shx'
+    if os.path.exists(shx):
+        idx = np.fromfile(shx, dtype='>i4', offset=100).reshape(-1, 2)
+        return (idx[:, 0].astype(np.int64) * 2 + 8) // 4
+    hdr = buf[:100 // 4].view('>i4')
+    end = hdr[6] * 2 // 4        # file length in 16-bit words
+    offs = []
+    pos = 100 // 4
+    while pos < end:
+        offs.append(pos + 2)     # skip the 8 byte record header
+        pos += 2 + buf[pos + 1:pos + 2].view('>i4')[0] * 2 // 4
+    return np.asarray(offs, dtype=np.int64)
+
+
+# ----------------------------------------------------------------------
+# (1) shp_info ... code section ---
+def shp_info(in_shp, prn=False):
+    """Return basic shapefile information from the .shp header.
+
+    Returns:
+    --------
+    - shp_type : shape type name (Point, Polyline, Polygon, Multipoint...)
+    - extent   : array of L, B, R, T
+    - N        : the number of records
+    """
+    root = _base_name(in_shp)
+    hdr = np.fromfile(root + '.shp', dtype=np.uint8, count=100)
+    shp_type = shp_types.get(int(hdr[32:36].view('<i4')[0]), 'Unknown')
+    extent = hdr[36:68].view('<f8').copy()
+    shx = root + '.shx'
+    if os.path.exists(shx):
+        N = (os.path.getsize(shx) - 100) // 8
+    else:
+        buf = np.memmap(root + '.shp', dtype='<i4', mode='r')
+        N = len(_shx_offsets(in_shp, buf))
+        del buf
+    if prn:
+        frmt = """
+        Shapefile : {}
+        Type      : {}
+        Extent    : {}
+        Records   : {:,}
+        """
+        print(dedent(frmt).format(root + '.shp', shp_type, extent, N))
+        return None
+    return shp_type, extent, N
+
+
+# ----------------------------------------------------------------------
+# (2) shp_arr ... code section ---
+def shp_arr(in_shp):
+    """Read the geometry of a shapefile into a structured array with the
+    `arc_np` layout, without arcpy.
+
+    Requires:
+    --------
+    `in_shp` : the file path to the shapefile (.shp), the .shx is used if
+    present
+
+    Returns:
+    -------
+    A structured array with ID_num, Part_num, Xs, Ys fields, one row per
+    point.  The attributes are read separately using `dbf_arr`.
+
+    Notes:
+    -----
+    The record offsets come from the .shx.  The number of parts and points
+    for every record are read with one fancy index into the mapped file, then
+    `_ragged_idx` builds the index of every coordinate so they are all
+    gathered at once.
+    """
+    root = _base_name(in_shp)
+    buf = np.memmap(root + '.shp', dtype='<i4', mode='r')
+    ci = _shx_offsets(in_shp, buf)
+    n_rec = len(ci)
+    codes = buf[ci] if n_rec else np.zeros((0,), dtype='<i4')
+    lut = np.full(max(xy_types) + 1, -1, dtype='<i4')
+    lut[list(xy_types)] = list(xy_types.values())
+    ok = (codes >= 0) & (codes < len(lut))
+    kind = np.where(ok, lut[np.where(ok, codes, 0)], -1)
+    if np.any(kind < 0):
+        bad = sorted(set(codes[kind < 0].tolist()))
+        raise ValueError("Unsupported shape types {}".format(
+            [shp_types.get(i, i) for i in bad]))
+    valid = kind != 0                          # drop null shapes
+    fid = np.arange(n_rec)[valid]
+    ci = ci[valid]
+    shp_type = kind[valid][0] if len(ci) else 0
+    if np.any(kind[valid] != shp_type):
+        raise ValueError("The records have more than one shape type")
+    if shp_type in (3, 5):                     # polyline, polygon
+        n_parts = buf[ci + 9].astype(np.int64)
+        n_pnts = buf[ci + 10].astype(np.int64)
+        p_beg = ci + 11 + n_parts              # first coordinate
+    elif shp_type == 8:                        # multipoint
+        n_parts = None
+        n_pnts = buf[ci + 9].astype(np.int64)
+        p_beg = ci + 10
+    elif shp_type == 1:                        # point
+        n_parts = None
+        n_pnts = np.ones(len(ci), dtype=np.int64)
+        p_beg = ci + 1
+    else:
+        del buf
+        return np.zeros((0,), dtype=dt_geom)
+    idx = _ragged_idx(p_beg, n_pnts * 4)
+    xy = buf[idx].view('<f8').reshape(-1, 2)
+    total = len(xy)
+    rec_0 = np.cumsum(n_pnts) - n_pnts         # first point of each record
+    if n_parts is None:
+        part = np.arange(total) - np.repeat(rec_0, n_pnts)
+    else:
+        prts = buf[_ragged_idx(ci + 11, n_parts)].astype(np.int64)
+        prts += np.repeat(rec_0, n_parts)      # global part starts
+        p_len = np.diff(np.append(prts, total))
+        prt_0 = np.cumsum(n_parts) - n_parts   # first part of each record
+        p_ids = np.arange(len(prts)) - np.repeat(prt_0, n_parts)
+        part = np.repeat(p_ids, p_len)
+    a = np.empty((total,), dtype=dt_geom)
+    a['ID_num'] = np.repeat(fid, n_pnts)
+    a['Part_num'] = part
+    a['Xs'] = xy[:, 0]
+    a['Ys'] = xy[:, 1]
+    del buf
+    return a
+
+
+# ----------------------------------------------------------------------
+# (3) dbf_arr ... code section ---
+def _dbf_fields(in_dbf):
+    """Return the number of records, header and record length and the field
+    descriptors (name, type, length, decimals) from a .dbf header.
+    """
+    with open(in_dbf, 'rb') as f:
+        hdr = np.frombuffer(f.read(32), dtype=np.uint8)
+        N = int(hdr[4:8].view('<u4')[0])
+        hdr_len = int(hdr[8:10].view('<u2')[0])
+        rec_len = int(hdr[10:12].view('<u2')[0])
+        raw = f.read(hdr_len - 32)
+    n_flds = (len(raw) - 1) // 32              # 0x0D terminates the list
+    desc = np.frombuffer(raw[:n_flds * 32], dtype=np.uint8)
+    desc = desc.reshape(n_flds, 32)
+    flds = []
+    for d in desc:
+        name = d[:11].tobytes().split(b'\x00')[0].decode('ascii').strip()
+        flds.append((name, chr(d[11]), int(d[16]), int(d[17])))
+    return N, hdr_len, rec_len, flds
+
+
+def _dbf_column(col, typ, length, dec, encoding):
+    """Convert a fixed width bytes column from a .dbf to a numpy dtype.
+    Null values follow `apt.tbl_2_np_array`, the minimum int32 for integers,
+    nan for floats and 'None' for strings.
+    """
+    if typ in ('N', 'F'):
+        col = np.char.strip(col)
+        blank = (col == b'') | (np.char.find(col, b'*') >= 0)
+        if typ == 'N' and dec == 0 and length < 19:
+            int_min = np.iinfo(np.int32).min
+            col[blank] = b'0'
+            out = col.astype('<i8')
+            out[blank] = int_min
+            if length < 10:
+                out = out.astype('<i4')
+            return out
+        col[blank] = b'nan'
+        return col.astype('<f8')
+    if typ == 'L':
+        return np.in1d(col, [b'T', b't', b'Y', b'y'])
+    if typ == 'D':
+        b = col.view('S1').reshape(-1, 8)
+        dash = np.full((len(col), 1), b'-', dtype='S1')
+        d = np.hstack((b[:, :4], dash, b[:, 4:6], dash, b[:, 6:]))
+        d = np.ascontiguousarray(d).view('S10').ravel()
+        blank = np.char.strip(col, b' 0') == b''   # blank or 00000000
+        d[blank] = b'NaT'
+        return d.astype('U10').astype('datetime64[D]')
+    out = np.char.strip(np.char.decode(col, encoding, 'replace'))
+    return out
+
+
+def dbf_arr(in_dbf, flds="*", encoding=None):
+    """Read a dBase table (the .dbf of a shapefile) to a structured array.
+
+    Requires:
+    --------
+    `in_dbf` : string
+        The file path to the .dbf or .shp
+    `flds` : fields
+        - "*" all fields or
+        - ['Field1', 'Field2', etc] for specific fields
+    `encoding` : string
+        Text encoding of character fields.  If None, the .cpg is used if
+        present, otherwise 'latin-1'.  Code page numbers in the .cpg, eg.
+        1252, are read as python codecs, cp1252.
+
+    Returns:
+    -------
+    A structured array with an FID field, numbered from 0 like `ID_num` in
+    `shp_arr`, followed by the requested fields.
+
+    Notes:
+    -----
+    The records are memory-mapped as a structured array of fixed width
+    byte fields, so each field is converted as a column.  Deleted records
+    are kept, so rows line up with the shapes.
+    """
+    root = _base_name(in_dbf)
+    in_dbf = root + '.dbf'
+    if encoding is None:
+        cpg = root + '.cpg'
+        encoding = 'latin-1'
+        if os.path.exists(cpg):
+            with open(cpg) as f:
+                encoding = _cpg_encoding(f.read()) or encoding
+    N, hdr_len, rec_len, info = _dbf_fields(in_dbf)
+    dt_raw = [('_del_', 'S1')]
+    dt_raw += [(i[0], 'S{}'.format(i[2])) for i in info]
+    used = sum(i[2] for i in info) + 1
+    if used < rec_len:
+        dt_raw.append(('_pad_', 'S{}'.format(rec_len - used)))
+    if flds != "*":
+        info = [i for i in info if i[0] in flds]
+    dt_out = [('FID', '<i4')]
+    if N == 0:
+        return np.zeros((0,), dtype=dt_out)
+    raw = np.memmap(in_dbf, dtype=dt_raw, mode='r', offset=hdr_len,
+                    shape=(N,))
+    cols = [np.arange(N)]
+    for name, typ, length, dec in info:
+        col = np.array(raw[name])             # copy out of the map
+        vals = _dbf_column(col, typ, length, dec, encoding)
+        cols.append(vals)
+        dt_out.append((name, vals.dtype.str))
+    del raw
+    a = np.empty((N,), dtype=dt_out)
+    for n, c in zip(a.dtype.names, cols):
+        a[n] = c
+    return a
+
+
+# ----------------------------------------------------------------------
+# (4) shp_arrays ... code section ---
+def shp_arrays(in_shp, flds="*", encoding=None):
+    """Return the geometry and attribute arrays for a shapefile.  They can
+    be related using `ID_num` and `FID`.  See `shp_arr` and `dbf_arr`.
+    """
+    a = shp_arr(in_shp)
+    b = None
+    if os.path.exists(_base_name(in_shp) + '.dbf'):
+        b = dbf_arr(in_shp, flds=flds, encoding=encoding)
+    return a, b
+
+
+# ----------------------------------------------------------------------
+# ---- writers ----
+# (5) arr_shp ... code section ---
+def _geom_parts(a, flds, shp_type):
+    """Normalize the geometry inputs accepted by `arr_shp`.
+
+    Returns the coordinates (N, 2), the number of points in each part, the
+    record each part belongs to and the id of each record.
+    """
+    if isinstance(a, np.ndarray) and a.dtype.names:
+        id_f, prt_f, x_f, y_f = flds
+        xy = np.empty((len(a), 2), dtype='<f8')
+        xy[:, 0] = a[x_f]
+        xy[:, 1] = a[y_f]
+        ids = a[id_f]
+        if shp_type == 1:
+            return xy, np.ones(len(a), np.int64), np.arange(len(a)), ids
+        chg = ids[1:] != ids[:-1]
+        brk = chg
+        if prt_f in a.dtype.names:
+            brk = chg | (a[prt_f][1:] != a[prt_f][:-1])
+        p_beg = np.append(0, np.flatnonzero(brk) + 1)
+        p_len = np.diff(np.append(p_beg, len(a)))
+        new_rec = np.append(True, chg[p_beg[1:] - 1])
+        p_rec = np.cumsum(new_rec) - 1
+        return xy, p_len, p_rec, ids[p_beg[new_rec]]
+    if isinstance(a, np.ndarray) and a.dtype.kind in 'fiu':
+        if a.ndim == 2:          # points, or a single part per record
+            n = len(a)
+            return (a.astype('<f8'), np.ones(n, np.int64), np.arange(n),
+                    np.arange(n))
+        n, m = a.shape[:2]       # (records, points, 2)
+        xy = a.reshape(-1, 2).astype('<f8')
+        return xy, np.full(n, m, np.int64), np.arange(n), np.arange(n)
+    parts = []                   # ragged... list or object array
+    p_rec = []
+    for i, shp in enumerate(a):
+        multi = isinstance(shp, (list, tuple)) and len(shp) > 0
+        if multi and np.ndim(shp[0]) == 2:
+            shp = np.asarray(list(shp) + [None], dtype='O')[:-1]
+        shp = np.asarray(shp)
+        if shp.dtype.kind == 'O':
+            prts = [np.asarray(p, dtype='<f8') for p in shp]
+        elif shp.ndim == 3:
+            prts = list(shp.astype('<f8'))
+        else:
+            prts = [shp.astype('<f8').reshape(-1, 2)]
+        parts.extend(prts)
+        p_rec.extend([i] * len(prts))
+    xy = np.concatenate(parts).reshape(-1, 2)
+    p_len = np.array([len(p) for p in parts], dtype=np.int64)
+    n = len(a)
+    return xy, p_len, np.asarray(p_rec, dtype=np.int64), np.arange(n)
+
+
+def _outer_rings(xy, p_len, p_rec):
+    """Flag the parts that start a polygon, and return the signed ring
+    areas (positive when counterclockwise).
+
+    A clockwise ring is an outer ring, a counterclockwise one is a hole in
+    the outer ring before it.  The first part of a record is always treated
+    as an outer ring.
+    """
+    n = len(p_len)
+    p_beg = np.cumsum(p_len) - p_len
+    nxt = np.arange(1, len(xy) + 1)
+    ok = p_len > 0
+    nxt[(p_beg + p_len - 1)[ok]] = p_beg[ok]  # close each ring
+    x, y = xy[:, 0], xy[:, 1]
+    cross = x * y[nxt] - x[nxt] * y
+    area = np.bincount(np.repeat(np.arange(n), p_len), weights=cross,
+                       minlength=n) / 2.
+    first = np.ones(n, dtype=bool)
+    first[1:] = p_rec[1:] != p_rec[:-1]
+    return first | (area <= 0), area
+
+
+def _be(vals):
+    """Big-endian int32 values, viewed as little-endian for scattering"""
+    return np.asarray(vals, dtype='>i4').view('<i4')
+
+
+def _shp_header(code, length_words, bbox):
+    """The 100 byte header shared by the .shp and .shx"""
+    hdr = np.zeros(25, dtype='<i4')
+    hdr[0] = _be(9994)
+    hdr[6] = _be(length_words)
+    hdr[7] = 1000
+    hdr[8] = code
+    hdr[9:17] = np.asarray(bbox, dtype='<f8').view('<i4')
+    return hdr
+
+
+def arr_shp(a, out_shp, shp_type='Polygon', b=None,
+            flds=('ID_num', 'Part_num', 'Xs', 'Ys'), prj=None):
+    """Write geometry arrays, and optionally attributes, to a shapefile
+    without arcpy.
+
+    Requires:
+    --------
+    `a` : geometry
+        - a structured array with the `arc_np` layout, sorted by id and part
+        - an (N, 2) array of points, an (N, M, 2) array of shapes
+        - a list/object array of shapes, each an (M, 2) array or a list of
+          them for multipart shapes (see `hex_flat`, `group_pnts`)
+    `out_shp` : string
+        Full path and name of the output .shp, the .shx and .dbf are written
+        beside it
+    `shp_type` : string
+        'Point', 'Multipoint', 'Polyline' or 'Polygon'
+    `b` : structured array, optional
+        Attributes, one row per record, written to the .dbf.  If None, the
+        record ids are written to an `Id` field.
+    `flds` : id, part, x and y field names for structured input
+    `prj` : string, optional
+        Well known text of the coordinate system, written to the .prj
+
+    Notes:
+    -----
+    The record lengths and offsets are computed from the part and point
+    counts, so the whole file is laid out before anything is written.  The
+    bounding boxes come from np.minimum.reduceat and np.maximum.reduceat on
+    the record starts, and the coordinates are scattered into the buffer
+    with one fancy index.  Each file is written in one call.  Polygon rings
+    are written as given, outer rings should be clockwise.
+    """
+    codes = {'Point': 1, 'Polyline': 3, 'Polygon': 5, 'Multipoint': 8}
+    if shp_type not in codes:
+        raise ValueError("shp_type must be one of {}".format(list(codes)))
+    code = codes[shp_type]
+    xy, p_len, p_rec, ids = _geom_parts(a, flds, code)
+    n = len(ids)
+    n_parts = np.bincount(p_rec, minlength=n).astype(np.int64)
+    n_pnts = np.bincount(p_rec, weights=p_len, minlength=n).astype(np.int64)
+    if code == 1 and np.any(n_pnts != 1):
+        raise ValueError("Point shapefiles require one point per record")
+    # ---- content lengths in 4-byte words, then record starts
+    if code == 1:
+        c_len = np.full(n, 5, dtype=np.int64)
+    elif code == 8:
+        c_len = 10 + n_pnts * 4
+    else:
+        c_len = 11 + n_parts + n_pnts * 4
+    rec_len = c_len + 2
+    rs = 25 + np.cumsum(rec_len) - rec_len    # record header, in words
+    ci = rs + 2                                # record content
+    total = 25 + rec_len.sum()
+    rec_0 = np.cumsum(n_pnts) - n_pnts         # first point of each record
+    mins = np.zeros((n, 2))
+    maxs = np.zeros((n, 2))
+    has = n_pnts > 0                           # empty records keep 0 boxes
+    if has.any():
+        for i in (0, 1):
+            mins[has, i] = np.minimum.reduceat(xy[:, i], rec_0[has])
+            maxs[has, i] = np.maximum.reduceat(xy[:, i], rec_0[has])
+        bbox = np.hstack((mins[has].min(axis=0), maxs[has].max(axis=0)))
+    else:
+        bbox = np.zeros(4)
+    # ---- fill the .shp buffer
+    w = np.zeros(total, dtype='<i4')
+    w[:25] = _shp_header(code, total * 2, bbox)
+    w[rs] = _be(np.arange(1, n + 1))
+    w[rs + 1] = _be(c_len * 2)
+    w[ci] = code
+    xy_i = xy.view('<i4').ravel()
+    if code == 1:
+        w[_ragged_idx(ci + 1, np.full(n, 4))] = xy_i
+    else:
+        box = np.hstack((mins, maxs)).astype('<f8').view('<i4')
+        w[ci[:, None] + np.arange(1, 9)] = box
+        if code == 8:
+            w[ci + 9] = n_pnts
+            w[_ragged_idx(ci + 10, n_pnts * 4)] = xy_i
+        else:
+            w[ci + 9] = n_parts
+            w[ci + 10] = n_pnts
+            p_beg = np.cumsum(p_len) - p_len - np.repeat(rec_0, n_parts)
+            w[_ragged_idx(ci + 11, n_parts)] = p_beg
+            w[_ragged_idx(ci + 11 + n_parts, n_pnts * 4)] = xy_i
+    root = _base_name(out_shp)
+    with open(root + '.shp', 'wb') as f:
+        f.write(w.tobytes())
+    # ---- the .shx, offsets and content lengths in 16-bit words
+    x = np.zeros(25 + n * 2, dtype='<i4')
+    x[:25] = _shp_header(code, (100 + n * 8) // 2, bbox)
+    x[25::2] = _be(rs * 2)
+    x[26::2] = _be(c_len * 2)
+    with open(root + '.shx', 'wb') as f:
+        f.write(x.tobytes())
+    if b is None:
+        b = np.zeros((n,), dtype=[('Id', '<i4')])
+        b['Id'] = ids
+    arr_dbf(b, root + '.dbf')
+    if prj is not None:
+        with open(root + '.prj', 'w') as f:
+            f.write(prj)
+    return root + '.shp'
+
+
+# ----------------------------------------------------------------------
+# (6) arr_dbf ... code section ---
+def _dbf_text(col, kind):
+    """Return a column as fixed width bytes, its dbf type, width and
+    decimals.  Nulls as in `dbf_arr` are written as blanks.
+    """
+    if kind == 'b':
+        return np.where(col, b'T', b'F').astype('S1'), 'L', 1, 0
+    if kind in 'iu':
+        txt = col.astype('S20')
+        txt[col == np.iinfo(np.int32).min] = b''
+        wdth = max(1, np.char.str_len(txt).max() if len(col) else 1)
+        return np.char.rjust(txt, wdth), 'N', wdth, 0
+    if kind == 'f':
+        dec = 6
+        txt = np.char.mod(b'%.6f', col).astype('S40')
+        txt[~np.isfinite(col)] = b''
+        wdth = max(3, np.char.str_len(txt).max() if len(col) else 3)
+        if wdth > 19:                     # too wide, use exponents
+            txt = np.char.mod(b'%.11e', col).astype('S19')
+            txt[~np.isfinite(col)] = b''
+            wdth, dec = 19, 11
+        return np.char.rjust(txt, wdth), 'N', wdth, dec
+    if kind == 'M':
+        txt = col.astype('datetime64[D]').astype('S10')
+        txt = np.char.replace(txt, b'-', b'')
+        txt[np.isnat(col)] = b''
+        return np.char.ljust(txt, 8), 'D', 8, 0
+    txt = np.char.encode(col.astype('U'), 'utf-8')
+    wdth = min(254, max(1, np.char.str_len(txt).max() if len(col) else 1))
+    return np.char.ljust(txt, wdth).astype('S{}'.format(wdth)), 'C', wdth, 0
+
+
+def _dbf_names(names):
+    """Field names as 10 byte ascii names, unique ignoring case.  A name
+    that repeats an earlier one after truncating gets a suffix, _1, _2...
+    """
+    out, used = [], set()
+    for name in names:
+        base = name.encode('ascii', 'replace')[:10]
+        nm, k = base, 1
+        while nm.upper() in used:
+            sfx = '_{}'.format(k).encode()
+            nm = base[:10 - len(sfx)] + sfx
+            k += 1
+        used.add(nm.upper())
+        out.append(nm)
+    return out
+
+
+def arr_dbf(b, out_dbf):
+    """Write a structured array to a dBase (.dbf) table.
+
+    Field names are truncated to 10 characters, with a numeric suffix for
+    those that would repeat a name (see `_dbf_names`).  Integers and floats are
+    written as `N` fields, booleans as `L`, datetimes as `D` and everything
+    else as utf-8 text, with a .cpg file saying so.  The widths are the
+    widest value in each column.
+    An `FID` field, as added by `dbf_arr`, is not written since it is the
+    record position.
+
+    The records are assembled as one structured array of fixed width bytes
+    fields and written, with the header, in one call.
+    """
+    N = len(b)
+    cols = []
+    desc = []
+    names = [i for i in b.dtype.names if i != 'FID']
+    for name, nm in zip(names, _dbf_names(names)):
+        col = b[name]
+        txt, typ, wdth, dec = _dbf_text(col, col.dtype.kind)
+        cols.append(txt)
+        desc.append((nm, typ, wdth, dec))
+    dt = [('_del_', 'S1')]
+    dt += [('f{}'.format(i), 'S{}'.format(d[2])) for i, d in enumerate(desc)]
+    recs = np.empty((N,), dtype=dt)
+    recs['_del_'] = b' '
+    for i, txt in enumerate(cols):
+        recs['f{}'.format(i)] = txt
+    n_f = len(desc)
+    hdr = np.zeros(32 + 32 * n_f + 1, dtype=np.uint8)
+    hdr[0] = 3
+    t = time.localtime()
+    hdr[1:4] = [t.tm_year - 1900, t.tm_mon, t.tm_mday]
+    hdr[4:8] = np.asarray([N], dtype='<u4').view(np.uint8)
+    hdr[8:10] = np.asarray([len(hdr)], dtype='<u2').view(np.uint8)
+    hdr[10:12] = np.asarray([recs.itemsize], dtype='<u2').view(np.uint8)
+    for i, (nm, typ, wdth, dec) in enumerate(desc):
+        d = hdr[32 + i * 32: 64 + i * 32]
+        d[:len(nm)] = np.frombuffer(nm, dtype=np.uint8)
+        d[11] = ord(typ)
+        d[16] = wdth
+        d[17] = dec
+    hdr[-1] = 0x0D
+    with open(out_dbf, 'wb') as f:
+        f.write(hdr.tobytes() + recs.tobytes() + b'\x1a')
+    with open(_base_name(out_dbf) + '.cpg', 'w') as f:
+        f.write('UTF-8')
+    return out_dbf
+
+
+# ----------------------------------------------------------------------
+# __main__ .... code section
+if __name__ == "__main__":
+    """Optionally...
+    : - print the script source name.
+    : - run the _demo
+    """
+#    print("Script... {}".format(script))
+#    in_shp = r"C:\Git_Dan\a_Data\Carp_5x5km.shp"
+#    a, b = shp_arrays(in_shp)
@@ -0,0 +1,512 @@
+# -*- coding: UTF-8 -*-
+"""
+sqlite_io.py
+============
+
+Script :   sqlite_io.py
+
+Author :   Dan.Patterson@carleton.ca
+
+Modified : 2018-07-10
+
+Purpose :  Store structured arrays and their geometry in SQLite/GeoPackage
+
+Notes :
+::
+    1.  arr_sql   - write (or append) attributes and geometry to a table
+    2.  sql_arr   - read a table, optionally by extent and/or attribute query
+    3.  sql_tables - list the tables in a database
+
+The file written is a GeoPackage when geometry is included, so it can be
+opened by ArcGIS Pro and QGIS.
+
+- Rows are inserted with `executemany` in batches, all within a single
+  transaction, so the file is committed once.
+- Geometry is stored as GeoPackage binary (a small header with the envelope,
+  then WKB).  Polygons are written as multipolygons, a new polygon starting
+  at each clockwise (outer) ring with the counterclockwise rings after it
+  as its holes.  Polylines are written as multilinestrings.
+- The envelope of every record goes into an R*Tree virtual table,
+  `rtree_<table>_geom`, which `sql_arr` joins on for extent queries.  The
+  GeoPackage triggers keeping it current are added, so edits made by other
+  software (which supply ST_MinX etc.) update it.  `arr_sql` drops them
+  while it inserts and fills the R*Tree itself.
+- The dtype of the array is kept in the `np_dtypes` table so the array
+  comes back as it went in.  Tables written by other software get a dtype
+  from the column declarations.
+- Records are read back through `a_io.cursor_arr`, so there is no list of
+  every row.
+
+References :
+
+  http://www.geopackage.org/spec/
+
+  https://www.sqlite.org/rtree.html
+
+---------------------------------------------------------------------
+"""
+# ---- imports, formats, constants ----
+import sys
+import json
+import sqlite3
+import struct
+import numpy as np
+from arraytools.a_io import cursor_arr
+from arraytools.shp_io import _geom_parts, _outer_rings
+
+
+ft = {'bool': lambda x: repr(x.astype(np.int32)),
+      'float_kind': '{: 0.3f}'.format}
+np.set_printoptions(edgeitems=10, linewidth=80, precision=2, suppress=True,
+                    threshold=100, formatter=ft)
+np.ma.masked_print_option.set_display('-')  # change to a single -
+
+script = sys.argv[0]  # print this should you need to locate the script
+
+__all__ = ['arr_sql', 'sql_arr', 'sql_tables']
+
+dt_geom = [('ID_num', '<i4'), ('Part_num', '<i4'),
+           ('Xs', '<f8'), ('Ys', '<f8')]
+
+geom_types = {'Point': (1, 'POINT'), 'Multipoint': (4, 'MULTIPOINT'),
+              'Polyline': (5, 'MULTILINESTRING'),
+              'Polygon': (3, 'MULTIPOLYGON')}
+
+_gpkg_tables = """
+CREATE TABLE IF NOT EXISTS gpkg_spatial_ref_sys (
+    srs_name TEXT NOT NULL, srs_id INTEGER PRIMARY KEY,
+    organization TEXT NOT NULL, organization_coordsys_id INTEGER NOT NULL,
+    definition TEXT NOT NULL, description TEXT);
+CREATE TABLE IF NOT EXISTS gpkg_contents (
+    table_name TEXT NOT NULL PRIMARY KEY, data_type TEXT NOT NULL,
+    identifier TEXT UNIQUE, description TEXT DEFAULT '',
+    last_change DATETIME NOT NULL DEFAULT
+        (strftime('%Y-%m-%dT%H:%M:%fZ','now')),
+    min_x DOUBLE, min_y DOUBLE, max_x DOUBLE, max_y DOUBLE, srs_id INTEGER);
+CREATE TABLE IF NOT EXISTS gpkg_geometry_columns (
+    table_name TEXT NOT NULL, column_name TEXT NOT NULL,
+    geometry_type_name TEXT NOT NULL, srs_id INTEGER NOT NULL,
+    z TINYINT NOT NULL, m TINYINT NOT NULL,
+    CONSTRAINT pk_geom_cols PRIMARY KEY (table_name, column_name));
+CREATE TABLE IF NOT EXISTS gpkg_extensions (
+    table_name TEXT, column_name TEXT, extension_name TEXT NOT NULL,
+    definition TEXT NOT NULL, scope TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS np_dtypes (
+    table_name TEXT NOT NULL PRIMARY KEY, descr TEXT NOT NULL,
+    geom_type TEXT);
+INSERT OR IGNORE INTO gpkg_spatial_ref_sys VALUES
+    ('Undefined cartesian SRS', -1, 'NONE', -1, 'undefined', ''),
+    ('Undefined geographic SRS', 0, 'NONE', 0, 'undefined', '');
+"""
+
+
+# ----------------------------------------------------------------------
+# ---- helpers ----
+def _sql_type(kind):
+    """SQLite column declaration for a dtype kind"""
+    return {'i': 'INTEGER', 'u': 'INTEGER', 'b': 'BOOLEAN', 'f': 'DOUBLE',
+            'M': 'DATETIME'}.get(kind, 'TEXT')
+
+
+def _gpkg_blobs(code, xy, p_len, p_rec, n, srs_id):
+    """Encode each record as GeoPackage binary, returning a list of bytes
+    and the envelopes (minx, maxx, miny, maxy) as an (n, 4) array.
+    """
+    n_pnts = np.bincount(p_rec, weights=p_len, minlength=n).astype(np.int64)
+    rec_0 = np.cumsum(n_pnts) - n_pnts
+    env = np.zeros((n, 4))
+    has = n_pnts > 0                   # empty records keep 0 envelopes
+    if has.any():
+        for i, (f, c) in enumerate([(np.minimum, 0), (np.maximum, 0),
+                                    (np.minimum, 1), (np.maximum, 1)]):
+            env[has, i] = f.reduceat(xy[:, c], rec_0[has])
+    raw = xy.tobytes()                 # slice coordinates as bytes
+    p_beg = (np.cumsum(p_len) - p_len) * 16
+    p_end = p_beg + p_len * 16
+    n_prts = np.bincount(p_rec, minlength=n)
+    prt_0 = (np.cumsum(n_prts) - n_prts).tolist()
+    n_prts = n_prts.tolist()
+    if code == 3:
+        outer = _outer_rings(xy, p_len, p_rec)[0].tolist()
+    blobs = []
+    for i in range(n):
+        hdr = b'GP\x00\x03' + struct.pack('<i4d', srs_id, *env[i])
+        prts = range(prt_0[i], prt_0[i] + n_prts[i])
+        if code == 1:
+            wkb = struct.pack('<bI', 1, 1) + raw[p_beg[prts[0]]:
+                                                 p_end[prts[0]]]
+        elif code == 4:
+            pts = [struct.pack('<bI', 1, 1) + raw[j:j + 16]
+                   for j in range(p_beg[prts[0]], p_end[prts[-1]], 16)]
+            wkb = struct.pack('<bII', 1, 4, len(pts)) + b''.join(pts)
+        elif code == 3:
+            polys = []
+            for j in prts:
+                if outer[j]:
+                    polys.append([])
+                polys[-1].append(struct.pack('<I', p_len[j]) +
+                                 raw[p_beg[j]:p_end[j]])
+            wkb = struct.pack('<bII', 1, 6, len(polys)) + b''.join(
+                struct.pack('<bII', 1, 3, len(r)) + b''.join(r)
+                for r in polys)
+        else:
+            lines = [struct.pack('<bII', 1, 2, p_len[j]) +
+                     raw[p_beg[j]:p_end[j]] for j in prts]
+            wkb = struct.pack('<bII', 1, 5, len(lines)) + b''.join(lines)
+        blobs.append(hdr + wkb)
+    return blobs, env
+
+
+def _gpkg_parts(blob):
+    """Decode GeoPackage binary (or plain WKB) to a list of (M, 2) arrays,
+    one per part.  Z and M values are dropped.
+    """
+    blob = bytes(blob)
+    pos = 0
+    if blob[:2] == b'GP':
+        env = (blob[3] >> 1) & 7
+        pos = 8 + {0: 0, 1: 32, 2: 48, 3: 48, 4: 64}[env]
+    parts = []
+
+    def _read(pos):
+        """read one WKB geometry, recursing into multi geometries"""
+        e = '<' if blob[pos] == 1 else '>'
+        kind, = struct.unpack(e + 'I', blob[pos + 1:pos + 5])
+        dim = 3 if (kind // 1000) in (1, 2) else 4 if kind // 1000 == 3 else 2
+        kind = kind % 1000
+        pos += 5
+        dt = np.dtype(e + 'f8')
+        if kind == 1:
+            c = np.frombuffer(blob, dt, dim, pos)
+            parts.append(c[:2].reshape(1, 2))
+            return pos + 8 * dim
+        cnt, = struct.unpack(e + 'I', blob[pos:pos + 4])
+        pos += 4
+        if kind == 2:
+            c = np.frombuffer(blob, dt, cnt * dim, pos).reshape(cnt, dim)
+            parts.append(c[:, :2])
+            return pos + 8 * dim * cnt
+        if kind == 3:
+            for _ in range(cnt):
+                m, = struct.unpack(e + 'I', blob[pos:pos + 4])
+                c = np.frombuffer(blob, dt, m * dim, pos + 4)
+                parts.append(c.reshape(m, dim)[:, :2])
+                pos += 4 + 8 * dim * m
+            return pos
+        for _ in range(cnt):              # multi* and collections
+            pos = _read(pos)
+        return pos
+    _read(pos)
+    return parts
+
+
+def sql_tables(db):
+    """Return the user tables in a database, excluding the GeoPackage
+    metadata and R*Tree tables.
+    """
+    with sqlite3.connect(db) as con:
+        rows = con.execute("SELECT name FROM sqlite_master "
+                           "WHERE type='table'").fetchall()
+    skip = ('gpkg_', 'rtree_', 'np_dtypes', 'sqlite_')
+    return [r[0] for r in rows if not r[0].startswith(skip)]
+
+
+# ----------------------------------------------------------------------
+# (1) arr_sql ... code section ---
+def arr_sql(a, db, tbl, geom=None, shp_type='Polygon', srs_id=-1,
+            mode='w', index=None, batch=50000,
+            flds=('ID_num', 'Part_num', 'Xs', 'Ys')):
+    """Write a structured array, and optionally its geometry, to a SQLite
+    database/GeoPackage table.
+
+    Requires:
+    --------
+    `a` : structured array or None
+        The attributes, one row per record.  If None, an `Id` field with the
+        geometry ids is used.
+    `db` : string
+        The database file (eg. *.gpkg or *.sqlite), created if needed
+    `tbl` : string
+        The table name
+    `geom` : geometry, optional
+        Any geometry accepted by `shp_io.arr_shp`, one record per row of `a`
+    `shp_type` : string
+        'Point', 'Multipoint', 'Polyline' or 'Polygon'
+    `srs_id` : integer
+        The spatial reference id (eg. 2951), -1 for undefined.  It must
+        already be in gpkg_spatial_ref_sys if it isn't -1 or 0.
+    `mode` : string
+        'w' replaces the table, 'a' appends to it
+    `index` : list of field names, optional
+        Attribute fields to index for `sql_arr` queries
+    `batch` : integer
+        Rows per executemany call
+
+    Notes:
+    -----
+    A `fid` INTEGER PRIMARY KEY is added.  Everything, including the
+    metadata and R*Tree, is written inside one transaction.
+    """
+    if geom is not None:
+        if shp_type not in geom_types:
+            raise ValueError("shp_type must be in {}".format(list(geom_types)))
+        code = geom_types[shp_type][0]
+        xy, p_len, p_rec, ids = _geom_parts(geom, flds, 1 if code == 1 else 0)
+        n = len(ids)
+        if a is None:
+            a = np.zeros((n,), dtype=[('Id', '<i4')])
+            a['Id'] = ids
+        if len(a) != n:
+            raise ValueError("{} rows for {} shapes".format(len(a), n))
+    names = [i for i in a.dtype.names if i.lower() != 'fid']
+    cols = ", ".join(['"{}" {}'.format(i, _sql_type(a.dtype[i].kind))
+                      for i in names])
+    if geom is not None:
+        cols += ', "geom" {}'.format(geom_types[shp_type][1])
+    con = sqlite3.connect(db)
+    try:
+        with con:                           # one transaction
+            con.executescript("BEGIN;" + _gpkg_tables)
+            con.execute("PRAGMA application_id = 1196444487")  # 'GPKG'
+            con.execute("PRAGMA user_version = 10200")
+            exists = mode == 'a' and con.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?",
+                (tbl,)).fetchone() is not None
+            if mode == 'w':
+                con.execute('DROP TABLE IF EXISTS "{}"'.format(tbl))
+                con.execute('DROP TABLE IF EXISTS "rtree_{}_geom"'.format(tbl))
+                for t in ('gpkg_contents', 'gpkg_geometry_columns',
+                          'gpkg_extensions', 'np_dtypes'):
+                    con.execute("DELETE FROM {} WHERE table_name=?".format(t),
+                                (tbl,))
+            if not exists:
+                con.execute('CREATE TABLE "{}" (fid INTEGER PRIMARY KEY '
+                            'AUTOINCREMENT, {})'.format(tbl, cols))
+                con.execute("INSERT INTO np_dtypes VALUES (?, ?, ?)",
+                            (tbl, json.dumps(a[names].dtype.descr),
+                             shp_type if geom is not None else None))
+            start = con.execute('SELECT COALESCE(MAX(fid), 0) FROM "{}"'
+                                .format(tbl)).fetchone()[0] + 1
+            flds_sql = ", ".join(['"{}"'.format(i) for i in names])
+            qs = ", ".join(["?"] * len(names))
+            b = a[names]
+            if any(b.dtype[i].kind == 'M' for i in names):
+                dt = [(i, 'U32' if b.dtype[i].kind == 'M' else b.dtype[i])
+                      for i in names]
+                b = b.astype(dt)
+            if geom is not None:             # the R*Tree is filled below
+                for name, sql in _rtree_triggers(tbl):
+                    con.execute('DROP TRIGGER IF EXISTS "{}"'.format(name))
+                blobs, env = _gpkg_blobs(code, xy, p_len, p_rec, n, srs_id)
+                sql = 'INSERT INTO "{}" ({}, geom) VALUES ({}, ?)'.format(
+                      tbl, flds_sql, qs)
+            else:
+                sql = 'INSERT INTO "{}" ({}) VALUES ({})'.format(
+                      tbl, flds_sql, qs)
+            for i in range(0, len(b), batch):
+                rows = b[i:i + batch].tolist()
+                if geom is not None:
+                    rows = [r + (g,) for r, g in zip(rows,
+                                                     blobs[i:i + batch])]
+                con.executemany(sql, rows)
+            if geom is not None:
+                _gpkg_register(con, tbl, shp_type, srs_id, env, start,
+                               exists)
+            for fld in (index or []):
+                con.execute('CREATE INDEX IF NOT EXISTS "idx_{0}_{1}" '
+                            'ON "{0}" ("{1}")'.format(tbl, fld))
+    finally:
+        con.close()
+    return db
+
+
+def _rtree_triggers(tbl):
+    """The GeoPackage R*Tree triggers for the geom column of a table, as
+    (name, sql) pairs.  See the rtree extension of the specification.
+    """
+    rt = 'rtree_{}_geom'.format(tbl)
+    vals = ('VALUES (NEW.fid, ST_MinX(NEW.geom), ST_MaxX(NEW.geom), '
+            'ST_MinY(NEW.geom), ST_MaxY(NEW.geom))')
+    has = '(NEW.geom NOT NULL AND NOT ST_IsEmpty(NEW.geom))'
+    empty = '(NEW.geom ISNULL OR ST_IsEmpty(NEW.geom))'
+    trig = [('insert', 'AFTER INSERT ON "{t}" WHEN ' + has,
+             'INSERT OR REPLACE INTO "{r}" ' + vals),
+            ('update1', 'AFTER UPDATE OF geom ON "{t}" WHEN '
+             'OLD.fid = NEW.fid AND ' + has,
+             'INSERT OR REPLACE INTO "{r}" ' + vals),
+            ('update2', 'AFTER UPDATE OF geom ON "{t}" WHEN '
+             'OLD.fid = NEW.fid AND ' + empty,
+             'DELETE FROM "{r}" WHERE id = OLD.fid'),
+            ('update3', 'AFTER UPDATE ON "{t}" WHEN '
+             'OLD.fid != NEW.fid AND ' + has,
+             'DELETE FROM "{r}" WHERE id = OLD.fid; '
+             'INSERT OR REPLACE INTO "{r}" ' + vals),
+            ('update4', 'AFTER UPDATE ON "{t}" WHEN '
+             'OLD.fid != NEW.fid AND ' + empty,
+             'DELETE FROM "{r}" WHERE id IN (OLD.fid, NEW.fid)'),
+            ('delete', 'AFTER DELETE ON "{t}" WHEN OLD.geom NOT NULL',
+             'DELETE FROM "{r}" WHERE id = OLD.fid')]
+    return [('{}_{}'.format(rt, nm),
+             'CREATE TRIGGER "{}_{}" {} BEGIN {}; END'.format(
+                 rt, nm, when.format(t=tbl), body.format(r=rt)))
+            for nm, when, body in trig]
+
+
+def _gpkg_register(con, tbl, shp_type, srs_id, env, start, exists):
+    """Add the GeoPackage metadata, fill the R*Tree for a table and add
+    its triggers.
+    """
+    rt = 'rtree_{}_geom'.format(tbl)
+    if not exists:
+        con.execute('CREATE VIRTUAL TABLE "{}" USING rtree(id, minx, maxx, '
+                    'miny, maxy)'.format(rt))
+        con.execute("INSERT INTO gpkg_geometry_columns VALUES "
+                    "(?, 'geom', ?, ?, 0, 0)",
+                    (tbl, geom_types[shp_type][1], srs_id))
+        con.execute("INSERT INTO gpkg_extensions VALUES "
+                    "(?, 'geom', 'gpkg_rtree_index', "
+                    "'http://www.geopackage.org/spec120/#extension_rtree', "
+                    "'write-only')", (tbl,))
+        con.execute("INSERT INTO gpkg_contents (table_name, data_type, "
+                    "identifier, srs_id) VALUES (?, 'features', ?, ?)",
+                    (tbl, tbl, srs_id))
+    fids = np.arange(start, start + len(env))
+    rows = np.column_stack((fids, env)).tolist()
+    con.executemany('INSERT INTO "{}" VALUES (?, ?, ?, ?, ?)'.format(rt),
+                    rows)
+    ext = con.execute('SELECT MIN(minx), MIN(miny), MAX(maxx), MAX(maxy) '
+                      'FROM "{}"'.format(rt)).fetchone()
+    con.execute("UPDATE gpkg_contents SET min_x=?, min_y=?, max_x=?, "
+                "max_y=? WHERE table_name=?", ext + (tbl,))
+    for name, sql in _rtree_triggers(tbl):
+        con.execute(sql)
+
+
+# ----------------------------------------------------------------------
+# (2) sql_arr ... code section ---
+def _table_dtype(con, tbl, names):
+    """Return the dtype of the named columns, from np_dtypes if the table
+    was written by `arr_sql`, otherwise from the column declarations.
+    """
+    kept = None
+    try:
+        row = con.execute("SELECT descr FROM np_dtypes WHERE table_name=?",
+                          (tbl,)).fetchone()
+        if row:
+            kept = dict((i[0], i[1]) for i in json.loads(row[0]))
+    except sqlite3.OperationalError:
+        pass
+    decl = dict((r[1], r[2].upper()) for r in
+                con.execute('PRAGMA table_info("{}")'.format(tbl)))
+    dt = []
+    for n in names:
+        if kept and n in kept:
+            dt.append((n, kept[n]))
+        elif n == 'fid' or 'INT' in decl[n]:
+            dt.append((n, '<i8'))
+        elif any(i in decl[n] for i in ('REAL', 'FLOA', 'DOUB', 'NUMERIC')):
+            dt.append((n, '<f8'))
+        elif 'BOOL' in decl[n]:
+            dt.append((n, '?'))
+        else:
+            w = con.execute('SELECT MAX(LENGTH("{}")) FROM "{}"'
+                            .format(n, tbl)).fetchone()[0]
+            dt.append((n, 'U{}'.format(max(w or 1, 4))))
+    return dt
+
+
+def sql_arr(db, tbl, flds="*", where=None, params=(), extent=None,
+            geom=True, batch=50000):
+    """Read a table from a SQLite database/GeoPackage to arrays.
+
+    Requires:
+    --------
+    `db`, `tbl` : string
+        The database and table
+    `flds` : fields
+        "*" for all attribute fields or a list of field names
+    `where` : string, optional
+        An SQL where clause, eg. "Town = ? AND Pop > ?"
+    `params` : sequence
+        Values for the ? in the where clause
+    `extent` : L, B, R, T, optional
+        Only records whose envelope intersects the extent, using the R*Tree
+    `geom` : boolean
+        True, also return the geometry in the `arc_np` layout, with ID_num
+        being the fid
+
+    Returns:
+    -------
+    The attribute array, with a `fid` field, or a tuple of the attribute and
+    geometry arrays if `geom` is True and the table has geometry.
+
+    >>> a, g = sql_arr(db, 'parcels', extent=[0, 0, 100, 100])
+    >>> a = sql_arr(db, 'parcels', where='Area > ?', params=(10,),
+    ...             geom=False)
+    """
+    con = sqlite3.connect(db)
+    try:
+        info = con.execute('PRAGMA table_info("{}")'.format(tbl)).fetchall()
+        all_names = [r[1] for r in info]
+        has_geom = 'geom' in all_names
+        names = [n for n in all_names if n not in ('fid', 'geom')]
+        if flds != "*":
+            names = [n for n in names if n in flds]
+        names = ['fid'] + names
+        dt = _table_dtype(con, tbl, names)
+        sel = ", ".join(['t."{}"'.format(n) for n in names])
+        sql = 'SELECT {} FROM "{}" t'.format(sel, tbl)
+        clauses = []
+        args = list(params)
+        if extent is not None:
+            L, B, R, T = extent
+            sql += ' JOIN "rtree_{}_geom" r ON t.fid = r.id'.format(tbl)
+            clauses.append("r.minx <= ? AND r.maxx >= ? AND "
+                           "r.miny <= ? AND r.maxy >= ?")
+            args = [R, L, T, B] + args
+        if where:
+            clauses.append("({})".format(where))
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY t.fid"
+        a = cursor_arr(con.execute(sql, args), dt, batch=batch)
+        if not (geom and has_geom):
+            return a
+        g_sql = sql.replace(sel, 't.fid, t.geom', 1)
+        cur = con.execute(g_sql, args)
+        fid_parts = []
+        while True:
+            rows = cur.fetchmany(batch)
+            if not rows:
+                break
+            for fid, blob in rows:
+                if blob is None:
+                    continue
+                fid_parts.extend((fid, j, p)
+                                 for j, p in enumerate(_gpkg_parts(blob)))
+    finally:
+        con.close()
+    if fid_parts:
+        xy = np.concatenate([p for _, _, p in fid_parts])
+    else:
+        xy = np.zeros((0, 2))
+    cnt = [len(p) for _, _, p in fid_parts]
+    g = np.empty((len(xy),), dtype=dt_geom)
+    g['ID_num'] = np.repeat([f for f, _, _ in fid_parts], cnt)
+    g['Part_num'] = np.repeat([j for _, j, _ in fid_parts], cnt)
+    g['Xs'] = xy[:, 0]
+    g['Ys'] = xy[:, 1]
+    return a, g
+
+
+# ----------------------------------------------------------------------
+# __main__ .... code section
+if __name__ == "__main__":
+    """Optionally...
+    : - print the script source name.
+    : - run the _demo
+    """
+#    print("Script... {}".format(script))
+#    db = r"C:\Git_Dan\a_Data\arraytools.gpkg"
+#    a, g = sql_arr(db, 'Carp_5x5km',
+#                   extent=[300000, 5025000, 305000, 5030000])
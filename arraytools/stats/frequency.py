@@ -46,6 +46,7 @@ import numpy as np
 import numpy.lib.recfunctions as rfn
 from arraytools._common import tweet
 from arraytools.frmts import frmt_rec
+from arraytools.tools import sort_keys
 import arcpy
 
 ft = {'bool': lambda x: repr(x.astype('int32')),
@@ -69,14 +70,15 @@ def freq(a, flds=None):
     Notes
     -----
     (1) slice the input array by the classification fields
-    (2) sort the sliced array using the flds as sorting keys
+    (2) sort the sliced array using the flds as sorting keys, packed into
+        one integer key by `sort_keys`
     (3) use unique on the sorted array to return the results
     (4) a quick histogram to get the counts until numpy 1.12 can be used
         then ship the results back.  only uni and vals is needed. The
         rest is for testing and future work.
     """
     a = a[flds]  # (1)
-    idx = np.argsort(a, axis=0, order=flds)  # (2)
+    idx = sort_keys(a, flds)  # (2)
     a_sort = a[idx]
     final = np.unique(a_sort, return_index=True, return_inverse=True,
                       return_counts=True)  # (3)
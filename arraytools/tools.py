@@ -143,6 +143,15 @@ Useage:
 
 **8.  nd_rec and nd_struct** : example
 
+** nd_view(a), struct_view(a), xy_view(a), xy_struct(a)** : the view layer
+
+Structured arrays to ndarrays and back as views, when the fields have one
+dtype and are evenly spaced, or the columns are adjacent.  Otherwise a copy
+is made with a warning, copy=False raises instead.
+::
+    xy = xy_view(pnts)        # X, Y (or Shape) fields of pnts, N x 2 view
+    pnts = xy_struct(xy)      # back to X, Y fields, still a view
+
 ** nd2struct(a)** : np2rec ... shell around above
 
 ndarray to structured array or recarray
@@ -274,7 +283,7 @@ Block an array given an input array, a window and a nodata value.
     mask .... snipped ....
 
 
-**18. find(a, func, this=None, count=0, keep=[], prn=False, r_lim=2)**
+**18. find(a, func, this=None, count=0, keep=None, prn=False, r_lim=2)**
 
     func - (cumsum, eq, neq, ls, lseq, gt, gteq, btwn, btwni, byond)
            (        ==,  !=,  <,   <=,  >,   >=,  >a<, =>a<=,  <a> )
@@ -324,6 +333,9 @@ in ascending order.
 
 **26. n_smallest(a, n).. n smallest counterpart**
 
+    top_k(a, num, axis, largest, fld) returns the values and indices, and
+    top_k_blocks keeps a running top k over blocks of a large array
+
 **27. rc_vals(a)**
 
 **28. xy_vals(a) ... array to x, y, values**
@@ -337,12 +349,28 @@ Sort 2d ndarray by column
              [1, 4, 1, 3],               [2, 3, 2, 2],
              [2, 1, 2, 4]])              [1, 4, 1, 3]])
 
-**30. sort_cols_by_row**
+**30. sort_cols_by_row, sort_keys(a, flds=None, descending=False)**
+
+Sort structured arrays by several fields, or 2D arrays by their columns.
+The fields are packed into a single uint64 key where they fit, or lexsorted.
+::
+    a[sort_keys(a, ['County', 'Town'])]  # == np.sort(a, order=[...])
 
 **31. radial_sort(pnts, cent=None)**
 
 **32. sequences(data, stepsize)**
 
+**33. rle(a, stepsize=0), rle_encode(a), rle_decode(runs, shape, rows)**
+::
+    rle(np.array([1, 1, 2, 2, 2, 1]))
+    (array([0, 2, 5]), array([2, 3, 1]), array([1, 2, 1]))  # start, len, val
+
+**34. join_arrs(a, b, keys, b_keys=None, how='inner', suffix='_b')**
+
+Inner or left join of two structured arrays on one or more key fields.
+::
+    join_arrs(parcels, results, 'OBJECTID', 'IDs', how='left')
+
 
 References:
 ----------
@@ -381,11 +409,13 @@ warnings.simplefilter('ignore', FutureWarning)
 __all__ = ['_func', '_help', '_pad_', 'arr2xyz', 'block', 'block_arr',
            'change_arr', 'doc_func', 'find', 'get_func', 'get_modu',
            'group_pnts', 'group_vals', 'info', 'is_in', 'make_blocks',
-           'make_flds', 'n_largest', 'n_smallest', 'nd2struct',
-           'num_to_mask', 'num_to_nan', 'pack_last_axis',
-           'rc_vals', 'nd_rec', 'reclass',
+           'make_flds', 'n_largest', 'n_smallest', 'nd2struct', 'nd_view',
+           'num_to_mask', 'num_to_nan', 'pack_last_axis', 'top_k',
+           'top_k_blocks', 'join_arrs',
+           'rc_vals', 'nd_rec', 'reclass', 'rle', 'rle_decode', 'rle_encode',
            'rolling_stats', 'scale', 'sequences', 'sort_cols_by_row',
-           'sort_rows_by_col', 'split_array', 'stride', 'uniq', 'xy_vals']
+           'sort_keys', 'sort_rows_by_col', 'split_array', 'stride',
+           'struct_view', 'uniq', 'xy_struct', 'xy_vals', 'xy_view']
 
 __xtras__ = ['_check', 'time_deco', 'run_deco', '_demo_tools']
 __outside__ = ['dedent', 'indent']
@@ -393,16 +423,18 @@ __outside__ = ['dedent', 'indent']
 """  Alphabetical listing
 :Members: .....
   ['__all__', '__builtins__', '__cached__', '__doc__', '__file__',
-  '__loader__','__name__', '__outside__', '__package__', '__spec__',
+  '__loader__', '__name__', '__outside__', '__package__', '__spec__',
   '__xtras__', '_demo_tools', '_func', '_help', '_pad_', 'arr2xyz',
   'as_strided', 'block', 'block_arr', 'change_arr', 'data_path', 'dedent',
-  'doc_func', 'find', 'ft', 'get_func', 'get_modu', 'group_pnts', 'group_vals',
-  'indent', 'info', 'is_in', 'make_blocks', 'make_flds', 'n_largest',
-  'n_smallest', 'nd2rec', 'nd2struct', 'nd_rec', 'nd_struct', 'np',
-  'num_to_mask', 'num_to_nan', 'pack_last_axis', 'pyramid', 'radial_sort',
-  'rc_vals', 'reclass', 'rolling_stats', 'run_deco', 'scale', 'script',
-  'sequences', 'sliding_window_view', 'sort_cols_by_row', 'sort_rows_by_col',
-  'split_array', 'stride', 'sys', 'time_deco', 'uniq', 'warnings', 'xy_vals']
+  'doc_func', 'find', 'ft', 'get_func', 'get_modu', 'group_pnts',
+  'group_vals', 'indent', 'info', 'is_in', 'join_arrs', 'make_blocks',
+  'make_flds', 'n_largest', 'n_smallest', 'nd2rec', 'nd2struct', 'nd_rec',
+  'nd_struct', 'nd_view', 'np', 'num_to_mask', 'num_to_nan',
+  'pack_last_axis', 'pyramid', 'radial_sort', 'rc_vals', 'reclass',
+  'rolling_stats', 'run_deco', 'scale', 'script', 'sequences',
+  'sliding_window_view', 'sort_cols_by_row', 'sort_keys', 'sort_rows_by_col',
+  'split_array', 'stride', 'struct_view', 'sys', 'time_deco', 'uniq',
+  'warnings', 'xy_struct', 'xy_vals', 'xy_view']
 """
 
 ft = {'bool': lambda x: repr(x.astype(np.int32)),
@@ -424,6 +456,9 @@ def time_deco(func):  # timing originally
 
     Uncomment the import or move it to within the script.
 
+    This prints, and returns the time rather than the result, so use it for
+    a quick check only.  `instrument.profiled` keeps records quietly.
+
     Useage::
 
         @time_deco  # on the line above the function
@@ -455,7 +490,8 @@ def run_deco(func):
 
     - Requires : from functools import wraps
 
-    Uncomment the import or move it to within the script.
+    Uncomment the import or move it to within the script.  For a record
+    of calls and times, see `instrument.profiled`.
 
     Useage::
 
@@ -910,10 +946,10 @@ def nd_rec(a, flds=None, types=None):
 
     Requires:
     ---------
-    flds : string or None
-        flds='a, b, c'
-    types : string or None
-        types='U8, f8, i8'
+    flds : string, list or None
+        flds='a, b, c' or ['a', 'b', 'c']
+    types : string, list or None
+        types='U8, f8, i8' or ['U8', 'f8', 'i8']
 
     See also:
     ---------
@@ -922,7 +958,7 @@ def nd_rec(a, flds=None, types=None):
     Notes:
     -----
     The a.T turns the columns to rows so that each row can be assigned a
-    separate data type.
+    separate data type.  Without new types a view of `a` is returned.
 
     Example::
 
@@ -937,9 +973,12 @@ def nd_rec(a, flds=None, types=None):
     if flds is None:
         flds = list("ABCDEFGHIJKLMNOPQRSTUVWXYZ")[:c]
         flds = ", ".join([n for n in flds])
-    if types is None:
-        types = a.dtype.str  # a.dtype.descr[0][1]
-        types = ", ".join(["{}".format(types) for i in range(c)])
+    if isinstance(flds, str):
+        flds = [n.strip() for n in flds.split(",")]
+    if isinstance(types, str):
+        types = [t.strip() for t in types.split(",")]
+    if types is None or all(np.dtype(t) == a.dtype for t in types):
+        return struct_view(a, flds).view(np.recarray)
     a_r = np.core.records.fromarrays(a.transpose(),
                                      names=flds,
                                      formats=types)
@@ -969,6 +1008,9 @@ def nd_struct(a, flds=None, types=None):
         array([('0',  1., 2), ('3',  4., 5), ('6',  7., 8)],
               dtype=[('A', '<U8'), ('B', '<f8'), ('C', '<i8')])
 
+    The result is a view of `a` when the types are those of `a` (see
+    `struct_view`), otherwise a copy with the new types.
+
     Timing of nd_rec and nd_struct
 
     >>> %timeit nd_rec(a, flds='a, b, c', types='U8, f8, i8')
@@ -978,20 +1020,18 @@ def nd_struct(a, flds=None, types=None):
     253 µs ± 27.1 µs per loop (mean ± std. dev. of 7 runs, 1000 loops each)
     """
     _, c = a.shape
-    dt_base = [a.dtype.str] * c  # a.dtype.descr[0][1]
     if flds is None:
         flds = list("ABCDEFGHIJKLMNOPQRSTUVWXYZ")[:c]
-    if types is None:
-        types = dt_base
-    dt0 = np.dtype(list(zip(flds, dt_base)))
+    if types is None or all(np.dtype(t) == a.dtype for t in types):
+        return struct_view(a, flds)
     dt1 = list(zip(flds, types))
-    a_s = a.view(dtype=dt0).squeeze(axis=-1).astype(dt1)
+    a_s = struct_view(np.ascontiguousarray(a), flds).astype(dt1)
     return a_s
 
 
 #  nd_struct and np2rec .... code section
 def nd2struct(a, fld_names=None):
-    """Return a view of an ndarray as structured array with a uniform dtype/
+    """Return a view of an ndarray as structured array with a uniform dtype.
 
     Parameters
     ----------
@@ -1017,6 +1057,7 @@ def nd2struct(a, fld_names=None):
 
     See Also
     --------
+    struct_view, nd_view : the view layer used, they report copies
     pack_last_axis(arr, names=None) at the end
 
     :-----------------------------------------------------------
@@ -1035,16 +1076,168 @@ def nd2struct(a, fld_names=None):
         names = fld_names
     else:  # from... pack_last_axis
         names = ['f{:02.0f}'.format(i) for i in range(cols)]
-    return a.view([(n, a.dtype) for n in names]).squeeze(-1)
+    return struct_view(a, names)
 
 
 def nd2rec(a, fld_names=None):
     """Shell to nd2struct but yielding a recarray.
     """
-    a = nd2struct(a, fld_names=None)
+    a = nd2struct(a, fld_names=fld_names)
     return a.view(type=np.recarray)
 
 
+# ---- views between structured arrays and ndarrays
+def _fld_names(cols):
+    """Default field names, A to Z, or f00, f01... for more than 26"""
+    if cols <= 26:
+        return list("ABCDEFGHIJKLMNOPQRSTUVWXYZ")[:cols]
+    return ['f{:02.0f}'.format(i) for i in range(cols)]
+
+
+def _view_plan(a, flds):
+    """The base dtype and the byte step between the values of the fields
+    when an ndarray view of them is possible, otherwise None and the reason.
+    Subarray fields, eg. ('XY', '<f8', (2,)), count as several values.  A
+    nested field among others raises a ValueError, there is no common dtype.
+    """
+    bases, offs = [], []
+    for f in flds:
+        dt, off = a.dtype.fields[f][:2]
+        if dt.names:
+            raise ValueError("field {} is structured, it can only be "
+                             "unpacked on its own".format(f))
+        bases.append(dt.base)
+        offs.extend(off + i*dt.base.itemsize
+                    for i in range(int(np.prod(dt.shape))))
+    if any(b != bases[0] for b in bases):
+        return None, "mixed dtypes {}".format(sorted(set(map(str, bases))))
+    step = offs[1] - offs[0] if len(offs) > 1 else bases[0].itemsize
+    if step == 0 or np.any(np.diff(offs) != step):
+        return None, "fields {} are not evenly spaced".format(flds)
+    return (bases[0], len(offs), step), ""
+
+
+def _copied(msg, copy):
+    """Raise or warn that a copy is needed, see nd_view and struct_view"""
+    if copy is False:
+        raise ValueError("A view isn't possible, {}".format(msg))
+    if copy is None:
+        warnings.warn("copied, a view isn't possible, {}".format(msg),
+                      stacklevel=3)
+
+
+def nd_view(a, flds=None, copy=None):
+    """Return the fields of a structured array as an ndarray, a view if the
+    memory layout allows it.
+
+    Requires:
+    --------
+    `a` : structured array
+        An ndarray is returned as it is
+    `flds` : string or list of strings
+        The fields, all by default.  A single nested field, eg. 'Shape'
+        with X and Y, is replaced by its fields.  Nested fields can't be
+        mixed with others, a ValueError is raised.
+    `copy` : None, True or False
+        None, a view if possible, otherwise a copy and a warning.  True,
+        always a copy.  False, a view or a ValueError.
+
+    Returns:
+    -------
+    An array with the shape of `a` plus one axis for the fields.
+
+    Notes:
+    -----
+    A view needs fields of one dtype, evenly spaced in the record, which
+    includes any run of adjacent fields, eg. X and Y of an ID, X, Y table,
+    in either order.
+    The other fields are simply skipped over, nothing is copied.  Mixed
+    dtypes are copied to their common dtype.
+
+    >>> xy = nd_view(pnts, ['X', 'Y'])   # xy.base is pnts
+    """
+    if a.dtype.names is None:
+        return a
+    flds = a.dtype.names if flds is None else flds
+    flds = [flds] if isinstance(flds, str) else list(flds)
+    if len(flds) == 1 and a.dtype[flds[0]].names:
+        return nd_view(a[flds[0]], None, copy)
+    plan, msg = _view_plan(a, flds)
+    if plan is not None and copy is not True:
+        base, k, step = plan
+        first = a[flds[0]]
+        first = first[(Ellipsis,) + (0,)*(first.ndim - a.ndim)]
+        return as_strided(first, shape=a.shape + (k,),
+                          strides=a.strides + (step,),
+                          writeable=a.flags.writeable)
+    if plan is None:
+        _copied(msg, copy)
+    cols = [a[f].reshape(a.shape + (-1,)) for f in flds]
+    dt = np.result_type(*[c.dtype for c in cols])
+    out = np.empty(a.shape + (sum(c.shape[-1] for c in cols),), dtype=dt)
+    i = 0
+    for c in cols:
+        out[..., i:i + c.shape[-1]] = c
+        i += c.shape[-1]
+    return out
+
+
+def struct_view(a, names=None, copy=None):
+    """Return an ndarray as a structured array with a field for each column
+    (the last axis), a view if the memory layout allows it.
+
+    Requires:
+    --------
+    `a` : ndarray
+        A structured array is returned as it is
+    `names` : list of strings
+        The field names, A, B, C... by default
+    `copy` : None, True or False
+        As for `nd_view`.  A view needs the values in a row to be adjacent,
+        which isn't the case for a transposed or column sliced array.
+
+    >>> pnts = struct_view(xy, ['X', 'Y'])   # pnts.base is xy
+    """
+    if a.dtype.names:
+        return a
+    cols = a.shape[-1]
+    names = _fld_names(cols) if names is None else list(names)
+    if len(names) != cols:
+        raise ValueError("{} names for {} columns".format(len(names), cols))
+    if a.strides[-1] != a.itemsize and cols > 1:
+        _copied("the columns aren't adjacent in memory", copy)
+        copy = True
+    if copy:
+        a = a.copy()
+    return a.view([(n, a.dtype) for n in names])[..., 0]
+
+
+def xy_view(a, flds=None, copy=None):
+    """Unpack the coordinates of a point array to an N x 2 ndarray (N x 3
+    with Z), a view if possible (see `nd_view`).  The coordinates are the
+    fields of a nested `Shape` field, or X, Y (and Z) or `flds` if given.
+    An ndarray is returned as it is.
+    """
+    names = a.dtype.names
+    if names is None:
+        return a
+    if flds is None:
+        if 'Shape' in names and a.dtype['Shape'].names:
+            flds = 'Shape'
+        elif 'X' in names and 'Y' in names:
+            flds = ['X', 'Y'] + (['Z'] if 'Z' in names else [])
+    return nd_view(a, flds, copy)
+
+
+def xy_struct(a, names=('X', 'Y'), copy=None):
+    """Pack an N x 2 (or N x 3) array of coordinates to a structured array
+    with X, Y (Z) fields, a view if possible (see `struct_view`).
+    """
+    if names is not None and len(names) != a.shape[-1]:
+        names = ['X', 'Y', 'Z'][:a.shape[-1]]
+    return struct_view(a, names, copy)
+
+
 # ---- (9) arr2xyz sparse arrays and rc_vals, xy_vals.... code section ----
 #
 def arr2xyz(a, keep_masked=False, verbose=False):
@@ -1098,24 +1291,39 @@ def arr2xyz(a, keep_masked=False, verbose=False):
         `num_to_mask(a)` and  `num_to_nan(a)` to produce masks prior to
         conversion
 
+    Notes
+    -----
+    The table is filled in place, the columns and rows by broadcasting, or
+    from the flat index of the unmasked cells, np.divmod-style.  No
+    meshgrids or stacked copies are made.
     """
     if a.ndim == 1:
         a = a.reshape(a.shape[0], 1)
     if a.ndim > 2:
         a = a.reshape(np.product(a.shape[:-1]), a.shape[-1])
     r, c = a.shape
-    XX, YY = np.meshgrid(np.arange(c), np.arange(r))
-    XX = XX.ravel()
-    YY = YY.ravel()
-    if isinstance(np.ma.getmask(a), np.ndarray):
-        tbl = np.ma.vstack((XX, YY, a.ravel()))
-        tbl = tbl.T
-        if not keep_masked:
-            m = tbl[:, 2].mask
-            tbl = tbl[~m].data
+    vals = np.ma.getdata(a).ravel()
+    m = np.ma.getmask(a)
+    dt = np.result_type(np.intp, vals.dtype)
+    if isinstance(m, np.ndarray) and not keep_masked:
+        idx = np.flatnonzero(~m)
+        tbl = np.empty((len(idx), 3), dtype=dt)
+        tbl[:, 1] = idx // c
+        tbl[:, 0] = idx - tbl[:, 1] * c
+        tbl[:, 2] = vals[idx]
     else:
-        tbl = np.stack((XX, YY, a.ravel()), axis=1)
+        tbl = np.empty((r * c, 3), dtype=dt)
+        tbl[:, 0].reshape(r, c)[...] = np.arange(c)
+        tbl[:, 1].reshape(r, c)[...] = np.arange(r)[:, None]
+        tbl[:, 2] = vals
+        if isinstance(m, np.ndarray):
+            msk = np.zeros(tbl.shape, dtype=bool)
+            msk[:, 2] = m.ravel()
+            tbl = np.ma.array(tbl, mask=msk)
     if verbose:
+        XX, YY = np.meshgrid(np.arange(c), np.arange(r))
+        XX = XX.ravel()
+        YY = YY.ravel()
         frmt = """
         ----------------------------
         Meshgrid demo: array to x,y,z table
@@ -1137,29 +1345,72 @@ def arr2xyz(a, keep_masked=False, verbose=False):
     else:
         return tbl
 
+
+def _rc_table(a, dt, rc, nodata=None, r0=0):
+    """Fill a structured row, column, value table for a 2D array.  `rc`
+    names the row, column and value fields of `dt`.  Masked cells, and those
+    equal to `nodata`, are left out.  `r0` is added to the row numbers.
+    """
+    nr, nc = a.shape
+    vals = np.ma.getdata(a)
+    m = np.ma.getmask(a)
+    valid = None if m is np.ma.nomask else ~m
+    if nodata is not None:
+        bad = np.isnan(vals) if nodata != nodata else (vals == nodata)
+        valid = ~bad if valid is None else (valid & ~bad)
+    r_, c_, v_ = rc
+    if valid is None:
+        out = np.empty((nr * nc,), dtype=dt)
+        out[r_].reshape(nr, nc)[...] = np.arange(r0, r0 + nr)[:, None]
+        out[c_].reshape(nr, nc)[...] = np.arange(nc)
+        out[v_] = vals.ravel()
+    else:
+        idx = np.flatnonzero(valid)
+        out = np.empty((len(idx),), dtype=dt)
+        out[r_] = idx // nc
+        out[c_] = idx - out[r_] * nc
+        out[r_] += r0
+        out[v_] = vals.ravel()[idx]
+    return out
+
+
+def _rc_blocks(a, dt, rc, nodata, chunk):
+    """Yield `_rc_table` for blocks of `chunk` rows"""
+    for r0 in range(0, a.shape[0], chunk):
+        yield _rc_table(a[r0:r0 + chunk], dt, rc, nodata, r0)
+
+
 # ---- rc_vals ----
-def rc_vals(a):
+def rc_vals(a, nodata=None, chunk=None):
     """Convert a 2D ndarray to a structured row, col, values array.
+
+    `nodata` : number, optional
+        Cells with this value (np.nan allowed), and masked cells, are left
+        out
+    `chunk` : integer, optional
+        Return a generator of tables for blocks of this many rows, rather
+        than one table
+
+    >>> for blk in rc_vals(big_raster, nodata=-9999, chunk=1000):
+    ...     do_something(blk)
     """
     dt = [('r', '<i8'), ('c', '<i8'), ('Val', a.dtype.str)]
-    r_c = [(*ij, v) for ij, v in np.ndenumerate(a)]
-    vals = np.asarray(r_c, dtype=dt)
-    return vals
+    rc = ('r', 'c', 'Val')
+    if chunk:
+        return _rc_blocks(a, dt, rc, nodata, chunk)
+    return _rc_table(a, dt, rc, nodata)
 
 
 # ---- xy_vals ----
-def xy_vals(a):
-    """Convert a 2D ndarray to a structured x, y, values array.
+def xy_vals(a, nodata=None, chunk=None):
+    """Convert a 2D ndarray to a structured x, y, values array.  X is the
+    column and Y the row.  `nodata` and `chunk` as for `rc_vals`.
     """
-    r, c = a.shape
-    n = r * c
-    x, y = np.meshgrid(np.arange(c), np.arange(r))
     dt = [('X', '<i8'), ('Y', '<i8'), ('Vals', a.dtype.str)]
-    out = np.zeros((n,), dtype=dt)
-    out['X'] = x.ravel()
-    out['Y'] = y.ravel()
-    out['Vals'] = a.ravel()
-    return out
+    rc = ('Y', 'X', 'Vals')
+    if chunk:
+        return _rc_blocks(a, dt, rc, nodata, chunk)
+    return _rc_table(a, dt, rc, nodata)
 
 
 # ----------------------------------------------------------------------------
@@ -1190,13 +1441,21 @@ def change_arr(a, order=None, prn=False):
         Use... `info(a, verbose=True)`
         This gives field names which can be copied for use here.
 
+    The result is a view of `a` for structured arrays and for evenly
+    spaced columns, eg. [0, 1, 2] or [1, 3], of an ndarray.
+
     """
     if order is None or (not isinstance(order, (list, tuple))):
         print("Order not given in a list or tuple")
         return a
     names = a.dtype.names
     if names is None:
-        b = a[:, order]
+        step = order[1] - order[0] if len(order) > 1 else 1
+        in_range = all(0 <= i < a.shape[1] for i in order)
+        if in_range and step > 0 and np.all(np.diff(order) == step):
+            b = a[:, order[0]:order[-1] + 1:step]  # a view, no copy
+        else:
+            b = a[:, order]
     else:
         out_flds = []
         out_flds = [i for i in order if i in names]
@@ -1214,19 +1473,43 @@ def change_arr(a, order=None, prn=False):
 
 
 # ---- (12) scale .... code section ----
-def scale(a, x=2, y=2, num_z=None):
+def _scale_index(n, f, method='nearest'):
+    """Index map for resampling an axis of length `n` by factor `f`.  Returns
+    the source index of each output cell for `nearest`, or the lower and
+    upper source indices and the weight of the upper for `bilinear`.  Cell
+    centres are matched, so integer factors repeat each cell `f` times.
+    """
+    N = max(int(round(n * f)), 1)
+    src = (np.arange(N) + 0.5) / f
+    if method == 'nearest':
+        return np.minimum(src.astype(np.intp), n - 1)
+    src = np.clip(src - 0.5, 0, n - 1)
+    i0 = src.astype(np.intp)
+    i1 = np.minimum(i0 + 1, n - 1)
+    return i0, i1, src - i0
+
+
+def scale(a, x=2, y=2, num_z=None, method='nearest', view=False):
     """Scale the input array repeating the array values up by the
     x and y factors.
 
     Parameters:
     ----------
-    `a` : An ndarray, 1D arrays will be upcast to 2D.
+    `a` : An ndarray, 1D arrays will be upcast to 2D.  3D arrays are
+    treated as a stack and each band is scaled.
+
+    `x y` : Factors to scale the array in x (col) and y (row).  Integer
+    factors repeat the values, others are resampled using `method`.
 
-    `x y` : Factors to scale the array in x (col) and y (row).  Scale factors
-    must be greater than 2.
+    `num_z` : For 3D, produces the 3rd dimension, ie. if num_z = 2 with the
+    defaults, you will get an array with shape=(3, 6, 6), the original
+    plus num_z copies.
 
-    `num_z` : For 3D, produces the 3rd dimension, ie. if num_z = 3 with the
-    defaults, you will get an array with shape=(3, 6, 6),
+    `method` : 'nearest' or 'bilinear', for non-integer factors, or to
+    smooth integer ones with 'bilinear'.
+
+    `view` : True, return a read-only view rather than an array, for
+    integer factors with `nearest`.  See Notes.
 
     Examples:
     --------
@@ -1251,26 +1534,45 @@ def scale(a, x=2, y=2, num_z=None):
       2, 2, 3, 3    2, 2, 3, 3    2, 2, 3, 3
       sub (0)       sub (1)       sub (2)
 
+    Integer factors use np.broadcast_to, a[:, None, :, None] broadcast to
+    (rows, y, cols, x), so nothing is copied.  With `view`, that view is
+    returned (shape (..., rows, y, cols, x)), reshape it to
+    (rows*y, cols*x) to make the array when it is needed.  Otherwise the
+    reshape, the only copy, is done here.  `num_z` layers are a broadcast
+    of the scaled array, copied only if `view` is False.
+
+    Non-integer factors use index maps (`_scale_index`), made once for the
+    rows and once for the columns, and shared by all bands.
     """
-    if (x < 1) or (y < 1):
-        print("x or y scale < 1... read the docs\n{}".format(scale.__doc__))
+    if (x <= 0) or (y <= 0):
+        print("x or y scale <= 0... read the docs\n{}".format(scale.__doc__))
         return None
     a = np.atleast_2d(a)
-    z0 = np.tile(a.repeat(x), y)  # repeat for x, then tile
-    z1 = np.hsplit(z0, y)         # split into y parts horizontally
-    z2 = np.vstack(z1)            # stack them vertically
-    if a.shape[0] > 1:            # if there are more, repeat
-        z3 = np.hsplit(z2, a.shape[0])
-        z3 = np.vstack(z3)
+    lead, (r, c) = a.shape[:-2], a.shape[-2:]
+    ints = (x == int(x)) and (y == int(y))
+    if ints and method == 'nearest':
+        x, y = int(x), int(y)
+        v = np.broadcast_to(a[..., :, None, :, None], lead + (r, y, c, x))
+        if view and num_z in (0, None):
+            return v
+        z = v.reshape(lead + (r * y, c * x))
+        if not z.flags.writeable:     # x = y = 1, still a view
+            z = z.copy()
+    elif method == 'nearest':
+        ri, ci = _scale_index(r, y), _scale_index(c, x)
+        z = a[..., ri[:, None], ci]
+    elif method == 'bilinear':
+        r0, r1, wr = _scale_index(r, y, method)
+        c0, c1, wc = _scale_index(c, x, method)
+        z = a[..., r0, :] * (1. - wr[:, None]) + a[..., r1, :] * wr[:, None]
+        z = z[..., c0] * (1. - wc) + z[..., c1] * wc
     else:
-        z3 = np.vstack(z2)
+        raise ValueError("method must be 'nearest' or 'bilinear'")
     if num_z not in (0, None):
-        d = [z3]
-        for i in range(num_z):
-            d.append(z3)
-        z3 = np.dstack(d)
-        z3 = np.rollaxis(z3, 2, 0)
-    return z3
+        z = np.broadcast_to(z, (num_z + 1,) + z.shape)
+        if not view:
+            z = z.copy()
+    return z
 
 
 # ---- (13) split_array .... code section ----
@@ -1494,7 +1796,39 @@ def _func(fn, a, this):
         return np.where((a < low) | (a > upp))[0]
 
 
-# @time_deco
+def _cumsum_split(a, this):
+    """Called by 'find' for `cumsum`.  Return the group number of each value
+    of `a`, splitting it into consecutive groups whose sums are <= `this`.
+
+    Each group takes at least one value, so a value larger than `this` is a
+    group by itself.  When the groups are large, their ends are found by a
+    binary search (bisect) of the cumulative sum, one search per group.
+    Otherwise, or if negative values leave the cumulative sum unordered, it
+    is scanned once.
+    """
+    from bisect import bisect_right
+    N = len(a)
+    cs = np.cumsum(a).tolist()
+    ends = []
+    start, base = 0, 0
+    if N and not (a < 0).any() and cs[-1] * 16 < N * this:
+        while start < N:
+            end = max(bisect_right(cs, base + this, start), start + 1)
+            ends.append(end)
+            base = cs[end - 1]
+            start = end
+    else:
+        lim = this
+        for i in range(1, N):
+            if cs[i] > lim:
+                ends.append(i)
+                lim = cs[i - 1] + this
+        if N:
+            ends.append(N)
+    sizes = np.diff(np.r_[0, ends]).astype('<i8')
+    return np.repeat(np.arange(len(sizes), dtype='<i8'), sizes)
+
+
 def find(a, func, this=None, count=0, keep=None, prn=False, r_lim=2):
     """Find the conditions that are met in an array, defined by `func`.
     `this` is the condition being looked for.  The other parameters are defined
@@ -1511,69 +1845,53 @@ def find(a, func, this=None, count=0, keep=None, prn=False, r_lim=2):
     `func` :
         `(cumsum, eq, neq, ls, lseq, gt, gteq, btwn, btwni, byond)`
         (        ==,  !=,  <,   <=,  >,   >=,  >a<, =>a<=,  <a> )
-    `count` :
-        only used for recursive functions
-    `keep` :
-        for future use
-    `verbose` :
+    `count`, `keep`, `r_lim` :
+        deprecated and ignored, `cumsum` was recursive and these limited
+        its depth.  Passing a value other than the default raises a
+        DeprecationWarning, they will be removed.
+    `prn` :
         True for test printing
-    `max_depth` :
-        prevent recursive functions running wild, it can be varied
 
-    Recursive functions:
-    -------------------
+    Split function:
+    ---------------
     cumsum :
-        An example of using recursion to split a list/array of data
-        parsing the results into groups that sum to this.  For example,
-        split input into groups where the total population is less than
-        a threshold (this).  The default is to use a sequential list,
-        however, the inputs could be randomized prior to running.
+        Split a list/array of data into consecutive groups whose sums are
+        less than or equal to `this`.  For example, split input into groups
+        where the total population is less than a threshold (this).  The
+        default is to use a sequential list, however, the inputs could be
+        randomized prior to running.  A value larger than `this` forms a
+        group by itself.  All groups are returned in one pass, see
+        `_cumsum_split`.
+
+        >>> find([3, 4, 2, 6, 1, 1, 5], 'cumsum', this=7)
+        array([(3, 0), (4, 0), (2, 1), (6, 2), (1, 2), (1, 3), (5, 3)],
+              dtype=[('orig', '<i8'), ('class', '<i8')])
 
     Returns
     -------
-        A 1D or 2D array meeting the conditions
+        A 1D array meeting the conditions.  For `cumsum`, a structured
+        array of the values, `orig`, and their group number, `class`.
 
     """
+    old = [n for n, used in [('count', count != 0),
+                             ('keep', keep is not None),
+                             ('r_lim', r_lim != 2)] if used]
+    if old:
+        warnings.warn("find: {} are deprecated and ignored".format(old),
+                      DeprecationWarning, stacklevel=2)
     a = np.asarray(a)              # ---- ensure array format
-    this = np.asarray(this)
     if prn:                        # ---- optional print
-        print("({}) Input values....\n  {}".format(count, a))
-    ix = _func(func, a, this)      # ---- sub function -----
-    if ix is not None:
-        keep.append(a[ix])         # ---- slice and save
-        if len(ix) > 1:
-            a = a[(len(ix)):]      # ---- use remainder
-        else:
-            a = a[(len(ix)+1):]
-    if prn:                        # optional print
-        print("  Remaining\n  {}".format(a))
-    # ---- recursion functions check and calls ----
-    if func in ['cumsum']:  # functions that support recursion
-        if (len(a) > 0) and (count < r_lim):  # recursive call
-            count += 1
-            find(a, func, this, count, keep, prn, r_lim)
-        elif count == r_lim:
-            frmt = """Recursion check... count {} == {} recursion limit
-                   Warning...increase recursion limit, reduce sample size\n
-                   or changes conditions"""
-            print(dedent(frmt).format(count, r_lim))
-    # ---- end recursive functions ----
-    # print("keep for {} : {}".format(func,keep))
-    #
-    if len(keep) == 1:   # for most functions, this is it
-        final = keep[0]
-    else:                # for recursive functions, there will be more
-        temp = []
-        incr = 0
-        for i in keep:
-            temp.append(np.vstack((i, np.array([incr]*len(i)))))
-            incr += 1
-        temp = (np.hstack(temp)).T
-        dt = [('orig', '<i8'), ('class', '<i8')]
-        final = np.zeros((temp.shape[0],), dtype=dt)
-        final['orig'] = temp[:, 0]
-        final['class'] = temp[:, 1]
-        # ---- end recursive section
+        print("Input values....\n  {}".format(a))
+    if func.lower().strip() in ['cumsum', 'csum', 'cu']:
+        a = a.ravel()
+        dt = [('orig', np.result_type(a.dtype, '<i8')), ('class', '<i8')]
+        final = np.zeros((a.shape[0],), dtype=dt)
+        final['orig'] = a
+        final['class'] = _cumsum_split(a, this)
+    else:
+        final = a[_func(func, a, np.asarray(this))]
+    if prn:
+        print("  Result\n  {}".format(final))
     return final
 
 
@@ -1621,7 +1939,7 @@ def group_pnts(a, key_fld='IDs', shp_flds=['Xs', 'Ys']):
 
 
 # ---- (20) group_vals .... code section ----
-def group_vals(seq, delta=1, oper='!='):
+def group_vals(seq, delta=1, oper='!=', runs=False):
     """Group consecutive values separated by no more than delta
 
     Parameters
@@ -1632,6 +1950,10 @@ def group_vals(seq, delta=1, oper='!='):
         difference between consecutive values
     `oper` :
         'eq', '==', 'ne', '!=', 'gt', '>', 'lt', '<'
+    `runs` :
+        False, return the list of groups.  True, return the start, length
+        and first value of each group as arrays (see `rle`), without making
+        an array for each group.
 
     Reference
     ---------
@@ -1645,17 +1967,11 @@ def group_vals(seq, delta=1, oper='!='):
     valid = ('eq', '==', 'ne', '!=', 'gt', '>', 'lt', '<')
     if oper not in valid:
         raise ValueError("operand not in {}".format(valid))
-    elif oper in ('==', 'eq'):
-        s = np.split(seq, np.where(np.diff(seq) == delta)[0]+1)
-    elif oper in ('!=', 'ne'):
-        s = np.split(seq, np.where(np.diff(seq) != delta)[0]+1)
-    elif oper in ('>', 'gt'):
-        s = np.split(seq, np.where(np.diff(seq) > delta)[0]+1)
-    elif oper in ('<', 'lt'):
-        s = np.split(seq, np.where(np.diff(seq) < delta)[0]+1)
-    else:
-        s = seq
-    return s
+    seq = np.asarray(seq)
+    brk = _run_breaks(seq, delta, oper)
+    if runs:
+        return _runs(seq, brk)
+    return np.split(seq, brk)
 
 
 # ---- (21) reclass .... code section ----
@@ -1852,52 +2168,124 @@ def is_in(find_in, using, not_in=False):
 
 
 # ---- (25) size-based .... n largest, n_smallest
+def top_k(a, num=1, axis=-1, largest=True, fld=None):
+    """Return the `num` largest (or smallest) values along an axis and
+    their indices, best first.
+
+    Requires:
+    --------
+    `a` : array
+        Any array.  For structured arrays, `fld` is the field to rank by and
+        the records are returned.
+    `num` : integer
+        The number to return, no more than the length of the axis
+    `axis` : integer or None
+        The axis, None to use the flattened array
+    `largest` : boolean
+        True for the largest values, False for the smallest
+
+    Returns:
+    -------
+    vals, idx : arrays
+        The values and their indices along `axis`, `num` long on that axis
+
+    >>> a = np.array([5, 1, 9, 3, 7])
+    >>> top_k(a, 2)
+    (array([9, 7]), array([2, 4]))
+
+    Notes:
+    -----
+    np.argpartition puts the `num` values in place, O(n), then only those
+    are sorted, rather than sorting the whole axis.  nan sorts as the
+    largest value, as in np.sort.
+    """
+    a = np.asanyarray(a)
+    keys = a if fld is None else a[fld]
+    if keys.dtype.names is not None:
+        raise ValueError("Use `fld` to rank a structured array")
+    if axis is None:
+        a, keys, axis = a.ravel(), keys.ravel(), -1
+    n = keys.shape[axis]
+    num = max(min(num, n), 0)
+    sel = np.arange(n - num, n) if largest else np.arange(num)
+    if 0 < num < n:
+        kth = n - num if largest else num - 1
+        p = np.take(np.argpartition(keys, kth, axis=axis), sel, axis=axis)
+    else:
+        p = np.take(np.argsort(keys, axis=axis), sel, axis=axis)
+    o = np.argsort(np.take_along_axis(keys, p, axis), axis=axis,
+                   kind='mergesort')
+    if largest:
+        o = np.flip(o, axis)
+    idx = np.take_along_axis(p, o, axis)
+    return np.take_along_axis(a, idx, axis), idx
+
+
+def top_k_blocks(blocks, num=1, largest=True, fld=None):
+    """A running `top_k` over blocks of values, eg. slices of a memmap too
+    large to read at once.  Each block is raveled.
+
+    Returns:
+    -------
+    vals, idx : arrays
+        As for `top_k`, the indices count from the start of the first block
+
+    >>> a = np.load("c:/temp/big.npy", mmap_mode='r')
+    >>> blks = (a[i:i + 2**22] for i in range(0, len(a), 2**22))
+    >>> vals, idx = top_k_blocks(blks, num=100)
+    """
+    vals = idx = None
+    off = 0
+    for b in blocks:
+        b = np.asanyarray(b).ravel()
+        v, i = top_k(b, num, -1, largest, fld)
+        i += off
+        off += b.size
+        if vals is not None:
+            v = np.concatenate((vals, v))
+            i = np.concatenate((idx, i))
+            s = top_k(v, num, -1, largest, fld)[1]
+            v, i = v[s], i[s]
+        vals, idx = v, i
+    return vals, idx
+
+
 def n_largest(a, num=1, by_row=True):
     """Return the 'num' largest entries in an array by row sorted by column.
-    Array dimensions <=3 supported
+    Array dimensions <=3 supported.  See `top_k` for the indices as well.
     """
     assert a.ndim <= 3, "Only arrays with ndim <=3 supported"
     if not by_row:
         a = a.T
-    num = min(num, a.shape[-1])
-    if a.ndim == 1:
-        b = np.sort(a)[-num:]
-    elif a.ndim >= 2:
-        b = np.sort(a)[..., -num:]
-    else:
-        return None
-    return b
+    return top_k(a, num, axis=-1, largest=True)[0][..., ::-1]
 
 
 # ---- n_smallest
 def n_smallest(a, num=1, by_row=True):
     """Return the 'n' smallest entries in an array by row sorted by column.
-    Array dimensions <=3 supported
+    Array dimensions <=3 supported.  See `top_k` for the indices as well.
     """
     assert a.ndim <= 3, "Only arrays with ndim <=3 supported"
     if not by_row:
         a = a.T
-    num = min(num, a.shape[-1])
-    if a.ndim == 1:
-        b = np.sort(a)[:num]
-    elif a.ndim >= 2:
-        b = np.sort(a)[..., :num]
-    else:
-        return None
-    return b
+    return top_k(a, num, axis=-1, largest=False)[0]
 
 
 # ---- sorting,  column and row sorting --------------------------------------
 #
 # ---- (29) sort_rows_by_col .... code section ----
 def sort_rows_by_col(a, col=0, descending=False):
-    """Sort a 2D array by column.
+    """Sort a 2D array by column, or a structured array by a field (name or
+    number) or a list of fields.
 
     >>> a =array([[0, 1, 2],    array([[6, 7, 8],
                   [3, 4, 5],           [3, 4, 5],
                   [6, 7, 8]])          [0, 1, 2]])
     """
     a = np.asarray(a)
+    if a.dtype.names:
+        col = a.dtype.names[col] if isinstance(col, int) else col
+        return a[sort_keys(a, col, descending)]
     shp = a.shape[0]
     if not (0 <= abs(col) <= shp):
         raise ValueError("column ({}) in range (0 to {})".format(col, shp))
@@ -1909,9 +2297,98 @@ def sort_rows_by_col(a, col=0, descending=False):
 
 # ---- (30) sort_cols_by_row ----
 def sort_cols_by_row(a, col=0, descending=False):
-    """Sort the rows of an array in the order of their column values
-    :  Uses lexsort """
-    return a[np.lexsort(np.transpose(a)[::-1])]
+    """Sort the rows of an array in the order of their column values, the
+    first column first.  Structured arrays are sorted by their fields.
+    :  Uses sort_keys """
+    return a[sort_keys(a, descending=descending)]
+
+
+def _key_codes(a, flds=None):
+    """The sort columns of `a` as uint64 codes and the number of values
+    each can take.  Integer, boolean and datetime columns are offset by
+    their minimum, anything else is replaced by its rank in np.unique.
+    """
+    if a.dtype.names:
+        flds = a.dtype.names if flds is None else flds
+        cols = [a[f] for f in ([flds] if isinstance(flds, str) else flds)]
+    elif a.ndim == 2:
+        flds = range(a.shape[1]) if flds is None else np.atleast_1d(flds)
+        cols = [a[:, i] for i in flds]
+    else:
+        cols = [a]
+    codes, sizes = zip(*[_col_codes(c) for c in cols])
+    return list(codes), list(sizes)
+
+
+def _col_codes(c):
+    """The uint64 codes of a 1D array and the number of values they span.
+    NaT is given the top code, so it sorts last as in np.sort.
+    """
+    if c.ndim > 1:
+        raise ValueError("Subarray fields, {}, can't be sort or join keys"
+                         .format(c.dtype.str + str(c.shape[1:])))
+    if c.dtype.kind in 'mM':
+        nat = np.isnat(c)
+        c = c.view(np.int64)
+        if nat.any():
+            c = c.copy()
+            c[nat] = c[~nat].max() + 1 if not nat.all() else 0
+    if c.dtype.kind in 'biu':
+        c = c.astype(np.int64) if c.dtype.kind == 'b' else c
+        lo, hi = int(c.min()), int(c.max())
+        return c.astype(np.uint64) - np.uint64(lo % 2**64), hi - lo + 1
+    u, inv = np.unique(c, return_inverse=True)
+    return inv.astype(np.uint64), len(u)
+
+
+def _pack_codes(codes, sizes):
+    """Pack the codes into one uint64 key, the first most significant, or
+    return None if they need more than 64 bits.
+    """
+    bits = [(s - 1).bit_length() for s in sizes]
+    if sum(bits) > 64:
+        return None
+    key = np.zeros(len(codes[0]), dtype=np.uint64)
+    for c, b in zip(codes, bits):
+        key <<= np.uint64(b)
+        key |= c
+    return key
+
+
+def sort_keys(a, flds=None, descending=False):
+    """Return the permutation that sorts a structured array by its fields,
+    or a 2D array by its columns, the first field (column) first.
+
+    Requires:
+    --------
+    `a` : array
+        A structured array, a 2D array or a 1D array
+    `flds` : string, list of strings or column numbers
+        The fields (columns) to sort by, all of them by default
+    `descending` : boolean
+        True, largest first.  Ties keep their order in either case.
+
+    Notes:
+    -----
+    The fields are turned into integer codes (see `_key_codes`) and, when
+    their ranges fit in 64 bits, packed into one uint64 key which is sorted
+    once.  Otherwise np.lexsort is used on the codes.  Both are stable and
+    much faster than np.argsort(a, order=flds) on the structured array.
+
+    >>> a[sort_keys(a, ['County', 'Town'])]  # same as np.sort(a, order=...)
+    """
+    a = np.asarray(a)
+    if len(a) == 0:
+        return np.arange(0)
+    codes, sizes = _key_codes(a, flds)
+    key = _pack_codes(codes, sizes)
+    if key is not None:
+        if descending:
+            key = ~key
+        return np.argsort(key, kind='stable')
+    if descending:
+        codes = [~c for c in codes]
+    return np.lexsort(codes[::-1])
 
 
 # ---- (31) radial sort -----
@@ -1943,7 +2420,8 @@ def radial_sort(pnts, cent=None):
 
 # ---- (32) sequences ----
 def sequences(data, stepsize=0):
-    """Return a list of arrays of sequences values denoted by stepsize
+    """Return the sequences of values denoted by stepsize, as a structured
+    array of their ID, first Value, Count and From_/To_ positions.
 
     data :
         List/array of values in 1D
@@ -1954,14 +2432,15 @@ def sequences(data, stepsize=0):
 
     >>> # check for incrementing sequence by 1's
     d = [1, 2, 3, 4, 4, 5]
-    s, o = sequences(d, 1, True)
-    # s = [array([1, 2, 3, 4]), array([4, 5])]
-    # o = array([[1, 4, 4],
-    #            [4, 2, 6]])
+    sequences(d, 1)
+    array([(0, 1, 4, 0, 4), (1, 4, 2, 4, 6)],
+          dtype=[('ID', '<i4'), ('Value', '<i4'), ('Count', '<i4'),
+                 ('From_', '<i4'), ('To_', '<i4')])
 
     Notes:
     ------
-    For strings, use
+    The runs come from `rle`, which works for strings and structured arrays
+    as well.  For strings, stepsize is ignored and equal values are used
 
     >>> partitions = np.where(a[1:] != a[:-1])[0] + 1
 
@@ -1977,23 +2456,305 @@ def sequences(data, stepsize=0):
     sequences-elements-from-an-array-in-numpy
     """
     #
-    a = np.array(data)
-    a_dt = a.dtype.kind
-    if a_dt in ('U', 'S'):
-        seqs = np.split(a, np.where(a[1:] != a[:-1])[0] + 1)
-        dt = [('ID', '<i4'), ('Value', a.dtype.str), ('Count', '<i4'),
-              ('From_', '<i4'), ('To_', '<i4')]
-    elif a_dt in ('i', 'f'):
-        seqs = np.split(a, np.where(np.diff(a) != stepsize)[0] + 1)
-        dt = [('ID', '<i4'), ('Value', '<i4'), ('Count', '<i4'),
-              ('From_', '<i4'), ('To_', '<i4')]
-    vals = [i[0] for i in seqs]
-    cnts = [len(i) for i in seqs]
-    seq_num = np.arange(len(cnts))
-    too = np.cumsum(cnts)
-    frum = np.zeros_like(too)
-    frum[1:] = too[:-1]
-    out = np.array(list(zip(seq_num, vals, cnts, frum, too)), dtype=dt)
+    a = np.asarray(data).ravel()
+    frum, cnts, vals = rle(a, stepsize)
+    v_dt = '<i4' if a.dtype.kind == 'i' else a.dtype
+    dt = [('ID', '<i4'), ('Value', v_dt), ('Count', '<i4'),
+          ('From_', '<i4'), ('To_', '<i4')]
+    out = np.empty(len(cnts), dtype=dt)
+    out['ID'] = np.arange(len(cnts))
+    out['Value'] = vals
+    out['Count'] = cnts
+    out['From_'] = frum
+    out['To_'] = frum + cnts
+    return out
+
+
+# ---- (33) rle ----
+def _run_breaks(a, delta=0, oper='!='):
+    """The indices where the runs of a 1D array begin, the first, 0, is not
+    included.  See `rle`.
+    """
+    if len(a) < 2:
+        return np.zeros(0, dtype=np.intp)
+    if delta == 0 and oper in ('!=', 'ne'):   # any dtype, strings, records
+        return np.flatnonzero(a[1:] != a[:-1]) + 1
+    d = np.diff(a)
+    f = {'==': np.equal, 'eq': np.equal, '!=': np.not_equal,
+         'ne': np.not_equal, '>': np.greater, 'gt': np.greater,
+         '<': np.less, 'lt': np.less}[oper]
+    return np.flatnonzero(f(d, delta)) + 1
+
+
+def _runs(a, brk):
+    """starts, lengths and values of the runs from their breaks"""
+    starts = np.r_[0, brk].astype(np.intp) if len(a) else brk
+    lengths = np.diff(np.r_[starts, len(a)])
+    return starts, lengths, a[starts]
+
+
+def rle(a, stepsize=0):
+    """Run length encoding of a 1D array, or of each row of a 2D array.  A
+    ValueError is raised for more dimensions, use a.ravel() or a 2D reshape.
+
+    Requires:
+    --------
+    a : array
+        Numbers, strings, booleans or a structured array (runs of equal
+        records, so use the key fields, eg a[['A', 'B']])
+    stepsize : number
+        0, runs of equal values.  Otherwise runs where consecutive values
+        differ by stepsize, eg 1 for 1, 2, 3.  Ignored for strings and
+        records.
+
+    Returns:
+    -------
+    starts, lengths, values : arrays
+        The index where each run starts, its length and its first value.
+        For 2D arrays the runs stop at the end of each row and the starts
+        index a.ravel(), so ``np.divmod(starts, a.shape[1])`` gives the row
+        and column.
+
+    >>> rle(np.array([1, 1, 2, 2, 2, 1]))
+    (array([0, 2, 5]), array([2, 3, 1]), array([1, 2, 1]))
+
+    Notes:
+    -----
+    Only the breaks, np.flatnonzero(diff), are found.  No array is made
+    for each run, as np.split would.
+    """
+    a = np.asarray(a)
+    if a.dtype.kind in 'USOV':     # no differences, equal values only
+        stepsize = 0
+    if a.ndim > 2:
+        raise ValueError("rle needs a 1D or 2D array, not {}D".format(a.ndim))
+    if a.ndim == 2:
+        nr, nc = a.shape
+        flat = a.ravel()
+        brk = _run_breaks(flat, stepsize)
+        rows = np.arange(nc, flat.size, nc) if nc else brk[:0]
+        return _runs(flat, np.union1d(brk, rows))
+    a = a.ravel()
+    return _runs(a, _run_breaks(a, stepsize))
+
+
+def rle_encode(a):
+    """Run length encode an array, eg a classified raster, for storage.
+
+    Returns:
+    -------
+    runs : structured array
+        The `Value` and `Count` of each run, by row for 2D arrays.  Save it
+        with np.save and decode with `rle_decode`.
+    shape : tuple
+        The shape of `a`
+
+    >>> runs, shp = rle_encode(cls_raster)
+    >>> np.array_equal(rle_decode(runs, shp), cls_raster)
+    True
+    """
+    a = np.asarray(a)
+    starts, lengths, vals = rle(a if a.ndim == 2 else a.ravel())
+    runs = np.empty(len(starts), dtype=[('Value', a.dtype), ('Count', '<i8')])
+    runs['Value'] = vals
+    runs['Count'] = lengths
+    return runs, a.shape
+
+
+def rle_decode(runs, shape=None, rows=None):
+    """Decode runs made by `rle_encode`.
+
+    Requires:
+    --------
+    runs : structured array
+        The Value and Count of each run
+    shape : tuple, optional
+        The shape to return, otherwise 1D
+    rows : slice, optional
+        Decode only these rows of a 2D array, eg slice(100, 200).  The runs
+        of a 2D array stop at the end of each row, so only the runs for the
+        rows are expanded.
+    """
+    vals, cnts = runs['Value'], runs['Count']
+    if rows is None:
+        out = np.repeat(vals, cnts)
+        return out if shape is None else out.reshape(shape)
+    nr, nc = shape
+    r0, r1, step = rows.indices(nr)
+    if step != 1:
+        raise ValueError("Only contiguous rows are supported")
+    r1 = max(r0, r1)
+    starts = np.cumsum(cnts) - cnts
+    i0, i1 = np.searchsorted(starts, [r0*nc, r1*nc])
+    return np.repeat(vals[i0:i1], cnts[i0:i1]).reshape(r1 - r0, nc)
+
+
+# ---- (34) join_arrs ----
+def _join_col(ca, cb):
+    """One key column of `a` and `b` together.  Signed and unsigned 64 bit
+    integers, which would become float64, are offset by the minimum into
+    uint64 instead, or compared as python integers if the range is larger.
+    """
+    dt = np.result_type(ca, cb)
+    if ca.dtype.kind in 'iu' and cb.dtype.kind in 'iu' and dt.kind == 'f':
+        lo = min(int(c.min()) for c in (ca, cb) if len(c))
+        hi = max(int(c.max()) for c in (ca, cb) if len(c))
+        if hi - lo >= 2**64:
+            return np.concatenate((ca.astype(object), cb.astype(object)))
+        lo = np.uint64(lo % 2**64)
+        return np.concatenate((ca.astype(np.uint64) - lo,
+                               cb.astype(np.uint64) - lo))
+    return np.concatenate((ca, cb))
+
+
+def _join_keys(a, b, keys, b_keys):
+    """Keys for the rows of `a` and `b` which are equal where the key
+    fields are.  A single integer field is used as is, otherwise the
+    fields of both arrays are coded together and packed (see `sort_keys`).
+    Also returns, for each array, False where a key is nan or NaT, since
+    those rows match nothing.
+    """
+    cols = [_join_col(a[i], b[j]) for i, j in zip(keys, b_keys)]
+    null = np.zeros(len(a) + len(b), dtype=bool)
+    for c in cols:
+        if c.dtype.kind in 'fc':
+            null |= np.isnan(c).reshape(len(c), -1).any(axis=1)
+        elif c.dtype.kind in 'mM':
+            null |= np.isnat(c).reshape(len(c), -1).any(axis=1)
+    if len(cols) == 1 and cols[0].dtype.kind in 'iu':
+        k = cols[0]
+    else:
+        codes, sizes = zip(*[_col_codes(c) for c in cols])
+        k = _pack_codes(codes, sizes)
+        if k is None:
+            k = np.unique(np.stack(codes, axis=1), axis=0,
+                          return_inverse=True)[1].ravel()
+    na = len(a)
+    return k[:na], k[na:], ~null[:na], ~null[na:]
+
+
+def _join_rows(ka, kb, how, ok=None):
+    """The rows of `a` and `b` making up the join, and whether each has a
+    match.  `ia` is None when it is all the rows of `a` in order.  Rows of
+    `a` where `ok` is False aren't matched.
+    """
+    na, nb = len(ka), len(kb)
+    ok = np.ones(na, dtype=bool) if ok is None else ok
+    if na and nb:
+        lo = min(ka.min(), kb.min())
+        span = int(max(ka.max(), kb.max())) - int(lo) + 1
+        if span <= 4*(na + nb):              # dense keys, eg. object ids
+            pos = np.full(span, -1, dtype=np.intp)
+            kb = (kb - lo).astype(np.intp)
+            pos[kb] = np.arange(nb)
+            if (pos >= 0).sum() == nb:       # unique keys in b
+                ib = pos[(ka - lo).astype(np.intp)]
+                ib[~ok] = -1
+                hit = ib >= 0
+                if how == 'left' or hit.all():
+                    return None, ib, hit
+                ia = np.flatnonzero(hit)
+                return ia, ib[ia], hit[ia]
+            kb = kb + lo
+    ob = np.argsort(kb, kind='stable')
+    kb = kb[ob]
+    lo = np.searchsorted(kb, ka, side='left')
+    cnt = np.searchsorted(kb, ka, side='right') - lo
+    cnt[~ok] = 0
+    reps = cnt if how == 'inner' else np.maximum(cnt, 1)
+    ia = np.repeat(np.arange(na), reps)
+    first = np.cumsum(reps) - reps
+    ib = np.arange(len(ia)) - np.repeat(first - lo, reps)
+    hit = np.repeat(cnt > 0, reps)
+    ib = ob[np.where(hit, ib, 0)] if nb else ib
+    if len(ia) == na and (reps == 1).all():
+        ia = None
+    return ia, ib, hit
+
+
+def _join_dtype(a, b, keys, b_keys, suffix):
+    """The fields of `a`, then those of `b` except its keys, renamed with
+    the suffix where the names clash.
+    """
+    dt = [(n, a.dtype[n]) for n in a.dtype.names]
+    b_flds = [n for n in b.dtype.names if n not in b_keys]
+    names = []
+    for n in b_flds:
+        out = n + suffix if n in a.dtype.names else n
+        dt.append((out, b.dtype[n]))
+        names.append(out)
+    return np.dtype(dt), b_flds, names
+
+
+def join_arrs(a, b, keys, b_keys=None, how='inner', suffix='_b',
+              nodata=None):
+    """Join two structured arrays on one or more key fields, eg. an
+    attribute table to the results of an analysis by object id.
+
+    Requires:
+    --------
+    `a`, `b` : structured arrays
+        `a` is the left array, its rows keep their order
+    `keys` : string or list of strings
+        The key fields of `a`
+    `b_keys` : string or list of strings, optional
+        The matching key fields of `b`, the same names as `keys` by default
+    `how` : string
+        'inner', only the rows of `a` with a match in `b`, or 'left', all
+        the rows of `a`
+    `suffix` : string
+        Added to the names of fields of `b` which are also in `a`
+    `nodata` : dictionary, optional
+        The values for the fields of `b` in the rows of a left join without
+        a match.  The defaults are nan for floats, NaT for datetimes, -1 for
+        signed integers, 0, False or '' otherwise.
+
+    Returns:
+    -------
+    The fields of `a` followed by the fields of `b`, less its keys.  A row
+    of `a` matching several rows of `b` is repeated for each, in the order
+    they appear in `b`.  Keys that are nan or NaT match nothing, not even
+    each other.
+
+    Notes:
+    -----
+    Unique integer keys spanning a small range, like object ids, are
+    looked up in a table of positions.  Otherwise `b` is sorted once on its
+    key and the keys of `a` found in it with np.searchsorted.  The output
+    is allocated once and each field gathered into it, compare to
+    numpy.lib.recfunctions.join_by.
+
+    >>> join_arrs(parcels, results, 'OBJECTID', 'IDs', how='left')
+    """
+    if how not in ('inner', 'left'):
+        raise ValueError("how must be 'inner' or 'left', not {}".format(how))
+    keys = [keys] if isinstance(keys, str) else list(keys)
+    b_keys = keys if b_keys is None else b_keys
+    b_keys = [b_keys] if isinstance(b_keys, str) else list(b_keys)
+    if len(keys) != len(b_keys):
+        raise ValueError("keys {} and b_keys {} differ".format(keys, b_keys))
+    dt, b_flds, names = _join_dtype(a, b, keys, b_keys, suffix)
+    if len(a) == 0:
+        return np.empty(0, dtype=dt)
+    ka, kb, ok_a, ok_b = _join_keys(a, b, keys, b_keys)
+    b_rows = None
+    if not ok_b.all():                   # drop the rows of b with null keys
+        b_rows = np.flatnonzero(ok_b)
+        kb = kb[b_rows]
+    ia, ib, hit = _join_rows(ka, kb, how, ok_a)
+    if b_rows is not None and len(b_rows):
+        ib = b_rows[ib]
+    out = np.empty(len(ib), dtype=dt)
+    for n in a.dtype.names:
+        out[n] = a[n] if ia is None else a[n][ia]
+    fill = {'f': np.nan, 'c': np.nan, 'i': -1, 'U': '', 'S': b'',
+            'M': np.datetime64('NaT'), 'm': np.timedelta64('NaT')}
+    nodata = {} if nodata is None else nodata
+    for n, m in zip(b_flds, names):
+        if len(b):
+            out[m] = b[n][ib]
+        if not hit.all():
+            out[m][~hit] = nodata.get(m, fill.get(dt[m].kind, 0))
     return out
 
 
@@ -2033,6 +2794,8 @@ def _help():
     (7)  make_flds(n=1, as_type='float', names=None, def_name='col')
          make structured/recarray fields
     (8)  rec_arr(a, flds=None, types=None)
+         nd_view, struct_view, xy_view, xy_struct
+         zero copy views between structured arrays and ndarrays
     (9)  arr2xyz(a, verbose=False)
          array (col, rows) to (x, y) and array values for z.
     (10) change_arr(a, order=[], prn=False)
@@ -2049,7 +2812,7 @@ def _help():
     (16) block
     (17) block_arr(a, win=[3, 3], nodata=-1)
          break an array up into blocks
-    (18)  find(a, func, this=None, count=0, keep=[], prn=False, r_lim=2)
+    (18)  find(a, func, this=None, count=0, keep=None, prn=False, r_lim=2)
          find elements in an array using...
          func - (cumsum, eq, neq, ls, lseq, gt, gteq, btwn, btwni, byond)
                (      , ==,  !=,  <,   <=,  >,   >=,  >a<, =>a<=,  <a> )
@@ -2063,12 +2826,18 @@ def _help():
     (24) is_in
     (25) n_largest(a, num=1, by_row=True)
     (26) n_smallest(a, num=1, by_row=True)
+         top_k(a, num=1, axis=-1, largest=True, fld=None), top_k_blocks
     (27) rc_vals
     (28) xy_vals
     (29) sort_rows_by_col
-    (30) sort_cols_by_row
+    (30) sort_cols_by_row, sort_keys(a, flds=None, descending=False)
+         packed key sorting of structured arrays
     (31) radial_sort
     (32) sequences(data, stepsize)
+    (33) rle(a, stepsize=0), rle_encode(a), rle_decode(runs, shape, rows)
+         run length encoding
+    (34) join_arrs(a, b, keys, b_keys=None, how='inner', suffix='_b')
+         join structured arrays on key fields
      ---  _help  this function
     :-------------------------------------------------------------------:
     """